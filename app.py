@@ -1,17 +1,30 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
-from textblob import TextBlob
-import requests
-import xml.etree.ElementTree as ET
-import time
 import streamlit.components.v1 as components
-import re
 import json
+import os
+import re
+import time
+from prostock.quotes import get_quotes
+from prostock.regime import RegimeService
+from prostock.movers import MoversSnapshot, load_universe
+from prostock.backtest import DEFAULTS as BACKTEST_DEFAULTS, backtest as run_backtest, sweep as sweep_backtest
+from prostock.bar_store import MIN_REFRESH_SECONDS, BarStore
+from prostock.chart_data import MAX_POINTS as CHART_POINTS, price_figure
+from prostock.export import FORMATS as EXPORT_FORMATS, export_archive, export_file
+from prostock.feeds import fetch_feeds
+from prostock.forecast import forecast
+from prostock.fx import CURRENCIES as FX_CURRENCIES, FXService
+from prostock.gemini import GeminiClient
+from prostock.scheduler import INTERACTIVE, priority
+from prostock.screener import COLUMNS as SCREEN_COLUMNS, PRESETS as SCREEN_PRESETS, scan as scan_universe, screen
+from prostock.sentiment import score_headlines, summarize
+from prostock.snapshot import submit_snapshot
+from prostock.storage import UserStore
+from prostock.symbols import load_index as load_symbol_index
+from prostock.telemetry import begin_rerun, exporter_from_env, span
 
 # --- Configuration ---
 st.set_page_config(
@@ -20,6 +33,12 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+rerun_trace = begin_rerun(st.session_state.get('mode', 'Home'))
+
+@st.cache_resource
+def get_metrics_exporter():
+    return exporter_from_env().start()
+get_metrics_exporter()
 
 # --- LOGO HTML COMPONENT ---
 def get_logo_html(size="24px", dark_bg=False):
@@ -113,7 +132,7 @@ st.markdown("""
 
 # --- Mock DB & State ---
 @st.cache_resource
-def get_database(): return {}
+def get_database(): return UserStore()
 db = get_database()
 
 if 'user_id' not in st.session_state: st.session_state['user_id'] = None
@@ -130,7 +149,7 @@ if 'gemini_api_key' not in st.session_state:
 # --- TRANSLATION DICTIONARY ---
 TRANS = {
     "English": {
-        "Home": "🏠 Home", "Terminal": "📈 Asset Terminal", "Favs": "⭐ Favorites", "Media": "📺 Media & News", "Map": "🗺️ Finviz Map",
+        "Home": "🏠 Home", "Terminal": "📈 Asset Terminal", "Favs": "⭐ Favorites", "Media": "📺 Media & News", "Map": "🗺️ Finviz Map", "Screener": "🔎 Screener",
         "Stocks": "Stocks", "Commodities": "Commodities", "Crypto": "Crypto", "Forex": "Currencies/Forex",
         "Search": "Search Assets", "Search_Ph": "Symbol or Name (e.g. Nvidia, Gold, BTC)...", "Trend_Stocks": "🔥 Trending Stocks",
         "Trend_Crypto": "🪙 Top Crypto", "Trend_Fx": "💱 Key Currencies", "Quick": "Quick Access",
@@ -138,11 +157,11 @@ TRANS = {
         "Convert": "Convert", "Rate_Err": "Rate Unavailable", "Forecast": "30-Period Forecast",
         "Sent": "Market Sentiment", "News_Sent": "News Tone", "Logout": "Log Out", "Delete": "Delete Account",
         "Hero_Sub": "Market Intelligence for the Modern Investor", "Watchlist": "⭐ Watchlist", "Media_Center": "📺 Media Center",
-        "Tab_Chart": "Chart", "Tab_AI": "AI Analysis", "Tab_News": "News", "Tab_Data": "Data", "Tab_Fund": "Fundamentals",
-        "Trend_KR": "🇰🇷 Korea Markets"
+        "Tab_Chart": "Chart", "Tab_AI": "AI Analysis", "Tab_News": "News", "Tab_Data": "Data", "Tab_Fund": "Fundamentals", "Tab_Backtest": "Backtest",
+        "Trend_KR": "🇰🇷 Korea Markets", "Suggest": "Did you mean", "No_Data": "No price data available"
     },
     "한국어": {
-        "Home": "🏠 홈", "Terminal": "📈 자산 터미널", "Favs": "⭐ 관심종목", "Media": "📺 미디어 & 뉴스", "Map": "🗺️ 핀비즈 맵",
+        "Home": "🏠 홈", "Terminal": "📈 자산 터미널", "Favs": "⭐ 관심종목", "Media": "📺 미디어 & 뉴스", "Map": "🗺️ 핀비즈 맵", "Screener": "🔎 스크리너",
         "Stocks": "주식", "Commodities": "원자재", "Crypto": "암호화폐", "Forex": "통화/외환",
         "Search": "자산 검색", "Search_Ph": "심볼 또는 이름 (예: 삼성전자, 비트코인)...", "Trend_Stocks": "🔥 인기 주식",
         "Trend_Crypto": "🪙 주요 암호화폐", "Trend_Fx": "💱 주요 통화", "Quick": "빠른 접속",
@@ -150,8 +169,8 @@ TRANS = {
         "Convert": "변환", "Rate_Err": "환율 정보 없음", "Forecast": "30일 예측",
         "Sent": "시장 심리", "News_Sent": "뉴스 분위기", "Logout": "로그아웃", "Delete": "계정 삭제",
         "Hero_Sub": "현대 투자자를 위한 시장 인텔리전스", "Watchlist": "⭐ 관심종목", "Media_Center": "📺 미디어 센터",
-        "Tab_Chart": "차트", "Tab_AI": "AI 분석", "Tab_News": "뉴스", "Tab_Data": "데이터", "Tab_Fund": "기업 정보",
-        "Trend_KR": "🇰🇷 한국 증시"
+        "Tab_Chart": "차트", "Tab_AI": "AI 분석", "Tab_News": "뉴스", "Tab_Data": "데이터", "Tab_Fund": "기업 정보", "Tab_Backtest": "백테스트",
+        "Trend_KR": "🇰🇷 한국 증시", "Suggest": "추천 종목", "No_Data": "가격 데이터 없음"
     }
 }
 
@@ -159,24 +178,27 @@ def txt(key):
     return TRANS[st.session_state['lang']].get(key, key)
 
 # --- Loading Screen ---
+# Stays up only until the first page has rendered, then dismiss_splash() clears it.
+splash = None
 if not st.session_state['splash_shown']:
-    placeholder = st.empty()
-    with placeholder.container():
+    splash = st.empty()
+    with splash.container():
         st.markdown(f"""<div class="loading-container">{get_logo_html("60px")}<p style='color: #666; margin-bottom: 10px; margin-top: 20px;'>Institutional Grade Analytics</p><p style='color: #0d6efd; font-size: 18px; font-weight: 500;'>professional personal banking</p></div>""", unsafe_allow_html=True)
-    time.sleep(3)
-    placeholder.empty()
     st.session_state['splash_shown'] = True
 
+def dismiss_splash():
+    if splash is not None: splash.empty()
+
 # --- Auth ---
 def login_user(uid):
     st.session_state['user_id'] = uid; st.session_state['logged_in'] = True; st.session_state['guest_mode'] = False; st.rerun()
 def signup_user(uid):
-    if uid in db: st.error("ID exists")
-    else: db[uid]={'favorites':[]}; login_user(uid)
+    if not db.create_user(uid): st.error("ID exists")
+    else: login_user(uid)
 def logout_user():
     st.session_state['user_id']=None; st.session_state['logged_in']=False; st.session_state['guest_mode']=False; st.rerun()
 def delete_account():
-    if st.session_state['user_id'] in db: del db[st.session_state['user_id']]; logout_user()
+    if db.user_exists(st.session_state['user_id']): db.delete_user(st.session_state['user_id']); logout_user()
 def login_later():
     st.session_state['guest_mode'] = True; st.session_state['mode'] = "Home"; st.rerun()
 
@@ -213,8 +235,12 @@ if not st.session_state['logged_in'] and not st.session_state['guest_mode']:
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("Login Later", use_container_width=True):
             login_later()
+    dismiss_splash()
     st.stop()
 
+# Live ticks follow the bar store's refresh throttle; a faster tick would reload nothing new.
+LIVE_REFRESH_SECONDS = MIN_REFRESH_SECONDS
+
 # --- ASSET MAP ---
 ASSET_MAP = {
     "BITCOIN": "BTC-USD", "BTC": "BTC-USD", "ETHEREUM": "ETH-USD", "ETH": "ETH-USD",
@@ -227,89 +253,82 @@ ASSET_MAP = {
     "금": "GC=F", "원유": "CL=F", "환율": "KRW=X", "원달러": "KRW=X", "코스피": "^KS11", "코스닥": "^KQ11"
 }
 
+TICKER_PATTERN = re.compile(r"[A-Z0-9.^=\-]{1,15}")
+
 # --- HELPER FUNCTIONS ---
+@st.cache_resource
+def get_symbol_index():
+    return load_symbol_index()
+
+def resolve_ticker(query):
+    # Known names and aliases first; anything shaped like a ticker is passed
+    # through as typed, free text goes to the best index match. A lower-case
+    # word of five or more letters is more likely a misspelt name ("nvidai")
+    # than a ticker, so it tries the index before being passed through.
+    q_upper = query.upper().strip()
+    symbols = get_symbol_index()
+    ticker = ASSET_MAP.get(q_upper) or symbols.resolve(query)
+    if ticker: return ticker
+    word = query.strip()
+    if TICKER_PATTERN.fullmatch(q_upper) and not (len(word) >= 5 and word.isalpha() and not word.isupper()): return q_upper
+    hits = symbols.search(query, 1)
+    return hits[0].symbol if hits else q_upper
+
+def symbol_suggestions(query, limit=5):
+    hits = [h for h in get_symbol_index().search(query, limit + 1) if h.symbol != query.upper().strip()][:limit]
+    if not hits: return
+    st.caption(txt("Suggest"))
+    for col, hit in zip(st.columns(limit), hits):
+        if col.button(hit.symbol, key=f"suggest_{hit.symbol}", help=hit.name, use_container_width=True):
+            st.session_state['ticker_search'] = hit.symbol; st.rerun()
+
 def smart_search(query):
     if query:
-        q_upper = query.upper().strip()
-        ticker_res = ASSET_MAP.get(q_upper, q_upper)
-        st.session_state['ticker_search'] = ticker_res
+        st.session_state['ticker_search'] = resolve_ticker(query)
         st.session_state['mode'] = "Asset Terminal"
         st.rerun()
 
-@st.cache_data(ttl=10)
-def get_live_price(ticker):
-    try:
-        info = yf.Ticker(ticker).info
-        price = info.get('currentPrice') or info.get('regularMarketPrice')
-        if not price:
-            d = yf.Ticker(ticker).history(period="1d")
-            if not d.empty: price = d['Close'].iloc[-1]
-        prev = info.get('previousClose')
-        if not prev:
-            d = yf.Ticker(ticker).history(period="5d")
-            if len(d) > 1: prev = d['Close'].iloc[-2]
-        change = ((price - prev)/prev)*100 if price and prev else 0.0
-        return price or 0.0, change
-    except: return 0.0, 0.0
-
-@st.cache_data(ttl=10)
-def get_stock_data(ticker, interval, period, start=None, end=None):
+def get_live_prices(tickers):
+    return get_quotes(tickers)
+
+@st.cache_resource
+def get_movers_service():
+    return MoversSnapshot(load_universe()).start()
+
+@st.cache_resource
+def get_bar_store():
+    return BarStore()
+
+def fetch_bars(ticker, interval, period, start=None, end=None, technicals=False):
     try:
         if interval in ['1m', '5m', '1h'] and period == '1d': period = "5d"
         if interval == "1d" and end: end = end + timedelta(days=1)
-        if interval == "1d": data = yf.download(ticker, start=start, end=end, interval=interval, progress=False)
-        else: data = yf.download(ticker, period=period, interval=interval, progress=False)
-        if (data.empty or len(data)<2) and period=="1d":
-            data = yf.download(ticker, period="5d", interval=interval, progress=False)
-        if 'Volume' in data.columns: data = data[data['Volume']>0]
-        data = data.dropna()
-        return data
+        if interval == "1d": return get_bar_store().get(ticker, interval, start=start, end=end, technicals=technicals)
+        return get_bar_store().get(ticker, interval, period=period, technicals=technicals)
     except: return pd.DataFrame()
 
-@st.cache_data(ttl=300)
-def get_stock_info(ticker):
-    try:
-        stock = yf.Ticker(ticker)
-        return stock.info, stock.news
-    except: return {}, []
+def get_stock_data(ticker, interval, period, start=None, end=None):
+    # Bars and indicator columns are read-only views into the process-wide
+    # columnar store, so every session viewing this chart shares one copy. The
+    # store only pulls bars newer than the last stored one, at most every 10s,
+    # and the chart on screen goes ahead of background upstream requests.
+    with span("get_stock_data", "fetch"), priority(INTERACTIVE): return fetch_bars(ticker, interval, period, start, end, technicals=True)
 
-@st.cache_data(ttl=300)
-def get_exchange_rate(pair="KRW=X"):
-    try:
-        data = yf.Ticker(pair).history(period="1d")
-        if not data.empty: return data['Close'].iloc[-1]
-    except: return None
-    return None
+@st.cache_resource
+def get_fx_service():
+    return FXService().start()
 
-def calculate_technicals(data):
-    if len(data) < 2: return data
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-    rs = gain / loss
-    data['RSI'] = 100 - (100 / (1 + rs))
-    data['SMA'] = data['Close'].rolling(20).mean()
-    data['BB_Upper'] = data['SMA'] + 2*data['Close'].rolling(20).std()
-    data['BB_Lower'] = data['SMA'] - 2*data['Close'].rolling(20).std()
-    return data
+def load_export_frame(ticker, interval, period):
+    if interval in ['1m', '5m', '1h'] and period == '1d': period = "5d"
+    return get_bar_store().get(ticker, interval, period=period, technicals=True)
+
+@st.cache_resource
+def get_regime_service():
+    return RegimeService().start()
 
 def get_fear_and_greed_proxy():
-    try:
-        vix = yf.Ticker("^VIX").history(period="5d")['Close'].iloc[-1]
-        sp500 = yf.Ticker("^GSPC").history(period="6mo")
-        if sp500.empty: return 50, "Neutral"
-        current_sp = sp500['Close'].iloc[-1]
-        avg_sp = sp500['Close'].mean()
-        fear_score = max(0, min(100, 100 - (vix - 10) * 2.5))
-        momentum_score = max(0, min(100, 50 + ((current_sp - avg_sp) / avg_sp) * 500))
-        final_score = (fear_score * 0.4) + (momentum_score * 0.6)
-        if final_score < 25: label = "Extreme Fear"; 
-        elif final_score < 45: label = "Fear"
-        elif final_score < 55: label = "Neutral"
-        elif final_score < 75: label = "Greed"
-        else: label = "Extreme Greed"
-        return int(final_score), label
-    except: return 50, "Neutral"
+    regime = get_regime_service().current()
+    return regime['score'], regime['label']
 
 def safe_extract_news_title(item):
     if not isinstance(item, dict): return None
@@ -324,21 +343,8 @@ def safe_extract_news_title(item):
 
 def analyze_news_sentiment(news_items):
     if not news_items: return 0, 0, 0, "Neutral"
-    polarities = []
-    for item in news_items:
-        title = safe_extract_news_title(item)
-        if title:
-            blob = TextBlob(title)
-            polarities.append(blob.sentiment.polarity)
-    if not polarities: return 0, 0, 0, "Neutral"
-    pos = sum(1 for p in polarities if p > 0.05)
-    neg = sum(1 for p in polarities if p < -0.05)
-    neu = len(polarities) - pos - neg
-    avg_pol = np.mean(polarities)
-    if avg_pol > 0.05: label = "Positive"
-    elif avg_pol < -0.05: label = "Negative"
-    else: label = "Neutral"
-    return pos, neg, neu, label
+    titles = [t for t in (safe_extract_news_title(item) for item in news_items) if t]
+    return summarize(score_headlines(titles))
 
 def generate_ai_report(ticker, price, sma, rsi, fg_score, fg_label, news_label):
     report = f"### 🧠 AI Executive Summary for {ticker}\n\n"
@@ -349,57 +355,21 @@ def generate_ai_report(ticker, price, sma, rsi, fg_score, fg_label, news_label):
     report += f"**3. Technicals:** {trend} trend, RSI is {rsi_state}."
     return report
 
-@st.cache_data(ttl=600)
-def fetch_rss_feed(url):
-    try:
-        response = requests.get(url, timeout=5)
-        content = response.text
-        items = []
-        raw_items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
-        for raw in raw_items[:5]: 
-            title_m = re.search(r'<title>(.*?)</title>', raw, re.DOTALL)
-            link_m = re.search(r'<link>(.*?)</link>', raw, re.DOTALL)
-            if title_m and link_m:
-                t = title_m.group(1).replace('<![CDATA[', '').replace(']]>', '').strip()
-                l = link_m.group(1).strip()
-                items.append({'title': t, 'link': l})
-        return items
-    except: return []
-
 # --- REAL GEMINI AI ---
-def call_gemini_api(prompt, api_key):
-    models = ["gemini-1.5-flash", "gemini-1.5-flash-latest", "gemini-pro"]
-    headers = {'Content-Type': 'application/json'}
-    payload = {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": {"maxOutputTokens": 300}}
-    for model in models:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
-        try:
-            r = requests.post(url, headers=headers, json=payload)
-            if r.status_code == 200: return r.json()['candidates'][0]['content']['parts'][0]['text']
-        except: continue
-    return "AI Service Unavailable. Please check API Key."
-
-def get_smart_response(query, ticker, data, api_key):
-    if not api_key: return "⚠️ API Key missing. Please check settings."
-    latest_price = data['Close'].iloc[-1] if not data.empty else "N/A"
-    rsi_val = f"{data['RSI'].iloc[-1]:.2f}" if 'RSI' in data.columns and not pd.isna(data['RSI'].iloc[-1]) else "N/A"
-    sma_val = f"{data['SMA'].iloc[-1]:.2f}" if 'SMA' in data.columns and not pd.isna(data['SMA'].iloc[-1]) else "N/A"
-    prompt = f"""You are a professional financial analyst. Analyze {ticker} based on this real-time data: Price: {latest_price}, RSI (14): {rsi_val}, SMA (20): {sma_val}. User Question: "{query}". Provide a concise, actionable answer (max 3 sentences)."""
-    return call_gemini_api(prompt, api_key)
+@st.cache_resource
+def get_gemini_client():
+    return GeminiClient()
+
+def get_smart_response(query, ticker, snap, api_key):
+    if not api_key: return iter(["⚠️ API Key missing. Please check settings."])
+    prompt = f"""You are a professional financial analyst. Analyze {ticker} based on this real-time data: Price: {snap.get('price', 'N/A')}, RSI (14): {snap.get('rsi', 'N/A')}, SMA (20): {snap.get('sma', 'N/A')}. User Question: "{query}". Provide a concise, actionable answer (max 3 sentences)."""
+    return get_gemini_client().ask(prompt, api_key, cache_key=(ticker, query.strip().lower(), tuple(sorted(snap.items()))))
 
 def submit_chat():
     if st.session_state.chat_input_val:
         user_input = st.session_state.chat_input_val
         st.session_state.chat_history.append({"role": "user", "content": user_input})
-        ticker = st.session_state.get('ticker_search', 'Unknown')
-        try: 
-            d = yf.download(ticker, period="1mo", interval="1d", progress=False)
-            d = calculate_technicals(d)
-        except: d = pd.DataFrame({'Close': [0]})
-        api_key = st.session_state.get('gemini_api_key', '')
-        with st.spinner("AI Thinking..."):
-            response = get_smart_response(user_input, ticker, d, api_key)
-            st.session_state.chat_history.append({"role": "ai", "content": response})
+        st.session_state['chat_pending'] = user_input
         st.session_state.chat_input_val = "" 
 
 # --- NAVIGATION ---
@@ -416,305 +386,388 @@ else:
     if st.sidebar.button(txt("Favs"), use_container_width=True): st.session_state['mode'] = "Favorites"
     if st.sidebar.button(txt("Media"), use_container_width=True): st.session_state['mode'] = "Media & News"
     if st.sidebar.button(txt("Map"), use_container_width=True): st.session_state['mode'] = "Map"
+    if st.sidebar.button(txt("Screener"), use_container_width=True): st.session_state['mode'] = "Screener"
 mode = st.session_state['mode']
 st.sidebar.markdown("---")
 with st.sidebar.expander("🧮 Currency Calc", expanded=False):
     cc_amt = st.number_input("Amt", 100.0)
     c1, c2 = st.columns(2)
-    with c1: cc_f = st.selectbox("From", ["USD", "KRW", "EUR", "JPY", "BTC"])
-    with c2: cc_to = st.selectbox("To", ["KRW", "USD", "EUR", "JPY", "BTC"])
+    with c1: cc_f = st.selectbox("From", FX_CURRENCIES, index=FX_CURRENCIES.index("USD"))
+    with c2: cc_to = st.selectbox("To", FX_CURRENCIES, index=FX_CURRENCIES.index("KRW"))
     if st.button(txt("Convert")):
-        try:
-            if cc_f==cc_to: res=cc_amt
-            elif cc_f=='USD': r = yf.Ticker(f"{cc_to}=X").history(period='1d')['Close'].iloc[-1]; res = cc_amt * r if cc_to!='KRW' else cc_amt * r 
-            else: res = None 
-            if res: st.success(f"{res:,.2f} {cc_to}")
-        except: st.error(txt("Rate_Err"))
-
-# --- MODE: HOMEPAGE ---
-if mode == "Home":
-    # Guest Mode Header Check
-    if st.session_state.get('guest_mode', False):
-        st.markdown("""<style>[data-testid="stSidebar"] { display: none; }</style>""", unsafe_allow_html=True)
-        h1, h2, h3 = st.columns([1,2,1])
-        with h1: st.markdown(f'<div class="prostock-logo" style="font-size:24px;">{get_logo_html("24px")}</div>', unsafe_allow_html=True)
-        with h2: 
-             q = st.text_input("Search", placeholder=txt("Search_Ph"), label_visibility="collapsed")
-             if q: smart_search(q)
-        with h3:
-            b1, b2 = st.columns(2)
-            with b1: 
-                if st.button("Log In", use_container_width=True): 
-                     st.session_state['guest_mode'] = False; st.session_state['logged_in'] = False; st.rerun()
-            with b2:
-                 if st.button("Sign Up", type="primary", use_container_width=True):
-                     st.session_state['guest_mode'] = False; st.session_state['logged_in'] = False; st.rerun()
-
-        st.markdown(f"""<div class="guest-hero"><div class="guest-hero-text">Market Intelligence for the Modern Investor</div></div>""", unsafe_allow_html=True)
+        fx = get_fx_service(); fx.wait()
+        res = fx.convert(cc_amt, cc_f, cc_to)
+        if res is not None: st.success(f"{res:,.2f} {cc_to}")
+        else: st.error(txt("Rate_Err"))
+
+def render_debug_panel(trace):
+    # Opt-in with ?debug=1 or PROSTOCK_DEBUG=1: this rerun's spans and cache traffic.
+    if not (st.query_params.get("debug") or os.environ.get("PROSTOCK_DEBUG")): return
+    with st.sidebar.expander(f"🛠 Performance · {trace.elapsed * 1000:,.0f} ms", expanded=False):
+        spans = [{"Step": "· " * depth + name, "Kind": kind, "ms": round(sec * 1000, 1) if sec is not None else None} for name, kind, depth, sec in trace.spans]
+        if spans: st.dataframe(pd.DataFrame(spans), hide_index=True, use_container_width=True)
+        events = pd.Series(trace.events, dtype="int64")
+        if not events.empty: st.dataframe(events.unstack(fill_value=0), use_container_width=True)
+
+page_span = span(f"page:{mode}", "render").start()
+try:
+    # --- MODE: HOMEPAGE ---
+    if mode == "Home":
+        # Guest Mode Header Check
+        if st.session_state.get('guest_mode', False):
+            st.markdown("""<style>[data-testid="stSidebar"] { display: none; }</style>""", unsafe_allow_html=True)
+            h1, h2, h3 = st.columns([1,2,1])
+            with h1: st.markdown(f'<div class="prostock-logo" style="font-size:24px;">{get_logo_html("24px")}</div>', unsafe_allow_html=True)
+            with h2: 
+                 q = st.text_input("Search", placeholder=txt("Search_Ph"), label_visibility="collapsed")
+                 if q: smart_search(q)
+            with h3:
+                b1, b2 = st.columns(2)
+                with b1: 
+                    if st.button("Log In", use_container_width=True): 
+                         st.session_state['guest_mode'] = False; st.session_state['logged_in'] = False; st.rerun()
+                with b2:
+                     if st.button("Sign Up", type="primary", use_container_width=True):
+                         st.session_state['guest_mode'] = False; st.session_state['logged_in'] = False; st.rerun()
+
+            st.markdown(f"""<div class="guest-hero"><div class="guest-hero-text">Market Intelligence for the Modern Investor</div></div>""", unsafe_allow_html=True)
         
-    else:
-        st.markdown("<div style='height: 30px;'></div>", unsafe_allow_html=True)
-        c_fill, c_acc = st.columns([3, 1])
-        with c_acc:
-            with st.expander(f"👤 ID: {st.session_state['user_id']}"):
-                if st.button(txt("Logout"), use_container_width=True): logout_user()
-                if st.button(txt("Delete"), type="primary", use_container_width=True): delete_account()
-
-        st.markdown(f"""<div class="hero-container"><div class="homepage-logo-container">{get_logo_html("60px")}</div><p style="font-size:18px; color:#666;">{txt("Hero_Sub")}</p></div>""", unsafe_allow_html=True)
-        c1, c2, c3 = st.columns([1, 2, 1])
-        with c2:
-            big_search = st.text_input("🔍 " + txt("Search"), placeholder=txt("Search_Ph"), label_visibility="collapsed")
-            if big_search: smart_search(big_search)
+        else:
+            st.markdown("<div style='height: 30px;'></div>", unsafe_allow_html=True)
+            c_fill, c_acc = st.columns([3, 1])
+            with c_acc:
+                with st.expander(f"👤 ID: {st.session_state['user_id']}"):
+                    if st.button(txt("Logout"), use_container_width=True): logout_user()
+                    if st.button(txt("Delete"), type="primary", use_container_width=True): delete_account()
+
+            st.markdown(f"""<div class="hero-container"><div class="homepage-logo-container">{get_logo_html("60px")}</div><p style="font-size:18px; color:#666;">{txt("Hero_Sub")}</p></div>""", unsafe_allow_html=True)
+            c1, c2, c3 = st.columns([1, 2, 1])
+            with c2:
+                big_search = st.text_input("🔍 " + txt("Search"), placeholder=txt("Search_Ph"), label_visibility="collapsed")
+                if big_search: smart_search(big_search)
         
-        st.markdown("<br>", unsafe_allow_html=True)
-        t1, t2, t3, t4 = st.columns(4)
-        def render_trend_card(title, assets):
-            st.markdown(f"""<div class="trend-card"><div class="trend-header">{title}</div>""", unsafe_allow_html=True)
-            for name, sym in assets.items():
-                p, chg = get_live_price(sym)
-                color = "#00C853" if chg >= 0 else "#D50000"
-                st.markdown(f"""<div class="trend-item"><span class="trend-name">{name}</span><span class="trend-price" style="color:{color}">{p:,.2f} ({chg:+.2f}%)</span></div>""", unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        with t1: render_trend_card(txt("Trend_Stocks"), {"NVIDIA": "NVDA", "Tesla": "TSLA", "Apple": "AAPL", "Samsung": "005930.KS"})
-        with t2: render_trend_card(txt("Trend_KR"), {"KOSPI": "^KS11", "KOSDAQ": "^KQ11", "Samsung": "005930.KS", "SK Hynix": "000660.KS"})
-        with t3: render_trend_card(txt("Trend_Crypto"), {"Bitcoin": "BTC-USD", "Ethereum": "ETH-USD", "Solana": "SOL-USD", "XRP": "XRP-USD"})
-        with t4: render_trend_card(txt("Trend_Fx"), {"USD/KRW": "KRW=X", "EUR/USD": "EURUSD=X", "JPY/USD": "JPY=X", "Gold": "GC=F"})
-        st.markdown("---")
-        st.subheader("📰 Breaking News")
-        news_cols = st.columns(2)
-        def render_home_news(url, source):
-            items = fetch_rss_feed(url)
-            for n in items: 
-                st.markdown(f"""<a href='{n['link']}' target='_blank' class='news-card-row'><div class='news-content'><div style="color:#666; font-size:10px; font-weight:700; text-transform:uppercase; margin-bottom:4px;">{source}</div><div class='news-title'>{n['title']}</div></div></a>""", unsafe_allow_html=True)
-        with news_cols[0]: render_home_news("https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664", "CNBC")
-        with news_cols[1]: render_home_news("http://rss.cnn.com/rss/money_latest.rss", "CNN Business")
-
-# --- MODE: ASSET TERMINAL ---
-elif mode == "Asset Terminal":
-    main_col, gemini_col = st.columns([3, 1])
-    with gemini_col:
-        st.markdown(f"""<div class="gemini-box"><div class="gemini-header"><img src="https://upload.wikimedia.org/wikipedia/commons/8/8a/Google_Gemini_logo.svg" class="gemini-logo-icon"> &nbsp;Gemini Analyst</div>""", unsafe_allow_html=True)
-        st.text_input("API Key", value=st.session_state.get('gemini_api_key', ''), type="password", key="gemini_api_key", label_visibility="collapsed")
-        for msg in st.session_state['chat_history'][-4:]:
-            bg = "#e7f1ff" if msg['role']=="ai" else "white"
-            align = "left" if msg['role']=="ai" else "right"
-            st.markdown(f"""<div class="chat-bubble" style="background:{bg}; text-align:{align}"><b>{msg['role'].upper()}:</b> {msg['content']}</div>""", unsafe_allow_html=True)
-        st.text_input("Ask ProStock AI...", key="chat_input_val", on_change=submit_chat)
-        st.markdown("<hr>", unsafe_allow_html=True)
-        current_ticker = st.session_state.get('ticker_search', 'AAPL')
-        symbol_for_widget = current_ticker if "-" not in current_ticker else "NASDAQ:AAPL" 
-        if current_ticker.endswith("=X"): symbol_for_widget = f"FX:{current_ticker.replace('=X','')}"
-        if current_ticker.endswith("-USD"): symbol_for_widget = f"COINBASE:{current_ticker.replace('-USD','')}USD"
-        components.html(f"""<div class="tradingview-widget-container"><div class="tradingview-widget-container__widget"></div><script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-technical-analysis.js" async>{{"interval": "1m","width": "100%","isTransparent": true,"height": "450","symbol": "{symbol_for_widget}","showIntervalTabs": true,"displayMode": "single","locale": "en","colorTheme": "light"}}</script></div>""", height=460)
-
-    with main_col:
-        default_ticker = st.session_state.get('ticker_search', "")
-        st.markdown(f'<div class="prostock-logo" style="font-size:24px;">{get_logo_html("24px")} Terminal</div>', unsafe_allow_html=True)
+            st.markdown("<br>", unsafe_allow_html=True)
+            t1, t2, t3, t4 = st.columns(4)
+            trend_cards = [
+                (t1, txt("Trend_Stocks"), {"NVIDIA": "NVDA", "Tesla": "TSLA", "Apple": "AAPL", "Samsung": "005930.KS"}),
+                (t2, txt("Trend_KR"), {"KOSPI": "^KS11", "KOSDAQ": "^KQ11", "Samsung": "005930.KS", "SK Hynix": "000660.KS"}),
+                (t3, txt("Trend_Crypto"), {"Bitcoin": "BTC-USD", "Ethereum": "ETH-USD", "Solana": "SOL-USD", "XRP": "XRP-USD"}),
+                (t4, txt("Trend_Fx"), {"USD/KRW": "KRW=X", "EUR/USD": "EURUSD=X", "JPY/USD": "JPY=X", "Gold": "GC=F"}),
+            ]
+            trend_quotes = get_live_prices([sym for _, _, assets in trend_cards for sym in assets.values()])
+            def render_trend_card(title, assets):
+                st.markdown(f"""<div class="trend-card"><div class="trend-header">{title}</div>""", unsafe_allow_html=True)
+                for name, sym in assets.items():
+                    quote = trend_quotes[sym]
+                    if quote is None:
+                        # Never priced yet: show a placeholder rather than a fake 0.00.
+                        st.markdown(f"""<div class="trend-item"><span class="trend-name">{name}</span><span class="trend-price" style="color:#999">—</span></div>""", unsafe_allow_html=True); continue
+                    p, chg = quote
+                    color = "#00C853" if chg >= 0 else "#D50000"
+                    st.markdown(f"""<div class="trend-item"><span class="trend-name">{name}</span><span class="trend-price" style="color:{color}">{p:,.2f} ({chg:+.2f}%)</span></div>""", unsafe_allow_html=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+            for col, title, assets in trend_cards:
+                with col: render_trend_card(title, assets)
+            st.markdown("---")
+            st.subheader("📰 Breaking News")
+            news_cols = st.columns(2)
+            home_feeds = fetch_feeds(["CNBC", "CNN"], 5)
+            def render_home_news(items, source):
+                for n in items: 
+                    st.markdown(f"""<a href='{n['link']}' target='_blank' class='news-card-row'><div class='news-content'><div style="color:#666; font-size:10px; font-weight:700; text-transform:uppercase; margin-bottom:4px;">{source}</div><div class='news-title'>{n['title']}</div></div></a>""", unsafe_allow_html=True)
+            with news_cols[0]: render_home_news(home_feeds["CNBC"], "CNBC")
+            with news_cols[1]: render_home_news(home_feeds["CNN"], "CNN Business")
+
+    # --- MODE: ASSET TERMINAL ---
+    elif mode == "Asset Terminal":
+        main_col, gemini_col = st.columns([3, 1])
+        with gemini_col:
+            st.markdown(f"""<div class="gemini-box"><div class="gemini-header"><img src="https://upload.wikimedia.org/wikipedia/commons/8/8a/Google_Gemini_logo.svg" class="gemini-logo-icon"> &nbsp;Gemini Analyst</div>""", unsafe_allow_html=True)
+            st.text_input("API Key", value=st.session_state.get('gemini_api_key', ''), type="password", key="gemini_api_key", label_visibility="collapsed")
+            for msg in st.session_state['chat_history'][-4:]:
+                bg = "#e7f1ff" if msg['role']=="ai" else "white"
+                align = "left" if msg['role']=="ai" else "right"
+                st.markdown(f"""<div class="chat-bubble" style="background:{bg}; text-align:{align}"><b>{msg['role'].upper()}:</b> {msg['content']}</div>""", unsafe_allow_html=True)
+            if st.session_state.get('chat_pending'):
+                # Answer from the frame the terminal drew on the previous run.
+                ticker = st.session_state.get('ticker_search', 'Unknown')
+                snap = st.session_state.get('terminal_snapshot', {})
+                if snap.get('ticker') != ticker: snap = {}
+                snap = {k: v for k, v in snap.items() if k != 'ticker'}
+                response = st.write_stream(get_smart_response(st.session_state.pop('chat_pending'), ticker, snap, st.session_state.get('gemini_api_key', '')))
+                st.session_state.chat_history.append({"role": "ai", "content": response})
+            st.text_input("Ask ProStock AI...", key="chat_input_val", on_change=submit_chat)
+            st.markdown("<hr>", unsafe_allow_html=True)
+            current_ticker = st.session_state.get('ticker_search', 'AAPL')
+            symbol_for_widget = current_ticker if "-" not in current_ticker else "NASDAQ:AAPL" 
+            if current_ticker.endswith("=X"): symbol_for_widget = f"FX:{current_ticker.replace('=X','')}"
+            if current_ticker.endswith("-USD"): symbol_for_widget = f"COINBASE:{current_ticker.replace('-USD','')}USD"
+            components.html(f"""<div class="tradingview-widget-container"><div class="tradingview-widget-container__widget"></div><script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-technical-analysis.js" async>{{"interval": "1m","width": "100%","isTransparent": true,"height": "450","symbol": "{symbol_for_widget}","showIntervalTabs": true,"displayMode": "single","locale": "en","colorTheme": "light"}}</script></div>""", height=460)
+
+        with main_col:
+            default_ticker = st.session_state.get('ticker_search', "")
+            st.markdown(f'<div class="prostock-logo" style="font-size:24px;">{get_logo_html("24px")} Terminal</div>', unsafe_allow_html=True)
         
-        c_search, c_btn = st.columns([4, 1])
-        with c_search:
-            search_query = st.text_input(txt("Search"), value=default_ticker, placeholder=txt("Search_Ph"), label_visibility="collapsed")
-        with c_btn:
-            if st.button("Search", type="primary", use_container_width=True):
-                smart_search(search_query)
-
-        ticker = ""; market_type = "Stocks"
-        if search_query:
-            q_upper = search_query.upper().strip()
-            ticker = ASSET_MAP.get(q_upper, q_upper)
-            if ticker.endswith("-USD"): market_type = "Crypto"
-            elif ticker.endswith("=F"): market_type = "Commodities"
-            elif ticker.endswith("=X"): market_type = "Currencies/Forex"
-        else:
-            market_type_sel = st.sidebar.selectbox("Market Type", [txt("Stocks"), txt("Commodities"), txt("Forex"), txt("Crypto")])
-            if market_type_sel == txt("Stocks"): market_type="Stocks"; ticker = st.sidebar.text_input("Ticker", "AAPL").upper()
-            elif market_type_sel == txt("Commodities"): market_type="Commodities"; ticker = {"Gold":"GC=F","Silver":"SI=F","Oil":"CL=F"}[st.sidebar.selectbox("Select", ["Gold","Silver","Oil"])]
-            elif market_type_sel == txt("Forex"): market_type="Currencies/Forex"; ticker = {"USD/KRW":"KRW=X","EUR/USD":"EURUSD=X"}[st.sidebar.selectbox("Select", ["USD/KRW","EUR/USD"])]
-            elif market_type_sel == txt("Crypto"): market_type="Crypto"; ticker = {"Bitcoin":"BTC-USD","Ethereum":"ETH-USD"}[st.sidebar.selectbox("Select", ["Bitcoin","Ethereum"])]
+            c_search, c_btn = st.columns([4, 1])
+            with c_search:
+                search_query = st.text_input(txt("Search"), value=default_ticker, placeholder=txt("Search_Ph"), label_visibility="collapsed")
+            with c_btn:
+                if st.button("Search", type="primary", use_container_width=True):
+                    smart_search(search_query)
+
+            ticker = ""; market_type = "Stocks"
+            if search_query:
+                ticker = resolve_ticker(search_query)
+                if not get_symbol_index().exact(ticker): symbol_suggestions(search_query)
+                if ticker.endswith("-USD"): market_type = "Crypto"
+                elif ticker.endswith("=F"): market_type = "Commodities"
+                elif ticker.endswith("=X"): market_type = "Currencies/Forex"
+            else:
+                market_type_sel = st.sidebar.selectbox("Market Type", [txt("Stocks"), txt("Commodities"), txt("Forex"), txt("Crypto")])
+                if market_type_sel == txt("Stocks"): market_type="Stocks"; ticker = st.sidebar.text_input("Ticker", "AAPL").upper()
+                elif market_type_sel == txt("Commodities"): market_type="Commodities"; ticker = {"Gold":"GC=F","Silver":"SI=F","Oil":"CL=F"}[st.sidebar.selectbox("Select", ["Gold","Silver","Oil"])]
+                elif market_type_sel == txt("Forex"): market_type="Currencies/Forex"; ticker = {"USD/KRW":"KRW=X","EUR/USD":"EURUSD=X"}[st.sidebar.selectbox("Select", ["USD/KRW","EUR/USD"])]
+                elif market_type_sel == txt("Crypto"): market_type="Crypto"; ticker = {"Bitcoin":"BTC-USD","Ethereum":"ETH-USD"}[st.sidebar.selectbox("Select", ["Bitcoin","Ethereum"])]
         
-        st.session_state['ticker_search'] = ticker
+            st.session_state['ticker_search'] = ticker
         
-        # Sidebar Features if Logged In
-        if not st.session_state.get('guest_mode', False):
-            # SAFE FAVORITES LOADING
-            uid = st.session_state.get('user_id')
-            if uid and uid not in db: db[uid] = {'favorites': []} # Auto-fix missing DB entry
-            user_favs = db[uid]['favorites']
+            # Sidebar Features if Logged In
+            if not st.session_state.get('guest_mode', False):
+                # SAFE FAVORITES LOADING
+                uid = st.session_state.get('user_id')
+                if uid: db.ensure_user(uid) # Auto-fix missing DB entry
+                user_favs = db.favorites(uid)
             
-            is_fav = ticker in user_favs
-            if st.sidebar.checkbox("⭐ Add to Favorites", value=is_fav):
-                if not is_fav: db[uid]['favorites'].append(ticker)
-            else:
-                if is_fav: db[uid]['favorites'].remove(ticker)
-            with st.sidebar.expander("⚙️ Chart Settings", expanded=True):
-                timeframe = st.selectbox("Interval", ["1 Minute", "5 Minute", "1 Hour", "1 Day"])
-                show_sma = st.toggle("SMA", True); show_bb = st.toggle("Bollinger Bands"); show_rsi = st.toggle("RSI")
-            if timeframe == "1 Minute": interval, period = "1m", "1d"
-            elif timeframe == "5 Minute": interval, period = "5m", "5d"
-            elif timeframe == "1 Hour": interval, period = "1h", "1mo"
-            else: interval, period = "1d", "1y"
-            if interval == "1d":
-                start_date = st.sidebar.date_input("Start", value=datetime.now() - timedelta(days=365))
-                end_date = st.sidebar.date_input("End", value=datetime.now())
+                is_fav = ticker in user_favs
+                if st.sidebar.checkbox("⭐ Add to Favorites", value=is_fav):
+                    if not is_fav: db.add_favorite(uid, ticker)
+                else:
+                    if is_fav: db.remove_favorite(uid, ticker)
+                with st.sidebar.expander("⚙️ Chart Settings", expanded=True):
+                    timeframe = st.selectbox("Interval", ["1 Minute", "5 Minute", "15 Minute", "1 Hour", "4 Hour", "1 Day", "1 Week"])
+                    show_sma = st.toggle("SMA", True); show_bb = st.toggle("Bollinger Bands"); show_rsi = st.toggle("RSI")
+                    full_detail = st.toggle("Full Detail", help="Send every bar to the chart instead of one per pixel column")
+                    live_mode = st.toggle("🔴 Live", help=f"Refresh the price and chart every {LIVE_REFRESH_SECONDS}s without reloading the page")
+                # Coarser intervals are resampled from a finer stored series, so
+                # switching between them does not go back upstream.
+                if timeframe == "1 Minute": interval, period = "1m", "1d"
+                elif timeframe == "5 Minute": interval, period = "5m", "5d"
+                elif timeframe == "15 Minute": interval, period = "15m", "1mo"
+                elif timeframe == "1 Hour": interval, period = "1h", "1mo"
+                elif timeframe == "4 Hour": interval, period = "4h", "6mo"
+                elif timeframe == "1 Week": interval, period = "1wk", "5y"
+                else: interval, period = "1d", "1y"
+                if interval == "1d":
+                    start_date = st.sidebar.date_input("Start", value=datetime.now() - timedelta(days=365))
+                    end_date = st.sidebar.date_input("End", value=datetime.now())
             
-            st.sidebar.markdown("---")
-            with st.sidebar.expander("🧮 Currency Calc", expanded=False):
-                cc_amt = st.number_input("Amt", 100.0)
-                c1, c2 = st.columns(2)
-                with c1: cc_f = st.selectbox("From", ["USD", "KRW", "EUR", "JPY", "BTC"])
-                with c2: cc_to = st.selectbox("To", ["KRW", "USD", "EUR", "JPY", "BTC"])
-                if st.button(txt("Convert")):
-                    try:
-                        if cc_f==cc_to: res=cc_amt
-                        elif cc_f=='USD': r = yf.Ticker(f"{cc_to}=X").history(period='1d')['Close'].iloc[-1]; res = cc_amt * r if cc_to!='KRW' else cc_amt * r 
-                        else: res = None 
-                        if res: st.success(f"{res:,.2f} {cc_to}")
-                    except: st.error(txt("Rate_Err"))
-
-            if st.sidebar.button("🔄 Refresh Data", type="primary"): st.rerun()
-        else:
-            # Guest Mode defaults
-            interval, period = "1m", "1d" 
-            show_sma=True; show_bb=False; show_rsi=False
-
-        if ticker:
-            try:
-                if interval == "1d": data = get_stock_data(ticker, interval, period, start_date if not st.session_state.get('guest_mode') else None, end_date if not st.session_state.get('guest_mode') else None)
-                else: data = get_stock_data(ticker, interval, period)
-                try: 
-                    info = yf.Ticker(ticker).info
+                if st.sidebar.button("🔄 Refresh Data", type="primary"): st.rerun()
+            else:
+                # Guest Mode defaults
+                interval, period = "1m", "1d" 
+                show_sma=True; show_bb=False; show_rsi=False; full_detail=False; live_mode=False
+
+            if ticker:
+                try:
+                    with priority(INTERACTIVE): pending = submit_snapshot(ticker)
+                    if interval == "1d" and not st.session_state.get('guest_mode'): bar_args = (ticker, interval, period, start_date, end_date)
+                    else: bar_args = (ticker, interval, period)
+                    data = get_stock_data(*bar_args)
+                    snapshot = pending.result()
+                    info, news = snapshot.info, snapshot.news
                     live_price = info.get('currentPrice') or info.get('regularMarketPrice') or info.get('ask')
-                except: info = {}; live_price = None
-                try: news = yf.Ticker(ticker).news
-                except: news = []
-                if isinstance(data.columns, pd.MultiIndex): data.columns = data.columns.get_level_values(0)
-                data = calculate_technicals(data)
-                if not live_price and not data.empty: live_price = data['Close'].iloc[-1]
-                curr_p = live_price if live_price else 0.0
-                prev_p = data['Close'].iloc[-2] if len(data)>1 else curr_p
-                chg = curr_p - prev_p
-                pct = (chg/prev_p)*100 if prev_p else 0
-                
-                logo_html = f'<div style="margin-right:15px;">{get_logo_html("32px")}</div>'
-                curr_code = info.get('currency', 'USD')
-                try: krw_rate = yf.Ticker("KRW=X").history(period="1d")['Close'].iloc[-1]
-                except: krw_rate = 0
-                price_sub = f"(₩{curr_p*krw_rate:,.0f})" if curr_code=='USD' and krw_rate else ""
-                st.markdown(f"""
-                <div class="finance-header">
-                    <div style="display:flex; justify-content:space-between; align-items:flex-end;">
-                        <div style="display:flex; align-items:center;">{logo_html}<div><h1 style="margin:0;">{ticker}</h1><p style="margin:0;color:#666;">{info.get('shortName', market_type)}</p></div></div>
-                        <div style="text-align:right;"><h1 style="margin:0;color:{'#00C853' if chg>=0 else '#D50000'};">{curr_code} {curr_p:,.2f}</h1><p style="margin:0;font-weight:600;color:{'#00C853' if chg>=0 else '#D50000'};">{chg:+.2f} ({pct:+.2f}%) <span style="color:#888;">{price_sub}</span></p></div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                tabs = st.tabs([txt("Tab_Chart"), txt("Tab_AI"), txt("Tab_News"), txt("Tab_Data")] + ([txt("Tab_Fund")] if market_type=="Stocks" else []))
-                with tabs[0]:
-                    fig = go.Figure()
-                    if market_type == "Crypto": fig.add_trace(go.Scatter(x=data.index, y=data['Close'], fill='tozeroy', line=dict(color='#2962FF'), name='Price'))
-                    else: fig.add_trace(go.Candlestick(x=data.index, open=data['Open'], high=data['High'], low=data['Low'], close=data['Close'], increasing_line_color='#00C853', decreasing_line_color='#D50000'))
-                    if show_sma: fig.add_trace(go.Scatter(x=data.index, y=data['SMA'], line=dict(color='#FFA000', width=1), name='SMA'))
-                    if show_bb:
-                        fig.add_trace(go.Scatter(x=data.index, y=data['BB_Upper'], line=dict(color='#999', dash='dot'), name='BB Up'))
-                        fig.add_trace(go.Scatter(x=data.index, y=data['BB_Lower'], line=dict(color='#999', dash='dot'), name='BB Lo'))
-                    rangebreaks = [dict(bounds=["sat", "mon"])] if market_type in ["Stocks", "Commodities"] and interval in ['1m', '5m', '1h'] else []
-                    fig.update_layout(height=500, template="plotly_white", xaxis_rangeslider_visible=False, xaxis=dict(rangebreaks=rangebreaks))
-                    st.plotly_chart(fig, use_container_width=True)
-                with tabs[1]:
-                    try: vix = yf.Ticker("^VIX").history(period="5d")['Close'].iloc[-1]; fear_score = max(0, min(100, 100 - (vix - 10) * 2.5)); fg_label = "Fear" if fear_score < 45 else "Greed"
-                    except: fear_score=50; fg_label="Neutral"
+                    if not data.empty:
+                        last_bar = data.iloc[-1]
+                        st.session_state['terminal_snapshot'] = {'ticker': ticker, 'interval': interval, 'asof': str(data.index[-1]), 'price': f"{last_bar['Close']:.2f}",
+                                                                 'rsi': f"{last_bar['RSI']:.2f}" if not pd.isna(last_bar.get('RSI')) else "N/A", 'sma': f"{last_bar['SMA']:.2f}" if not pd.isna(last_bar.get('SMA')) else "N/A"}
+                    curr_code = info.get('currency', 'USD')
+                    fx = get_fx_service(); fx.wait()
+                    krw_rate = fx.rate(curr_code, 'KRW') or 0
+                    live_every = LIVE_REFRESH_SECONDS if live_mode else None
+                    # Both fragments draw from one per-session entry: a full run stores the frame it
+                    # loaded, and whichever fragment ticks first pulls the newer bars for both.
+                    live_key = f"live_frame_{ticker}_{interval}"
+                    st.session_state[live_key] = {'frame': data, 'price': live_price, 'at': time.monotonic()}
+                    def current_frame():
+                        entry = st.session_state[live_key]
+                        if live_mode and time.monotonic() - entry['at'] >= LIVE_REFRESH_SECONDS / 2:
+                            frame = get_stock_data(*bar_args)
+                            # A failed reload keeps the bars already on screen.
+                            if not frame.empty: entry.update(frame=frame, price=None)
+                            entry['at'] = time.monotonic()
+                        return entry
+
+                    @st.fragment(run_every=live_every)
+                    def price_header():
+                        entry = current_frame(); frame = entry['frame']
+                        curr_p = entry['price'] or (frame['Close'].iloc[-1] if not frame.empty else 0.0)
+                        prev_p = frame['Close'].iloc[-2] if len(frame)>1 else curr_p
+                        chg = curr_p - prev_p
+                        pct = (chg/prev_p)*100 if prev_p else 0
+                        logo_html = f'<div style="margin-right:15px;">{get_logo_html("32px")}</div>'
+                        price_sub = f"(₩{curr_p*krw_rate:,.0f})" if curr_code!='KRW' and krw_rate else ""
+                        st.markdown(f"""
+                        <div class="finance-header">
+                            <div style="display:flex; justify-content:space-between; align-items:flex-end;">
+                                <div style="display:flex; align-items:center;">{logo_html}<div><h1 style="margin:0;">{ticker}</h1><p style="margin:0;color:#666;">{info.get('shortName', market_type)}</p></div></div>
+                                <div style="text-align:right;"><h1 style="margin:0;color:{'#00C853' if chg>=0 else '#D50000'};">{curr_code} {curr_p:,.2f}</h1><p style="margin:0;font-weight:600;color:{'#00C853' if chg>=0 else '#D50000'};">{chg:+.2f} ({pct:+.2f}%) <span style="color:#888;">{price_sub}</span></p></div>
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        return curr_p
+                    curr_p = price_header()
+
+                    @st.fragment(run_every=live_every)
+                    def price_chart():
+                        frame = current_frame()['frame']
+                        if frame.empty: st.info(txt("No_Data")); return
+                        if live_mode: st.caption(f"🔴 Live · last bar {frame.index[-1]}")
+                        st.plotly_chart(price_figure(frame, market_type, interval, show_sma, show_bb, max_points=None if full_detail else CHART_POINTS), use_container_width=True)
+
+                    import plotly.graph_objects as go  # deferred: only the terminal draws charts
+                    tabs = st.tabs([txt("Tab_Chart"), txt("Tab_AI"), txt("Tab_News"), txt("Tab_Data"), txt("Tab_Backtest")] + ([txt("Tab_Fund")] if market_type=="Stocks" else []))
+                    with tabs[0]:
+                        price_chart()
+                    with tabs[1]:
+                        fear_score, fg_label = get_fear_and_greed_proxy()
                     
-                    # RESTORED FORECAST CHART
-                    if len(data) > 30:
-                        df_ml = data[['Close']].dropna().reset_index(); df_ml['i'] = df_ml.index
-                        model = LinearRegression().fit(df_ml[['i']], df_ml['Close'])
-                        fut_x = np.arange(df_ml['i'].iloc[-1]+1, df_ml['i'].iloc[-1]+31).reshape(-1,1)
-                        pred = model.predict(fut_x)
-                        fig_p = go.Figure()
-                        fig_p.add_trace(go.Scatter(x=df_ml['i'][-50:], y=df_ml['Close'][-50:], name='History'))
-                        fig_p.add_trace(go.Scatter(x=fut_x.flatten(), y=pred, name='Forecast', line=dict(dash='dash', color='red')))
-                        fig_p.update_layout(height=250, margin=dict(l=0,r=0,t=20,b=0), template="plotly_white", title="30-Period Price Forecast"); st.plotly_chart(fig_p, use_container_width=True)
-                        st.caption(f"Projected Trend: **{curr_code} {pred[-1]:.2f}**")
-                    else: st.warning("Insufficient data for forecast")
+                        # RESTORED FORECAST CHART
+                        if len(data) > 30:
+                            closes = data['Close'].dropna().to_numpy()
+                            fc_model = st.radio("Model", ["linear", "rolling", "ewm"], horizontal=True, format_func={"linear": "Linear", "rolling": "Rolling 60", "ewm": "EW Trend"}.get, label_visibility="collapsed")
+                            pred = forecast(closes, model=fc_model, horizon=30)
+                            hist_x = np.arange(len(closes)); fut_x = np.arange(len(closes), len(closes) + 30)
+                            fig_p = go.Figure()
+                            fig_p.add_trace(go.Scatter(x=hist_x[-50:], y=closes[-50:], name='History'))
+                            fig_p.add_trace(go.Scatter(x=fut_x, y=pred, name='Forecast', line=dict(dash='dash', color='red')))
+                            fig_p.update_layout(height=250, margin=dict(l=0,r=0,t=20,b=0), template="plotly_white", title="30-Period Price Forecast"); st.plotly_chart(fig_p, use_container_width=True)
+                            st.caption(f"Projected Trend: **{curr_code} {pred[-1]:.2f}**")
+                        else: st.warning("Insufficient data for forecast")
                     
-                    report = generate_ai_report(ticker, curr_p, data['SMA'].iloc[-1], data['RSI'].iloc[-1], fear_score, fg_label, "Neutral")
-                    st.markdown(f"""<div style="background:#f8f9fa; padding:20px; border-radius:5px; border-left:4px solid #0d6efd;">{report.replace(chr(10), '<br>')}</div>""", unsafe_allow_html=True)
+                        n_pos, n_neg, n_neu, news_label = analyze_news_sentiment(news)
+                        s1, s2 = st.columns(2)
+                        s1.metric(txt("Sent"), f"{fg_label} ({int(fear_score)})")
+                        s2.metric(txt("News_Sent"), news_label, f"+{n_pos} / -{n_neg} / ={n_neu}", delta_color="off")
+                        regime_hist = get_regime_service().history()
+                        if len(regime_hist) > 1: st.line_chart(regime_hist['score'], height=120)
+                        report = generate_ai_report(ticker, curr_p, data['SMA'].iloc[-1], data['RSI'].iloc[-1], fear_score, fg_label, news_label)
+                        st.markdown(f"""<div style="background:#f8f9fa; padding:20px; border-radius:5px; border-left:4px solid #0d6efd;">{report.replace(chr(10), '<br>')}</div>""", unsafe_allow_html=True)
                     
-                with tabs[2]:
-                    if news:
-                        for i in news[:10]:
-                            t = safe_extract_news_title(i) or "News"; l = i.get('link') or "#"
-                            if 'clickThroughUrl' in i and isinstance(i['clickThroughUrl'], dict): l = i['clickThroughUrl'].get('url', l)
-                            st.markdown(f"""<a href='{l}' target='_blank' class='news-card-row'><div class='news-content'><div class='news-title'>{t}</div><div class='news-meta'>Yahoo Finance</div></div></a>""", unsafe_allow_html=True)
-                with tabs[3]:
-                    st.dataframe(data.tail(50), use_container_width=True)
-                    csv = data.to_csv().encode('utf-8')
-                    st.download_button("Download CSV", csv, f"{ticker}_data.csv", "text/csv")
-                if market_type == "Stocks":
+                    with tabs[2]:
+                        if news:
+                            for i in news[:10]:
+                                t = safe_extract_news_title(i) or "News"; l = i.get('link') or "#"
+                                if 'clickThroughUrl' in i and isinstance(i['clickThroughUrl'], dict): l = i['clickThroughUrl'].get('url', l)
+                                st.markdown(f"""<a href='{l}' target='_blank' class='news-card-row'><div class='news-content'><div class='news-title'>{t}</div><div class='news-meta'>Yahoo Finance</div></div></a>""", unsafe_allow_html=True)
+                    with tabs[3]:
+                        st.dataframe(data.tail(50), use_container_width=True)
+                        export_fmt = st.selectbox("Format", list(EXPORT_FORMATS), label_visibility="collapsed")
+                        ext, mime = EXPORT_FORMATS[export_fmt]
+                        st.download_button(f"Download {export_fmt}", lambda d=data, f=export_fmt: export_file(d, f), f"{ticker}_data.{ext}", mime)
+                        with st.expander("📦 Bulk Export"):
+                            default_bulk = ticker if st.session_state.get('guest_mode', False) else ", ".join(db.favorites(st.session_state['user_id']) or [ticker])
+                            bulk_tickers = [t.strip().upper() for t in st.text_input("Tickers", default_bulk).split(",") if t.strip()]
+                            st.download_button(f"Download {len(bulk_tickers)} tickers (.zip)", lambda ts=tuple(bulk_tickers), i=interval, p=period, f=export_fmt: export_archive(ts, lambda t: load_export_frame(t, i, p), f), f"prostock_{interval}_{ext}.zip", "application/zip")
                     with tabs[4]:
-                        st.write(f"**Sector:** {info.get('sector', 'N/A')}"); st.write(f"**Industry:** {info.get('industry', 'N/A')}")
-                        st.write("**Business Summary:**"); st.write(info.get('longBusinessSummary', 'N/A'))
-            except Exception as e: st.error(f"Error loading {ticker}: {e}")
-
-# --- MODE: FAVORITES ---
-elif mode == "Favorites":
-    st.title(txt("Watchlist"))
-    if st.session_state.get('guest_mode', False):
-        st.info("Favorites are not available in Guest Mode.")
-    else:
-        uid = st.session_state.get('user_id')
-        if uid and uid not in db: db[uid] = {'favorites': []}
-        user_favs = db[uid]['favorites']
-        if not user_favs: st.info("No favorites.")
+                        if len(data) > 30:
+                            bt_strategy = st.radio("Rule", list(BACKTEST_DEFAULTS), horizontal=True, format_func={"sma": "Price > SMA", "rsi": "RSI Reversion", "bollinger": "Bollinger Rebound"}.get)
+                            b1, b2, b3 = st.columns(3)
+                            bt_params = {"window": b1.number_input("Window", 2, 400, BACKTEST_DEFAULTS[bt_strategy]["window"])}
+                            if bt_strategy == "rsi": bt_params["lower"], bt_params["upper"] = b2.slider("Buy / Sell RSI", 5, 95, (30, 70))
+                            if bt_strategy == "bollinger": bt_params["k"] = b2.number_input("Band Width (σ)", 0.5, 4.0, 2.0, 0.5)
+                            bt_cost = b3.number_input("Cost (bps)", 0.0, 100.0, 5.0)
+                            bt_frame, bt_stats = run_backtest(data, bt_strategy, cost_bps=bt_cost, **bt_params)
+                            m1, m2, m3, m4, m5 = st.columns(5)
+                            m1.metric("Return", f"{bt_stats['total_return']:+.1%}", f"B&H {bt_frame['Buy & Hold'].iloc[-1] - 1:+.1%}", delta_color="off")
+                            m2.metric("Max Drawdown", f"{bt_stats['max_drawdown']:.1%}")
+                            m3.metric("Hit Rate", f"{bt_stats['hit_rate']:.0%}" if bt_stats['trades'] else "N/A", f"{int(bt_stats['trades'])} trades", delta_color="off")
+                            m4.metric("Sharpe", f"{bt_stats['sharpe']:.2f}")
+                            m5.metric("Turnover / yr", f"{bt_stats['turnover']:.1f}x")
+                            st.line_chart(bt_frame[["Equity", "Buy & Hold"]], height=250)
+                            st.area_chart(bt_frame["Drawdown"], height=120)
+                            with st.expander("🧪 Parameter Sweep"):
+                                if st.button("Run Sweep"):
+                                    st.dataframe(sweep_backtest(data, bt_strategy, cost_bps=bt_cost).head(20).round(4), use_container_width=True)
+                        else: st.warning("Insufficient data for backtest")
+                    if market_type == "Stocks":
+                        with tabs[5]:
+                            st.write(f"**Sector:** {info.get('sector', 'N/A')}"); st.write(f"**Industry:** {info.get('industry', 'N/A')}")
+                            st.write("**Business Summary:**"); st.write(info.get('longBusinessSummary', 'N/A'))
+                except Exception as e: st.error(f"Error loading {ticker}: {e}")
+
+    # --- MODE: FAVORITES ---
+    elif mode == "Favorites":
+        st.title(txt("Watchlist"))
+        if st.session_state.get('guest_mode', False):
+            st.info("Favorites are not available in Guest Mode.")
         else:
-            favs = []
-            for s in user_favs:
-                p, c = get_live_price(s)
-                favs.append({"Ticker": s, "Price": f"${p:,.2f}", "Change": f"{c:+.2f}%"})
-            st.dataframe(pd.DataFrame(favs), use_container_width=True)
-
-# --- MODE: MEDIA ---
-elif mode == "Media & News":
-    st.title(txt("Media_Center"))
-    st.subheader(txt("Quick"))
-    qa1, qa2, qa3 = st.columns(3)
-    with qa1: st.link_button("🌐 Investing.com", "https://www.investing.com", use_container_width=True)
-    with qa2: st.link_button("📈 Yahoo Finance", "https://finance.yahoo.com", use_container_width=True)
-    with qa3: st.link_button("🔎 Google Finance", "https://www.google.com/finance", use_container_width=True)
-    st.markdown("---")
-    c1, c2 = st.columns(2)
-    with c1: st.subheader("Bloomberg TV"); st.video("https://www.youtube.com/watch?v=iEpJwprxDdk"); st.subheader("Sky News"); st.video("https://www.youtube.com/watch?v=YDvsBbKfLPA")
-    with c2: st.subheader("CNA Asia"); st.video("https://www.youtube.com/watch?v=XWq5kBlakcQ"); st.subheader("ABC Australia"); st.video("https://www.youtube.com/watch?v=iipR5yUp36o")
-    st.markdown("---")
-    def get_feed(url):
-        try:
-            r = requests.get(url, timeout=3); root = ET.fromstring(r.content)
-            return [{'title':i.find('title').text, 'link':i.find('link').text} for i in root.findall('.//item')[:5]]
-        except: return []
-    t1, t2, t3 = st.tabs(["CNBC", "BBC", "CNN"])
-    with t1:
-        for n in get_feed("https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664"): st.markdown(f"<div class='news-list-item'><a href='{n['link']}' target='_blank' class='news-link'>{n['title']}</a></div>", unsafe_allow_html=True)
-    with t2:
-        for n in get_feed("http://feeds.bbci.co.uk/news/business/rss.xml"): st.markdown(f"<div class='news-list-item'><a href='{n['link']}' target='_blank' class='news-link'>{n['title']}</a></div>", unsafe_allow_html=True)
-    with t3:
-        for n in get_feed("http://rss.cnn.com/rss/money_latest.rss"): st.markdown(f"<div class='news-list-item'><a href='{n['link']}' target='_blank' class='news-link'>{n['title']}</a></div>", unsafe_allow_html=True)
-
-# --- MODE: MAP ---
-elif mode == "Map":
-    st.title("🗺️ S&P 500 Map")
-    components.html("""<div class="tradingview-widget-container"><div class="tradingview-widget-container__widget"></div><script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-stock-heatmap.js" async>{"exchanges": [],"dataSource": "SPX500","grouping": "sector","blockSize": "market_cap_basic","blockColor": "change","locale": "en","symbolUrl": "","colorTheme": "light","hasTopBar": false,"isDataSetEnabled": false,"isZoomEnabled": true,"hasSymbolTooltip": true,"width": "100%","height": "800"}</script></div>""", height=810)
+            uid = st.session_state.get('user_id')
+            user_favs = db.favorites(uid) if uid else []
+            if not user_favs: st.info("No favorites.")
+            else:
+                favs = []
+                fav_quotes = get_live_prices(user_favs)
+                for s in user_favs:
+                    q = fav_quotes[s]
+                    favs.append({"Ticker": s, "Price": f"${q[0]:,.2f}" if q else "—", "Change": f"{q[1]:+.2f}%" if q else "—"})
+                st.dataframe(pd.DataFrame(favs), use_container_width=True)
+
+    # --- MODE: MEDIA ---
+    elif mode == "Media & News":
+        st.title(txt("Media_Center"))
+        st.subheader(txt("Quick"))
+        qa1, qa2, qa3 = st.columns(3)
+        with qa1: st.link_button("🌐 Investing.com", "https://www.investing.com", use_container_width=True)
+        with qa2: st.link_button("📈 Yahoo Finance", "https://finance.yahoo.com", use_container_width=True)
+        with qa3: st.link_button("🔎 Google Finance", "https://www.google.com/finance", use_container_width=True)
+        st.markdown("---")
+        c1, c2 = st.columns(2)
+        with c1: st.subheader("Bloomberg TV"); st.video("https://www.youtube.com/watch?v=iEpJwprxDdk"); st.subheader("Sky News"); st.video("https://www.youtube.com/watch?v=YDvsBbKfLPA")
+        with c2: st.subheader("CNA Asia"); st.video("https://www.youtube.com/watch?v=XWq5kBlakcQ"); st.subheader("ABC Australia"); st.video("https://www.youtube.com/watch?v=iipR5yUp36o")
+        st.markdown("---")
+        media_feeds = fetch_feeds(["CNBC", "BBC", "CNN"], 5)
+        for tab, source in zip(st.tabs(["CNBC", "BBC", "CNN"]), ["CNBC", "BBC", "CNN"]):
+            with tab:
+                for n in media_feeds[source]: st.markdown(f"<div class='news-list-item'><a href='{n['link']}' target='_blank' class='news-link'>{n['title']}</a></div>", unsafe_allow_html=True)
+
+    # --- MODE: MAP ---
+    elif mode == "Map":
+        st.title("🗺️ S&P 500 Map")
+        components.html("""<div class="tradingview-widget-container"><div class="tradingview-widget-container__widget"></div><script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-stock-heatmap.js" async>{"exchanges": [],"dataSource": "SPX500","grouping": "sector","blockSize": "market_cap_basic","blockColor": "change","locale": "en","symbolUrl": "","colorTheme": "light","hasTopBar": false,"isDataSetEnabled": false,"isZoomEnabled": true,"hasSymbolTooltip": true,"width": "100%","height": "800"}</script></div>""", height=810)
     
-    st.markdown("---")
-    st.subheader("⚡ Instant Access: Top 30 Market Movers")
-    top_tickers = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "BRK-B", "LLY", "AVGO", "JPM", "V", "UNH", "MA", "XOM", "JNJ", "PG", "HD", "COST", "ABBV", "MRK", "CRM", "AMD", "PEP", "KO", "BAC", "WMT", "CVX", "TMO", "CSCO"]
-    cols = st.columns(6)
-    for i, t in enumerate(top_tickers):
-        with cols[i % 6]:
-            try: 
-                d = yf.Ticker(t).history(period="1d")
-                p = d['Close'].iloc[-1]; c = ((p - d['Open'].iloc[0]) / d['Open'].iloc[0]) * 100
-                label = f"{t}\n{c:+.1f}%"
-            except: label = t
-            if st.button(label, key=f"map_btn_{t}", use_container_width=True):
-                st.session_state['ticker_search'] = t; st.session_state['mode'] = "Asset Terminal"; st.rerun()
+        st.markdown("---")
+        st.subheader("⚡ Instant Access: Top 30 Market Movers")
+        movers = get_movers_service().top(30)
+        cols = st.columns(6)
+        for i, (t, c) in enumerate(movers):
+            with cols[i % 6]:
+                label = f"{t}\n{c:+.1f}%" if c is not None else t
+                if st.button(label, key=f"map_btn_{t}", use_container_width=True):
+                    st.session_state['ticker_search'] = t; st.session_state['mode'] = "Asset Terminal"; st.rerun()
+
+    # --- MODE: SCREENER ---
+    elif mode == "Screener":
+        st.title(txt("Screener"))
+        u1, u2 = st.columns([1, 2])
+        with u1: universe_src = st.radio("Universe", ["Market Movers", "Custom"], horizontal=True)
+        with u2:
+            if universe_src == "Custom": universe = [t.strip().upper() for t in st.text_input("Tickers", "AAPL, MSFT, NVDA, 005930.KS, BTC-USD").split(",") if t.strip()]
+            else: universe = get_movers_service().universe; st.caption(f"{len(universe)} tickers")
+        f1, f2, f3, f4 = st.columns([1, 2, 1, 1])
+        with f1: preset = st.selectbox("Preset", ["Custom"] + list(SCREEN_PRESETS))
+        with f2: screen_expr = st.text_input("Condition", SCREEN_PRESETS.get(preset, ""), placeholder="RSI < 30 and Price < BB_Lower")
+        with f3: screen_sort = st.selectbox("Sort By", SCREEN_COLUMNS, index=SCREEN_COLUMNS.index("RSI"))
+        with f4: screen_desc = st.checkbox("Descending")
+        with st.spinner(f"Scanning {len(universe)} tickers..."):
+            screen_table = scan_universe(universe)
+        try: hits = screen(screen_table, screen_expr, screen_sort, not screen_desc)
+        except ValueError as e: st.error(str(e)); hits = screen(screen_table, "", screen_sort, not screen_desc)
+        st.caption(f"{len(hits)} of {len(screen_table)} match")
+        picked = st.dataframe(hits.round(2), use_container_width=True, on_select="rerun", selection_mode="single-row")
+        if picked.selection.rows:
+            st.session_state['ticker_search'] = hits.index[picked.selection.rows[0]]; st.session_state['mode'] = "Asset Terminal"; st.rerun()
+finally:
+    # st.rerun() and st.stop() end a run by raising; the page span still closes.
+    page_span.stop()
+dismiss_splash()
+render_debug_panel(rerun_trace)
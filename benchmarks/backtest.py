@@ -0,0 +1,82 @@
+"""Backtest throughput in bars per second.
+
+Times a single rule, then a parameter sweep run inline and on a process
+pool. Throughput counts every (parameter set, bar) pair evaluated. The
+break-even entry times a spawned pool's start-up against the inline cost per
+cell and reports the grid size from which ``--workers`` processes pay off,
+next to the ``PARALLEL_CELLS`` threshold ``sweep`` uses.
+
+    python benchmarks/backtest.py [--bars 5000] [--combos 2000] [--workers 4] [--output backtest.json]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.backtest import PARALLEL_CELLS, _run_chunk, backtest, sweep  # noqa: E402
+
+
+def synthetic_closes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))}, index=pd.bdate_range(end="2024-12-31", periods=n))
+
+
+def grid_for(strategy, combos):
+    if strategy == "sma": return {"window": list(range(2, 2 + combos))}
+    if strategy == "bollinger":
+        ks = [1.5, 2.0, 2.5, 3.0]
+        return {"window": list(range(5, 5 + max(combos // len(ks), 1))), "k": ks}
+    side = max(int(round(combos ** (1 / 3))), 2)
+    return {"window": list(range(5, 5 + side)), "lower": list(np.linspace(15, 45, side)), "upper": list(np.linspace(55, 85, side))}
+
+
+def break_even(data, workers, combos):
+    close = data['Close'].to_numpy(dtype="float64")
+    t = time.perf_counter()
+    table = sweep(data, "sma", grid_for("sma", combos), workers=1)
+    cell = (time.perf_counter() - t) / (len(table) * len(close))
+    t = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(_run_chunk, *zip(*[(close[:300], "sma", [(5,)], 5, 252)] * workers)))
+    start = time.perf_counter() - t
+    return {"workers": workers, "ns_per_cell": cell * 1e9, "pool_start_seconds": start,
+            "break_even_cells": start / (cell * (1 - 1 / workers)), "parallel_cells": PARALLEL_CELLS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=5000)
+    parser.add_argument("--combos", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    data = synthetic_closes(args.bars)
+    results = []
+    for strategy in ("sma", "rsi", "bollinger"):
+        t = time.perf_counter()
+        backtest(data, strategy)
+        single = time.perf_counter() - t
+        row = {"strategy": strategy, "bars": args.bars, "single_seconds": single}
+        for label, workers in (("inline", 1), ("parallel", args.workers)):
+            t = time.perf_counter()
+            table = sweep(data, strategy, grid_for(strategy, args.combos), workers=workers)
+            seconds = time.perf_counter() - t
+            row[label] = {"workers": workers, "combos": len(table), "seconds": seconds, "bars_per_second": len(table) * args.bars / seconds}
+        results.append(row)
+    results.append({"break_even": break_even(data, max(args.workers, 2), args.combos)})
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
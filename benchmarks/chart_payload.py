@@ -0,0 +1,59 @@
+"""Chart payload size and build time versus bar count.
+
+Builds the terminal's price figure for synthetic minute bars with and
+without server-side downsampling, then reports the serialized JSON size and
+the time to build and serialize it.
+
+    python benchmarks/chart_payload.py [--bars 1000 10000 100000] [--output chart.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.chart_data import MAX_POINTS, price_figure  # noqa: E402
+from prostock.indicators import compute_all  # noqa: E402
+
+
+def synthetic_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    spread = np.abs(rng.normal(0, 0.0005, n)) * close
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="min", tz="America/New_York")
+    return pd.DataFrame({"Open": np.r_[close[0], close[:-1]], "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": rng.integers(100, 10000, n).astype("float64")}, index=idx)
+
+
+def measure(data, market_type, max_points):
+    t = time.perf_counter()
+    payload = price_figure(data, market_type, "1m", show_sma=True, show_bb=True, max_points=max_points).to_json()
+    return {"bytes": len(payload.encode("utf-8")), "seconds": time.perf_counter() - t}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    results = []
+    for n in args.bars:
+        data = synthetic_bars(n)
+        data = data.join(compute_all(data, intraday=True))
+        for market_type in ("Stocks", "Crypto"):
+            results.append({"bars": n, "market_type": market_type,
+                            "full": measure(data, market_type, None),
+                            "downsampled": measure(data, market_type, MAX_POINTS)})
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Offline fixtures for the benchmark suite: synthetic market data and feeds.
+
+``SyntheticProvider`` answers every provider call with deterministic
+random-walk OHLCV (seeded by ticker), canned fundamentals and canned
+headlines, shaped like yfinance's responses. ``FeedSession`` stands in for
+the feed aggregator's ``requests.Session`` and serves a canned RSS document.
+"""
+import os
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.providers import MarketDataProvider  # noqa: E402
+
+FREQ = {"1m": "min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min", "60m": "h", "1h": "h", "4h": "4h", "1d": "D", "1wk": "7D"}
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 91, "6mo": 182, "1y": 365, "2y": 730, "5y": 1826, "10y": 3652, "ytd": 365, "max": 3652}
+HEADLINES = [
+    "Stocks rally as inflation cools more than expected",
+    "Chipmakers surge on record AI demand",
+    "Oil slides as supply fears ease",
+    "Bank shares slump after weak earnings guidance",
+    "Investors cautious ahead of central bank decision",
+    "Tech giants post strong quarterly growth",
+    "Retail sales disappoint, raising recession worries",
+    "Gold steadies near record high",
+    "Crypto markets rebound after sharp selloff",
+    "Korean exporters gain on weaker won",
+]
+
+
+def synthetic_ohlcv(ticker, n, freq="D", end=None, seed=None):
+    """Deterministic OHLCV random walk of ``n`` bars ending at ``end``."""
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()) if seed is None else seed)
+    end = pd.Timestamp(end or pd.Timestamp.now(tz="UTC")).floor("min")
+    idx = pd.date_range(end=end, periods=n, freq=freq)
+    if freq in ("D", "7D"): idx = idx.tz_localize(None).normalize()
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.004, n)) * close
+    return pd.DataFrame({"Open": np.r_[close[0], close[:-1]], "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": rng.integers(1_000, 1_000_000, n).astype("float64")}, index=idx)
+
+
+def canned_news(ticker, n=10):
+    return [{"id": f"{ticker}-{i}", "content": {"title": f"{HEADLINES[i % len(HEADLINES)]} ({ticker})",
+                                                 "canonicalUrl": {"url": f"https://news.example/{ticker}/{i}"}}} for i in range(n)]
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Provider with no network: every ticker has a seeded random-walk history."""
+
+    def __init__(self, max_bars=5000):
+        self.max_bars = max_bars
+
+    def _frame(self, ticker, interval="1d", period=None, start=None, end=None, **kwargs):
+        freq = FREQ.get(interval, "D")
+        if start is not None: days = (pd.Timestamp(end or pd.Timestamp.now()) - pd.Timestamp(start)).days + 1
+        else: days = PERIOD_DAYS.get(period or "1mo", 30)
+        n = int(pd.Timedelta(days=days) / pd.Timedelta(freq if freq[0].isdigit() else f"1{freq}"))
+        return synthetic_ohlcv(ticker, max(2, min(self.max_bars, n)), freq)
+
+    def download(self, tickers, **kwargs):
+        names = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {t: self._frame(t, **kwargs) for t in names}
+        data = pd.concat(frames, axis=1)
+        # yfinance returns (Price, Ticker) columns, even for one ticker.
+        return data.swaplevel(0, 1, axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+    def history(self, ticker, **kwargs): return self._frame(ticker, **kwargs)
+
+    def info(self, ticker):
+        last = float(synthetic_ohlcv(ticker, 2, "D")["Close"].iloc[-1])
+        return {"shortName": f"{ticker} Corp.", "currency": "KRW" if ticker.endswith((".KS", ".KQ")) else "USD",
+                "currentPrice": last, "previousClose": last * 0.99, "sector": "Technology", "industry": "Software",
+                "longBusinessSummary": f"{ticker} is a synthetic company used for benchmarking."}
+
+    def news(self, ticker): return canned_news(ticker)
+
+
+def rss_document(n=20):
+    items = "".join(f"<item><title>{HEADLINES[i % len(HEADLINES)]} #{i}</title><link>https://feed.example/{i}</link></item>" for i in range(n))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Fixture</title>{items}</channel></rss>'.encode("utf-8")
+
+
+class _Response:
+    def __init__(self, body):
+        self.status_code, self.headers, self._body = 200, {"ETag": '"fixture"'}, body
+
+    def iter_content(self, size):
+        for i in range(0, len(self._body), size): yield self._body[i:i + size]
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): pass
+    def close(self): pass
+
+
+class FeedSession:
+    """Minimal ``requests.Session`` stand-in serving the same RSS document for every URL."""
+
+    def __init__(self, items=20):
+        self.body = rss_document(items)
+
+    def get(self, url, **kwargs): return _Response(self.body)
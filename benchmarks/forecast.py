@@ -0,0 +1,55 @@
+"""Forecast model backtest and batch-solve timing on synthetic random walks.
+
+    python benchmarks/forecast.py [--series 500] [--bars 750] [--output forecast.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.forecast import MODELS, backtest, batch_forecast, forecast  # noqa: E402
+
+
+def random_walks(count, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0, 0.0005, (count, 1))
+    return 100 * np.exp(np.cumsum(rng.normal(drift, 0.015, (count, bars)), axis=1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=750)
+    parser.add_argument("--folds", type=int, default=10)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    paths = random_walks(args.series, args.bars)
+    results = {"series": args.series, "bars": args.bars, "models": {}}
+    for model in MODELS:
+        reports = [backtest(p, models=[model], folds=args.folds)[model] for p in paths]
+        t = time.perf_counter()
+        for p in paths: forecast(p, model=model)
+        single = time.perf_counter() - t
+        t = time.perf_counter()
+        batch_forecast({i: p for i, p in enumerate(paths)}, model=model)
+        batch = time.perf_counter() - t
+        results["models"][model] = {
+            "mae": float(np.mean([r["mae"] for r in reports])),
+            "mape": float(np.mean([r["mape"] for r in reports])),
+            "backtest_s": float(sum(r["seconds"] for r in reports)),
+            "per_series_fit_s": single,
+            "batch_fit_s": batch,
+        }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
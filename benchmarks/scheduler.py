@@ -0,0 +1,90 @@
+"""Session stampede against a simulated upstream: direct calls versus the scheduler.
+
+Every page session asks for the same homepage symbols at once, the way reruns
+line up when a short cache expires, and every background session prefetches
+symbols of its own. The session viewing a chart asks for its ticker once
+the backlog has built up. The simulated upstream sleeps ``--latency`` per
+call, and any call beyond ``--rate`` in a sliding second counts as
+throttled (a 429 in real life). ``fifo`` is the scheduler with every
+request at the same priority, to show what the priorities buy.
+
+    python benchmarks/scheduler.py [--sessions 40] [--symbols 8] [--prefetch 3] [--latency 0.05] [--rate 20] [--output scheduler.json]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.scheduler import BACKGROUND, INTERACTIVE, PAGE, UpstreamScheduler  # noqa: E402
+
+
+class Upstream:
+    def __init__(self, latency, rate):
+        self.latency, self.rate = latency, rate
+        self.calls = self.throttled = 0
+        self.recent = deque()
+        self.lock = threading.Lock()
+
+    def get(self, symbol):
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and self.recent[0] <= now - 1: self.recent.popleft()
+            self.recent.append(now)
+            self.calls += 1
+            self.throttled += len(self.recent) > self.rate
+        time.sleep(self.latency)
+        return symbol
+
+
+def run(mode, args):
+    upstream = Upstream(args.latency, args.rate)
+    # Configured a little under the upstream's limit, with no burst, so timer
+    # jitter cannot push a sliding second over it.
+    sched = UpstreamScheduler(workers=8, default_limit=(args.rate * 0.9, 1))
+    cards = [f"CARD{i}" for i in range(args.symbols)]
+    waits = {}
+
+    def session(symbols, level, delay=0.0):
+        time.sleep(delay)
+        t = time.perf_counter()
+        for s in symbols:
+            if mode == "direct": upstream.get(s)
+            else: sched.call("upstream", lambda s=s: upstream.get(s), key=s, level=PAGE if mode == "fifo" else level)
+        waits.setdefault(level, []).append(time.perf_counter() - t)
+
+    threads = []
+    for i in range(args.sessions):
+        threads.append(threading.Thread(target=session, args=(cards, PAGE)))
+        threads.append(threading.Thread(target=session, args=([f"BG{i}-{j}" for j in range(args.prefetch)], BACKGROUND)))
+    threads.append(threading.Thread(target=session, args=(["VIEWED"], INTERACTIVE, 0.1)))
+    t = time.perf_counter()
+    for th in threads: th.start()
+    for th in threads: th.join()
+    return {"mode": mode, "upstream_calls": upstream.calls, "throttled": upstream.throttled, "wall_s": time.perf_counter() - t,
+            "interactive_wait_s": waits[INTERACTIVE][0], "page_wait_max_s": max(waits[PAGE]), "background_wait_max_s": max(waits[BACKGROUND])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--prefetch", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=20)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    results = [run(mode, args) for mode in ("direct", "fifo", "scheduled")]
+    for r in results:
+        print(f"{r['mode']:>9}: {r['upstream_calls']:5d} calls  {r['throttled']:5d} throttled  wall {r['wall_s']:.2f}s  "
+              f"interactive {r['interactive_wait_s']:.2f}s  page {r['page_wait_max_s']:.2f}s  background {r['background_wait_max_s']:.2f}s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
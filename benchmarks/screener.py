@@ -0,0 +1,50 @@
+"""Screener compute time: one wide-panel pass versus per-ticker indicators.
+
+    python benchmarks/screener.py [--tickers 30 500] [--bars 252] [--output screener.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.indicators import compute_all  # noqa: E402
+from prostock.screener import compute_panel, screen  # noqa: E402
+
+
+def synthetic_panel(tickers, bars, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (bars, tickers)), axis=0))
+    return pd.DataFrame(closes, index=pd.bdate_range(end="2024-12-31", periods=bars), columns=[f"T{i:04d}" for i in range(tickers)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[30, 500])
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    results = []
+    for n in args.tickers:
+        panel = synthetic_panel(n, args.bars)
+        t = time.perf_counter()
+        table = compute_panel(panel)
+        hits = screen(table, "RSI < 30 and Price < BB_Lower", "RSI")
+        wide = time.perf_counter() - t
+        t = time.perf_counter()
+        for col in panel.columns: compute_all(panel[[col]].rename(columns={col: "Close"}))
+        per_ticker = time.perf_counter() - t
+        results.append({"tickers": n, "bars": args.bars, "matches": len(hits), "panel_seconds": wide, "per_ticker_seconds": per_ticker})
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cold-start benchmark: import cost and time to first render.
+
+Every measurement runs in a fresh interpreter so nothing is already in
+``sys.modules``. Market data comes from the replay provider, so the run needs
+no network access; pages that would fetch uncached data render their empty
+states instead.
+
+    python benchmarks/startup.py [--repeat 5] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+IMPORTS = {
+    "shell": "import streamlit, pandas, numpy, requests",
+    "prostock": "import prostock.quotes, prostock.movers, prostock.bar_store, prostock.feeds, prostock.forecast, prostock.indicators, prostock.sentiment, prostock.snapshot",
+    "plotly": "import plotly.graph_objects",
+    "textblob": "import textblob",
+}
+
+RENDER = """
+import time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+for k, v in {state!r}.items(): at.session_state[k] = v
+t = time.perf_counter(); at.run(); elapsed = time.perf_counter() - t
+assert not at.exception, [e.value for e in at.exception]
+print(elapsed)
+"""
+
+PAGES = {
+    "login": {},
+    "guest_home": {"guest_mode": True},
+}
+
+
+def _run(code):
+    # The child runs in a scratch directory so the database and caches it
+    # creates never touch the checkout; recordings are still read from it.
+    with tempfile.TemporaryDirectory(prefix="prostock-startup-") as scratch:
+        env = dict(os.environ, PROSTOCK_PROVIDER="replay", PYTHONPATH=ROOT, PROSTOCK_DB=os.path.join(scratch, "prostock.db"),
+                   PROSTOCK_BAR_STORE=os.path.join(scratch, "bars"),
+                   PROSTOCK_RECORD_DIR=os.environ.get("PROSTOCK_RECORD_DIR", os.path.join(ROOT, ".prostock_cache", "recordings")))
+        out = subprocess.run([sys.executable, "-c", code], cwd=scratch, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_import(stmt):
+    return _run(f"import time\nt = time.perf_counter()\n{stmt}\nprint(time.perf_counter() - t)")
+
+
+def time_first_render(state):
+    return _run(RENDER.format(app=APP, state=state))
+
+
+def summarize(samples):
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "max_s": max(samples), "samples": samples}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    results = {"python": sys.version.split()[0], "imports": {}, "first_render": {}}
+    for name, stmt in IMPORTS.items():
+        results["imports"][name] = summarize([time_import(stmt) for _ in range(args.repeat)])
+    for name, state in PAGES.items():
+        results["first_render"][name] = summarize([time_first_render(state) for _ in range(args.repeat)])
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
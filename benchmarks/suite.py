@@ -0,0 +1,166 @@
+"""Offline benchmark suite: data path, compute steps and full-page renders.
+
+Everything runs against ``fixtures.SyntheticProvider`` and a canned RSS
+session, inside a scratch directory (its own SQLite DB, bar store and
+caches), so no network is touched. The compute cases time the functions the
+app delegates to: bar normalization and shared store views
+(``get_stock_data``), the indicator engine, headline scoring
+(``analyze_news_sentiment``) and the forecast models. Page cases render
+each mode headlessly through Streamlit's AppTest. The first sample of a
+page is the cold render.
+
+    python benchmarks/suite.py [--bars 500 5000] [--interval 1m] [--repeat 5] [--output run.json]
+    python benchmarks/suite.py --baseline run.json [--threshold 1.25] [--fail-on-regression]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+PAGES = ["Home", "Asset Terminal", "Favorites", "Map"]
+FAVORITES = ["AAPL", "NVDA", "005930.KS", "BTC-USD", "GC=F"]
+USER_ID = "123456"
+PERIOD_FOR = {"1m": "5d", "5m": "1mo", "15m": "1mo", "1h": "1y", "4h": "2y", "1d": "10y", "1wk": "10y"}
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(samples):
+    return {"median_s": statistics.median(samples), "min_s": min(samples), "max_s": max(samples), "samples": samples}
+
+
+def measure(fn, repeat, setup=None):
+    samples = []
+    for i in range(repeat):
+        arg = setup(i) if setup else i
+        t = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - t)
+    return summarize(samples)
+
+
+def compute_cases(args, provider):
+    from fixtures import HEADLINES, rss_document
+    from prostock.bar_store import BarStore, normalize
+    from prostock.feeds import parse_stream
+    from prostock.forecast import MODELS, forecast
+    from prostock.indicators import IndicatorEngine
+    from prostock.sentiment import score_headlines, summarize as summarize_tone
+
+    results = {}
+    for bars in args.bars:
+        provider.max_bars = bars
+        raw = provider.download("AAPL", interval=args.interval, period=PERIOD_FOR.get(args.interval, "1y"))
+        frame = normalize(raw)
+        results[f"normalize[{bars}]"] = measure(lambda _: normalize(raw), args.repeat)
+        store = BarStore(root=os.path.join(os.getcwd(), f"bars-{bars}"), min_refresh=float("inf"))
+        window = {"interval": args.interval, "period": PERIOD_FOR.get(args.interval, "1y"), "technicals": True}
+        store.get("AAPL", **window)
+        results[f"bars.view[{bars}]"] = measure(lambda _: store.get("AAPL", **window), args.repeat)
+        results[f"indicators.cold[{bars}]"] = measure(lambda _: IndicatorEngine().compute(frame, key="AAPL", interval=args.interval), args.repeat)
+
+        def warm(i):
+            engine = IndicatorEngine()
+            engine.compute(frame.iloc[:-1], key="AAPL", interval=args.interval)
+            return engine
+        results[f"indicators.incremental[{bars}]"] = measure(lambda e: e.compute(frame, key="AAPL", interval=args.interval), args.repeat, warm)
+        closes = frame["Close"].to_numpy()
+        for model in MODELS:
+            # A different series per sample so the memo never answers.
+            results[f"forecast.{model}[{bars}]"] = measure(lambda i: forecast(closes * (1 + i * 1e-9), model=model), args.repeat)
+    news = [f"{HEADLINES[i % len(HEADLINES)]} {i}" for i in range(args.headlines)]
+    results["sentiment.cold"] = measure(lambda i: summarize_tone(score_headlines([f"{t} run{i}" for t in news])), args.repeat)
+    results["sentiment.warm"] = measure(lambda _: summarize_tone(score_headlines(news)), args.repeat)
+    doc = rss_document(args.headlines)
+    results["feeds.parse"] = measure(lambda _: parse_stream((doc[i:i + 8192] for i in range(0, len(doc), 8192)), 50), args.repeat)
+    return results
+
+
+def page_cases(args):
+    from streamlit.testing.v1 import AppTest
+    from prostock.storage import UserStore
+
+    store = UserStore()
+    store.ensure_user(USER_ID)
+    for t in FAVORITES: store.add_favorite(USER_ID, t)
+    results = {}
+    for page in args.pages:
+        samples = []
+        for _ in range(args.repeat):
+            at = AppTest.from_file(APP, default_timeout=args.timeout)
+            for k, v in {"splash_shown": True, "logged_in": True, "guest_mode": False, "user_id": USER_ID, "mode": page, "ticker_search": "AAPL"}.items():
+                at.session_state[k] = v
+            t = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - t)
+            if at.exception: raise RuntimeError(f"{page}: {[e.value for e in at.exception]}")
+        results[f"page:{page}"] = {**summarize(samples[1:] or samples), "cold_s": samples[0]}
+    return results
+
+
+def compare(results, baseline, threshold):
+    rows = {}
+    for name, cur in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base: continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        status = "regressed" if ratio > threshold else "improved" if ratio < 1 / threshold else "ok"
+        rows[name] = {"baseline_s": base["median_s"], "current_s": cur["median_s"], "ratio": ratio, "status": status}
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--headlines", type=int, default=50)
+    parser.add_argument("--pages", nargs="*", default=PAGES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+    output = os.path.abspath(args.output) if args.output else None
+
+    scratch = tempfile.mkdtemp(prefix="prostock-bench-")
+    os.chdir(scratch)
+    os.environ.update(PROSTOCK_DB=os.path.join(scratch, "bench.db"), PROSTOCK_BAR_STORE=os.path.join(scratch, "bars"),
+                      STREAMLIT_LOGGER_LEVEL="error")
+    from fixtures import FeedSession, SyntheticProvider
+    import prostock.feeds
+    from prostock.providers import set_provider
+    provider = SyntheticProvider()
+    set_provider(provider)
+    prostock.feeds.AGGREGATOR.session = FeedSession()
+
+    results = compute_cases(args, provider)
+    provider.max_bars = max(args.bars)
+    results.update(page_cases(args))
+    report = {"meta": {"python": sys.version.split()[0], "platform": platform.platform(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}},
+              "results": results}
+    if baseline: report["comparison"] = compare(results, baseline, args.threshold)
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+    if baseline:
+        for name, row in report["comparison"].items():
+            print(f"{row['status']:>9}  {row['ratio']:6.2f}x  {name}", file=sys.stderr)
+        if args.fail_on_regression and any(r["status"] == "regressed" for r in report["comparison"].values()): sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
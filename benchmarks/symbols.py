@@ -0,0 +1,72 @@
+"""Symbol index build, load and query latency versus listing size.
+
+Pads the bundled listing with synthetic rows up to each size, compiles the
+index, reloads it from the compact file and times prefix and fuzzy queries.
+
+    python benchmarks/symbols.py [--rows 1000 20000 60000] [--output symbols.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prostock.symbols import LISTING, SymbolIndex, read_listing  # noqa: E402
+
+QUERIES = ["a", "ap", "aapl", "nvid", "samsung", "삼성", "bitcon", "microsfot", "usd/krw", "gold", "qzxv"]
+WORDS = ["alpha", "beta", "global", "energy", "micro", "systems", "capital", "bio", "pharma", "digital", "pacific", "metals"]
+
+
+def synthetic_rows(n, seed=0):
+    rows = read_listing([LISTING])
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    seen = {r[0] for r in rows}
+    while len(rows) < n:
+        sym = "".join(rng.choice(letters, rng.integers(2, 6)))
+        if sym in seen: continue
+        seen.add(sym)
+        name = " ".join(rng.choice(WORDS, 2)).title() + " Inc."
+        rows.append((sym, name, "NASDAQ", "equity", []))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 20000, 60000])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output")
+    args = parser.parse_args(argv)
+    results = []
+    for n in args.rows:
+        rows = synthetic_rows(n)
+        t = time.perf_counter()
+        index = SymbolIndex.build(rows)
+        build = time.perf_counter() - t
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "symbols.npz")
+            index.save(path)
+            t = time.perf_counter()
+            index = SymbolIndex.load(path)
+            load = time.perf_counter() - t
+            size = os.path.getsize(path)
+        queries = {}
+        for q in QUERIES:
+            t = time.perf_counter()
+            for _ in range(args.repeat): index.search(q)
+            queries[q] = (time.perf_counter() - t) / args.repeat * 1000
+        results.append({"rows": len(rows), "terms": len(index.keys), "file_bytes": size, "build_seconds": build,
+                        "load_seconds": load, "query_ms": queries, "max_query_ms": max(queries.values())})
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
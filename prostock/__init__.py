@@ -0,0 +1 @@
+"""Data and compute services behind the ProStock Streamlit app."""
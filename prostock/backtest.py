@@ -0,0 +1,187 @@
+"""Vectorized backtests of the terminal's indicator rules.
+
+A rule turns a close series into a 0/1 position series; every parameter set
+of a sweep is one row of a 2-D array, so indicators, positions, equity,
+drawdowns and per-trade statistics for the whole grid are computed with
+array operations over the full history. Positions decided on a bar's close
+earn the next bar's return, so there is no look-ahead. ``sweep`` splits
+grids with enough work to pay for process start-up into chunks and runs
+them on a process pool.
+"""
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prostock.indicators import RSI_WINDOW, SMA_WINDOW
+from prostock.telemetry import timed
+
+COST_BPS = 5
+CHUNK_SIZE = 256
+# Grid cells (combinations x bars) from which a sweep uses every core. A cell
+# costs 30-45ns and a spawned pool, whose workers import numpy and pandas
+# afresh, about 0.5s to start, so on two cores a sweep needs some 20M cells
+# (2,000 combinations of 10,000 bars) to come out ahead; the default grids on
+# five days of US minute bars are nearer 250k. benchmarks/backtest.py reports
+# the break-even point measured on the host.
+PARALLEL_CELLS = 20_000_000
+YEAR_SECONDS = 365.25 * 86400
+METRICS = ["total_return", "cagr", "sharpe", "max_drawdown", "hit_rate", "trades", "turnover", "exposure"]
+DEFAULTS = {
+    "sma": {"window": SMA_WINDOW},
+    "rsi": {"window": RSI_WINDOW, "lower": 30, "upper": 70},
+    "bollinger": {"window": SMA_WINDOW, "k": 2.0},
+}
+GRIDS = {
+    "sma": {"window": list(range(5, 205, 5))},
+    "rsi": {"window": [7, 10, 14, 21, 28], "lower": [20, 25, 30, 35, 40], "upper": [60, 65, 70, 75, 80]},
+    "bollinger": {"window": [10, 15, 20, 30, 40, 50], "k": [1.5, 2.0, 2.5, 3.0]},
+}
+
+
+def _rolling(x, windows):
+    """Rolling sums of ``x`` for each window at once; shape (len(windows), len(x))."""
+    windows = np.asarray(windows, dtype="int64")[:, None]
+    cs = np.r_[0.0, np.cumsum(x)]
+    end = np.arange(1, len(x) + 1)[None, :]
+    start = end - windows
+    out = cs[end] - cs[np.clip(start, 0, None)]
+    return np.where(start >= 0, out, np.nan)
+
+
+def _latch(enter, exit):
+    """1 from an ``enter`` bar until the next ``exit`` bar, per row."""
+    state = np.where(enter, 1.0, np.where(exit, 0.0, np.nan))
+    idx = np.where(np.isnan(state), 0, np.arange(state.shape[1]))
+    idx = np.maximum.accumulate(idx, axis=1)
+    held = np.take_along_axis(state, idx, axis=1)
+    return np.nan_to_num(held)
+
+
+def sma_positions(close, window):
+    """Long while price is above its SMA (the report's Bullish call)."""
+    with np.errstate(invalid="ignore"):
+        return (close > _rolling(close, window) / np.asarray(window)[:, None]).astype("float64")
+
+
+def rsi_positions(close, window, lower, upper):
+    """Buy when RSI drops below ``lower``, sell once it rises above ``upper``."""
+    d = np.diff(close, prepend=np.nan)
+    gain, loss = np.clip(np.nan_to_num(d), 0, None), np.clip(-np.nan_to_num(d), 0, None)
+    window = np.asarray(window)
+    # Same simple-average RSI as the terminal; the first bar has no change.
+    g, l = _rolling(gain[1:], window) / window[:, None], _rolling(loss[1:], window) / window[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.c_[np.full((len(window), 1), np.nan), 100 - 100 / (1 + g / l)]
+        return _latch(rsi < np.asarray(lower)[:, None], rsi > np.asarray(upper)[:, None])
+
+
+def bollinger_positions(close, window, k):
+    """Buy a close below the lower band, sell on a close back above the SMA."""
+    window = np.asarray(window)
+    sma = _rolling(close, window) / window[:, None]
+    var = (_rolling(close * close, window) - window[:, None] * sma * sma) / (window[:, None] - 1)
+    lower = sma - np.asarray(k)[:, None] * np.sqrt(np.clip(var, 0, None))
+    with np.errstate(invalid="ignore"):
+        return _latch(close < lower, close > sma)
+
+
+RULES = {"sma": sma_positions, "rsi": rsi_positions, "bollinger": bollinger_positions}
+
+
+def periods_per_year(index):
+    if len(index) < 2 or not isinstance(index, pd.DatetimeIndex): return 252
+    if (index[1:] - index[:-1]).median() < pd.Timedelta(hours=20):
+        # Intraday: a few sessions of calendar time would wildly overstate a
+        # year, so scale bars per session by sessions per year instead.
+        days = len(np.unique(index.date))
+        return len(index) / days * (365 if (index.dayofweek >= 5).any() else 252)
+    span = (index[-1] - index[0]).total_seconds()
+    return (len(index) - 1) / (span / YEAR_SECONDS) if span > 0 else 252
+
+
+def evaluate(close, positions, cost_bps=COST_BPS, periods=252):
+    """Equity, drawdown and summary metrics for each row of ``positions``."""
+    positions = np.atleast_2d(positions)
+    rows, n = positions.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.nan_to_num(np.diff(close) / close[:-1])
+    held = positions[:, :-1]
+    trades = np.abs(np.diff(held, axis=1, prepend=0.0))
+    strat = held * ret - trades * cost_bps / 1e4
+    equity = np.c_[np.ones(rows), np.cumprod(1 + strat, axis=1)]
+    drawdown = equity / np.maximum.accumulate(equity, axis=1) - 1
+    # Per-trade returns: runs of held == 1, found on a zero-padded flat copy so
+    # runs never cross rows.
+    padded = np.pad(held, ((0, 0), (1, 1)))
+    logs = np.cumsum(np.pad(np.log1p(strat) * held, ((0, 0), (1, 1))).ravel())
+    edges = np.diff(padded.ravel())
+    starts, ends = np.flatnonzero(edges == 1) + 1, np.flatnonzero(edges == -1) + 1
+    owner = starts // (n + 1)
+    n_trades = np.bincount(owner, minlength=rows)
+    wins = np.bincount(owner, weights=(logs[ends - 1] - logs[starts - 1]) > 0, minlength=rows)
+    years = max(n - 1, 1) / periods
+    sd = strat.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics = {
+            "total_return": equity[:, -1] - 1,
+            "cagr": equity[:, -1] ** (1 / years) - 1,
+            "sharpe": np.where(sd > 0, strat.mean(axis=1) / sd * np.sqrt(periods), 0.0),
+            "max_drawdown": drawdown.min(axis=1),
+            "hit_rate": np.where(n_trades > 0, wins / n_trades, np.nan),
+            "trades": n_trades,
+            "turnover": trades.sum(axis=1) / years,
+            "exposure": held.mean(axis=1),
+        }
+    return equity, drawdown, metrics
+
+
+@timed("backtest", "compute")
+def backtest(data, strategy="sma", cost_bps=COST_BPS, **params):
+    """Run one rule over ``data['Close']``; returns a frame and a metrics dict."""
+    close = data['Close'].to_numpy(dtype="float64")
+    params = {**DEFAULTS[strategy], **params}
+    pos = RULES[strategy](close, *([params[k]] for k in DEFAULTS[strategy]))
+    equity, drawdown, metrics = evaluate(close, pos, cost_bps, periods_per_year(data.index))
+    frame = pd.DataFrame({"Position": pos[0], "Equity": equity[0], "Drawdown": drawdown[0], "Buy & Hold": close / close[0]}, index=data.index)
+    return frame, {k: float(v[0]) for k, v in metrics.items()}
+
+
+def _run_chunk(close, strategy, combos, cost_bps, periods):
+    cols = list(zip(*combos))
+    _, _, metrics = evaluate(close, RULES[strategy](close, *cols), cost_bps, periods)
+    return metrics
+
+
+@timed("backtest.sweep", "compute")
+def sweep(data, strategy="sma", grid=None, cost_bps=COST_BPS, workers=None, chunk_size=CHUNK_SIZE):
+    """Metrics for every combination in ``grid`` (``{param: values}``), best Sharpe first.
+
+    ``workers`` defaults to every core for grids of at least PARALLEL_CELLS
+    cells and to in-process otherwise; a single-core host never starts a pool.
+    """
+    grid = {**{k: [v] for k, v in DEFAULTS[strategy].items()}, **(grid or GRIDS[strategy])}
+    names = list(DEFAULTS[strategy])
+    combos = list(itertools.product(*(grid[k] for k in names)))
+    if strategy == "rsi": combos = [c for c in combos if c[1] < c[2]]
+    close = data['Close'].to_numpy(dtype="float64")
+    periods = periods_per_year(data.index)
+    cores = os.cpu_count() or 1
+    if workers is None: workers = cores if len(combos) * len(close) >= PARALLEL_CELLS else 1
+    if cores < 2: workers = 1
+    # One chunk per worker, up to chunk_size combinations to bound memory.
+    size = max(1, min(chunk_size, -(-len(combos) // workers)))
+    chunks = [combos[i:i + size] for i in range(0, len(combos), size)]
+    workers = min(workers, len(chunks))
+    if workers > 1:
+        # Spawned, not forked: the app calls this from Streamlit's script
+        # threads, and a forked child can inherit locks another thread held.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*((close, strategy, ch, cost_bps, periods) for ch in chunks))))
+    else: parts = [_run_chunk(close, strategy, ch, cost_bps, periods) for ch in chunks]
+    table = pd.DataFrame(combos, columns=names)
+    for k in METRICS: table[k] = np.concatenate([p[k] for p in parts]) if parts else []
+    return table.sort_values("sharpe", ascending=False, ignore_index=True)
@@ -0,0 +1,185 @@
+"""On-disk OHLCV store with incremental (delta) fetching.
+
+Bars live in one Parquet file per ticker and interval. A request first
+serves what is stored; only bars after the last stored timestamp are pulled
+from upstream, normalized once at ingest (MultiIndex flattening, zero-volume
+filter, ``dropna``) and merged back into the file. In memory each series is
+kept once in a ``ColumnarStore``; ``get`` returns a window that shares its
+arrays, optionally with the indicator columns attached. Intervals are served
+from the finest stored series that covers the window and resampled locally,
+so switching a chart between 1m and 5m, or 5m, 15m and 1h, reuses one fetch.
+"""
+import os
+import re
+import threading
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+from prostock.columnar import ColumnarStore
+from prostock.indicators import ENGINE
+from prostock.providers import get_provider
+from prostock.resample import NATIVE, resample, source_interval
+from prostock.telemetry import timed
+
+STORE_DIR = os.environ.get("PROSTOCK_BAR_STORE", os.path.join(".prostock_cache", "bars"))
+MIN_REFRESH_SECONDS = 10
+# How far back Yahoo serves each interval; older bars are trimmed on write.
+RETENTION = {interval: keep for interval, keep in NATIVE.items() if keep is not None}
+PERIODS = {"1mo": timedelta(days=31), "3mo": timedelta(days=92), "6mo": timedelta(days=183),
+           "1y": timedelta(days=366), "2y": timedelta(days=731), "5y": timedelta(days=1827), "10y": timedelta(days=3653)}
+
+
+def normalize(data):
+    if data is None or data.empty: return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex): data.columns = data.columns.get_level_values(0)
+    data = data.loc[:, ~data.columns.duplicated()]
+    if 'Volume' in data.columns: data = data[data['Volume']>0]
+    return data.dropna()
+
+
+def _align(ts, index):
+    ts = pd.Timestamp(ts)
+    if index.tz is not None and ts.tzinfo is None: return ts.tz_localize(index.tz)
+    if index.tz is None and ts.tzinfo is not None: return ts.tz_convert(None)
+    return ts
+
+
+def _span(period=None, start=None):
+    """How far back the window reaches, or None when it is open-ended."""
+    if start is not None: return pd.Timestamp.now().normalize() - pd.Timestamp(start).tz_localize(None).normalize()
+    if period in PERIODS: return PERIODS[period]
+    if period and period.endswith("d"): return timedelta(days=int(period[:-1]))
+    return None
+
+
+def _covers(stored, interval, period=None, start=None):
+    if stored.empty: return False
+    now = pd.Timestamp.now(tz=stored.index.tz)
+    need = _align(start, stored.index) if start is not None else None
+    if need is None and _span(period): need = now - _span(period)
+    if need is not None and stored.index[0].normalize() > need.normalize(): return False
+    return interval not in RETENTION or now - stored.index[-1] < RETENTION[interval]
+
+
+def _bounds(index, period=None, start=None, end=None):
+    """Row range ``(lo, hi)`` of the requested window; slicing keeps it a view."""
+    if not len(index): return 0, 0
+    if start is not None or end is not None:
+        lo = index.searchsorted(_align(start, index)) if start is not None else 0
+        hi = index.searchsorted(_align(end, index)) if end is not None else len(index)
+        return lo, hi
+    if period and period.endswith("d"):
+        # "5d" means the last five sessions, not five calendar days.
+        days = index.normalize().unique()[-int(period[:-1]):]
+        return index.searchsorted(days[0]), len(index)
+    if period in PERIODS: return index.searchsorted(index[-1] - PERIODS[period]), len(index)
+    return 0, len(index)
+
+
+class BarStore:
+    def __init__(self, root=STORE_DIR, min_refresh=MIN_REFRESH_SECONDS, series=None):
+        self.root = root
+        self.min_refresh = min_refresh
+        self.series = series or ColumnarStore()
+        self.series.on_evict = self._forget
+        self._fetched_at = {}
+        self._sources = {}
+        self._spans = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.root, f"{re.sub(r'[^A-Za-z0-9_.-]', '_', ticker)}__{interval}.parquet")
+
+    def _lock(self, key):
+        with self._guard: return self._locks.setdefault(key, threading.Lock())
+
+    def _forget(self, key, series):
+        # The columnar store dropped ``key``; drop what is kept beside it, so
+        # these maps stay as bounded as the store. A lock in use is kept.
+        with self._guard:
+            self._fetched_at.pop(key, None); self._spans.pop(key, None)
+            for k in [k for k, s in list(self._sources.items()) if k == key or s is series]: del self._sources[k]
+            if key in self._locks and not self._locks[key].locked(): del self._locks[key]
+        ENGINE.forget(key)
+
+    def _read(self, ticker, interval):
+        try: return pd.read_parquet(self._path(ticker, interval))
+        except Exception: return pd.DataFrame()
+
+    def load(self, ticker, interval):
+        key = (ticker, interval)
+        series = self.series.get(key)
+        if series is None: series = self.series.put(key, self._read(ticker, interval))
+        return series.frame()
+
+    def _save(self, ticker, interval, data):
+        keep = RETENTION.get(interval)
+        if keep is not None and not data.empty: data = data[data.index >= data.index[-1] - keep]
+        series = self.series.put((ticker, interval), data)
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            path = self._path(ticker, interval); tmp = f"{path}.{os.getpid()}.tmp"
+            data.to_parquet(tmp); os.replace(tmp, path)
+        except Exception: pass
+        return series.frame()
+
+    def _download(self, ticker, interval, **kw):
+        return normalize(get_provider().download(ticker, interval=interval, **kw))
+
+    @timed("bar_store", "fetch")
+    def get(self, ticker, interval, period=None, start=None, end=None, technicals=False):
+        """Stored bars for the window; ``technicals`` adds the shared indicator columns."""
+        span = _span(period, start)
+        base = source_interval(interval, span)
+        key = (ticker, base)
+        with self._lock(key):
+            stored = self.load(ticker, base)
+            # Intervals share a stored series, so a window wider than any
+            # fetched so far skips the refresh throttle.
+            wider = span is not None and span > self._spans.get(key, timedelta(0))
+            if wider or time.monotonic() - self._fetched_at.get(key, float("-inf")) >= self.min_refresh:
+                # A failed refresh leaves the throttle unset so the next call retries.
+                if self._update(ticker, base, stored, period, start, end) is not None:
+                    self._fetched_at[key] = time.monotonic()
+                    if wider: self._spans[key] = span
+            series = self.series.get(key)
+        if base != interval:
+            key = (ticker, f"{interval}<{base}")
+            with self._lock(key):
+                # Re-aggregated only when the source series has a new version.
+                if self._sources.get(key) is not series:
+                    self._sources[key] = series
+                    self.series.put(key, resample(series.frame(), interval, ticker))
+                series = self.series.get(key)
+        if technicals and len(series):
+            series.derive("technicals", lambda f: ENGINE.indicators(f, key=key, interval=interval))
+        lo, hi = _bounds(series.index, period, start, end)
+        return series.frame(lo, hi, ("technicals",) if technicals and len(series) else ())
+
+    def _update(self, ticker, interval, stored, period, start, end):
+        """Merge newer bars into the stored series; None when the download failed."""
+        covered = _covers(stored, interval, period, start)
+        if covered and end is not None and stored.index[-1] >= _align(end, stored.index): return stored
+        try:
+            if not covered:
+                # Fetch through to the present so the stored series stays contiguous.
+                fresh = self._download(ticker, interval, start=start) if start is not None else self._download(ticker, interval, period=period)
+            else:
+                # Re-fetch from the last stored bar: it may have been partial.
+                last = stored.index[-1]
+                fresh = self._download(ticker, interval, start=last.date() if interval == "1d" else last.to_pydatetime())
+        except Exception:
+            # Serve what is stored; only the newest bars are missing.
+            return None
+        if fresh.empty: return stored
+        # Merge into the full-precision bars on disk; the in-memory series is
+        # float32 and would round the file a little more on every merge.
+        if not stored.empty:
+            persisted = self._read(ticker, interval)
+            if not persisted.empty: stored = persisted
+        merged = pd.concat([stored, fresh]) if not stored.empty else fresh
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        return self._save(ticker, interval, merged)
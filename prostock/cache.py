@@ -0,0 +1,158 @@
+"""Process-wide caching primitives shared by the data services."""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from prostock.scheduler import BACKGROUND, priority
+from prostock.telemetry import cache_event
+
+
+def _count(name, keys, out):
+    if name:
+        cache_event(name, "hit", len(out)); cache_event(name, "miss", len(keys) - len(out))
+
+
+class TTLCache:
+    """Entries expire ``ttl`` seconds after they are set; at most ``maxsize`` are kept.
+
+    Expired entries are purged as new ones are set, oldest first, so a cache
+    keyed by ticker or URL does not grow with every key it has ever seen.
+    """
+
+    def __init__(self, ttl, name=None, maxsize=10000):
+        self.ttl = ttl
+        self.name = name
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key -> (expires_at, value), in the order set
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        out = {}
+        with self._lock:
+            for k in keys:
+                entry = self._data.get(k)
+                if entry and now < entry[0]: out[k] = entry[1]
+        _count(self.name, keys, out)
+        return out
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items, ttl=None):
+        now = time.monotonic()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            for k, v in items.items():
+                self._data[k] = (expires, v); self._data.move_to_end(k)
+            while self._data:
+                oldest = next(iter(self._data.values()))
+                if now < oldest[0] and len(self._data) <= self.maxsize: break
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock: self._data.clear()
+
+    def __len__(self): return len(self._data)
+
+
+class LRUCache:
+    def __init__(self, maxsize, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        out = {}
+        with self._lock:
+            for k in keys:
+                if k in self._data:
+                    self._data.move_to_end(k); out[k] = self._data[k]
+        _count(self.name, keys, out)
+        return out
+
+    def set_many(self, items):
+        with self._lock:
+            for k, v in items.items():
+                self._data[k] = v; self._data.move_to_end(k)
+            while len(self._data) > self.maxsize: self._data.popitem(last=False)
+
+    def __len__(self): return len(self._data)
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader: fut = self._calls[key] = Future()
+        if not leader: return fut.result()
+        try:
+            fut.set_result(fn())
+        except BaseException as e:
+            fut.set_exception(e)
+        finally:
+            with self._lock: self._calls.pop(key, None)
+        return fut.result()
+
+
+class BackgroundRefresher:
+    """Base for process-wide services that ``refresh()`` on a daemon thread.
+
+    Subclasses set ``refresh_seconds`` and ``thread_name``. A failed refresh
+    keeps the previous value and is retried on the next round.
+    """
+    refresh_seconds = 60
+    thread_name = "refresh"
+
+    def __init__(self):
+        self._thread = None
+        self._attempted = threading.Event()
+
+    def refresh(self):
+        raise NotImplementedError
+
+    def _loop(self):
+        while True:
+            try:
+                with priority(BACKGROUND): self.refresh()
+            except Exception: pass
+            self._attempted.set()
+            time.sleep(self.refresh_seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=self.thread_name, daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=3.0):
+        """Block until the first refresh has been attempted, at most ``timeout`` seconds.
+
+        A failed first attempt also ends the wait, so readers fall back to
+        their defaults instead of blocking while upstream is down.
+        """
+        return self._attempted.wait(timeout)
+
+
+def cached_call(cache, flight, key, fn):
+    """Serve ``key`` from ``cache``, otherwise run ``fn`` once for all waiters."""
+    hit = cache.get_many([key])
+    if key in hit: return hit[key]
+
+    def load():
+        value = fn()
+        cache.set(key, value)
+        return value
+    return flight.do(key, load)
@@ -0,0 +1,87 @@
+"""Server-side downsampling for the terminal's price chart.
+
+Candles are aggregated into at most ``max_points`` contiguous buckets, about
+one per horizontal pixel, before they are serialized. Line overlays are
+reduced with Largest-Triangle-Three-Buckets (LTTB), which keeps the visual
+extremes of the series. When a trace still has more than
+``WEBGL_THRESHOLD`` points (for example with downsampling switched off),
+it is drawn with a WebGL ``Scattergl`` trace.
+"""
+import numpy as np
+import pandas as pd
+
+from prostock.indicators import INTRADAY
+from prostock.resample import aggregate
+from prostock.telemetry import timed
+
+MAX_POINTS = 1200
+WEBGL_THRESHOLD = 5000
+
+
+def ohlc_buckets(data, max_points=MAX_POINTS):
+    """Aggregate bars into at most ``max_points`` buckets, stamped at each bucket's first bar."""
+    n = len(data)
+    if not max_points or n <= max_points: return data
+    size = -(-n // max_points)
+    starts = np.arange(0, n, size)
+    return aggregate(data, starts, data.index[starts])
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Return the indices LTTB keeps out of ``y`` (NaNs are skipped)."""
+    y = np.asarray(y, dtype="float64")
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if not threshold or n <= threshold or threshold < 3: return valid
+    xs = np.asarray(x, dtype="float64")[valid]
+    ys = y[valid]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        area = np.abs((xs[a] - avg_x) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (avg_y - ys[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return valid[keep]
+
+
+def _x_numeric(index):
+    if isinstance(index, pd.DatetimeIndex): return index.asi8.astype("float64")
+    return np.arange(len(index), dtype="float64")
+
+
+def line_points(series, max_points=MAX_POINTS):
+    idx = lttb(_x_numeric(series.index), series.to_numpy(dtype="float64"), max_points)
+    return series.index[idx], series.to_numpy()[idx]
+
+
+@timed("price_figure", "render")
+def price_figure(data, market_type, interval, show_sma=True, show_bb=False, max_points=MAX_POINTS):
+    import plotly.graph_objects as go
+
+    def scatter(x, y, **kw):
+        return (go.Scattergl if len(x) > WEBGL_THRESHOLD else go.Scatter)(x=x, y=y, **kw)
+
+    fig = go.Figure()
+    if data.empty: return fig
+    if market_type == "Crypto":
+        x, y = line_points(data['Close'], max_points)
+        fig.add_trace(scatter(x, y, fill='tozeroy', line=dict(color='#2962FF'), name='Price'))
+    else:
+        bars = ohlc_buckets(data, max_points)
+        fig.add_trace(go.Candlestick(x=bars.index, open=bars['Open'], high=bars['High'], low=bars['Low'], close=bars['Close'], increasing_line_color='#00C853', decreasing_line_color='#D50000'))
+    if show_sma and 'SMA' in data.columns:
+        x, y = line_points(data['SMA'], max_points)
+        fig.add_trace(scatter(x, y, line=dict(color='#FFA000', width=1), name='SMA'))
+    if show_bb and 'BB_Upper' in data.columns:
+        x, y = line_points(data['BB_Upper'], max_points)
+        fig.add_trace(scatter(x, y, line=dict(color='#999', dash='dot'), name='BB Up'))
+        x, y = line_points(data['BB_Lower'], max_points)
+        fig.add_trace(scatter(x, y, line=dict(color='#999', dash='dot'), name='BB Lo'))
+    rangebreaks = [dict(bounds=["sat", "mon"])] if market_type in ["Stocks", "Commodities"] and interval in INTRADAY else []
+    fig.update_layout(height=500, template="plotly_white", xaxis_rangeslider_visible=False, xaxis=dict(rangebreaks=rangebreaks))
+    return fig
@@ -0,0 +1,146 @@
+"""Process-wide columnar OHLCV store shared by every session.
+
+Each ``(ticker, interval)`` series is held once as compact NumPy columns: a
+float32 ``(4, n)`` Open/High/Low/Close block and an int64 volume column,
+optionally memory-mapped from ``.npy`` files. Readers get DataFrames that
+wrap read-only views of those arrays, so one more viewer of a chart costs a
+few block headers instead of a copy. Derived columns (the indicators) are
+computed once per stored version into their own float32 block and shared
+the same way. A write never touches existing arrays: it builds a new version
+and swaps it in, so frames already handed out stay valid. The store keeps at
+most ``PROSTOCK_COLUMNAR_MB`` of series and drops the least recently read
+ones past that; ``on_evict`` lets the owner drop what it keeps per key.
+"""
+import itertools
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from prostock.telemetry import cache_event
+
+PRICES = ["Open", "High", "Low", "Close"]
+MMAP_DIR = os.environ.get("PROSTOCK_MMAP_DIR")
+MAX_BYTES = int(float(os.environ.get("PROSTOCK_COLUMNAR_MB", "512")) * 2 ** 20)
+_versions = itertools.count(1)
+
+
+def _frozen(a):
+    a = np.ascontiguousarray(a)
+    a.flags.writeable = False
+    return a
+
+
+class Series:
+    """One immutable version of a stored series."""
+
+    def __init__(self, index, prices, volume, spill):
+        self.index, self.prices, self.volume = index, prices, volume
+        self._spill = spill
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, data, spill):
+        if data.empty or not isinstance(data.index, pd.DatetimeIndex):
+            return cls(pd.DatetimeIndex([]), _frozen(np.empty((4, 0), "float32")), _frozen(np.empty(0, "int64")), spill)
+        prices = np.stack([data[c].to_numpy("float32") if c in data.columns else np.full(len(data), np.nan, "float32") for c in PRICES])
+        volume = np.nan_to_num(data['Volume'].to_numpy("float64")).astype("int64") if 'Volume' in data.columns else np.zeros(len(data), "int64")
+        return cls(data.index, spill("prices", prices), spill("volume", volume), spill)
+
+    def __len__(self): return len(self.index)
+
+    @property
+    def nbytes(self):
+        return self.prices.nbytes + self.volume.nbytes + sum(b.nbytes for _, b in list(self._derived.values()))
+
+    def derive(self, name, fn):
+        """Compute ``fn(frame)`` once for this version and keep it as a float32 block."""
+        with self._lock:
+            if name in self._derived:
+                cache_event("columnar", "hit"); return
+            cache_event("columnar", "miss")
+            out = fn(self.frame())
+            self._derived[name] = (list(out.columns), self._spill(name, out.to_numpy("float32").T))
+
+    def frame(self, lo=0, hi=None, derived=()):
+        """A DataFrame over rows ``lo:hi`` that shares memory with the store."""
+        s = slice(lo, hi)
+        cols = {c: self.prices[i, s] for i, c in enumerate(PRICES)}
+        cols['Volume'] = self.volume[s]
+        for name in derived:
+            names, block = self._derived[name]
+            cols.update((c, block[i, s]) for i, c in enumerate(names))
+        return pd.DataFrame(cols, index=self.index[s], copy=False)
+
+    def release(self): self._spill.release()
+
+
+class _Spill:
+    """Freezes a version's arrays, writing and mapping them when ``root`` is set."""
+
+    def __init__(self, root, slug):
+        self.root, self.slug, self.version = root, slug, next(_versions)
+        self.paths = []
+        self.released = False
+
+    def __call__(self, part, array):
+        # A reader may still derive on a superseded version; keep that in memory.
+        if not self.root or self.released: return _frozen(array)
+        path = os.path.join(self.root, f"{self.slug}.{self.version}.{part}.npy")
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            np.save(path, np.ascontiguousarray(array))
+        except OSError: return _frozen(array)
+        self.paths.append(path)
+        return np.load(path, mmap_mode="r")
+
+    def release(self):
+        # Open maps stay readable after the unlink on POSIX.
+        self.released = True
+        for path in self.paths:
+            try: os.remove(path)
+            except OSError: pass
+
+
+class ColumnarStore:
+    def __init__(self, mmap_dir=MMAP_DIR, max_bytes=MAX_BYTES, on_evict=None):
+        self.mmap_dir = mmap_dir
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict  # called as on_evict(key, series) outside the lock
+        self._series = OrderedDict()  # least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None: self._series.move_to_end(key)
+            return series
+
+    def put(self, key, data):
+        slug = re.sub(r'[^A-Za-z0-9_.-]', '_', "__".join(map(str, key)))
+        series = Series.from_frame(data, _Spill(self.mmap_dir, slug))
+        with self._lock:
+            old, self._series[key] = self._series.get(key), series
+            self._series.move_to_end(key)
+            evicted = []
+            # The series just written always stays, even if it alone is over.
+            while len(self._series) > 1 and self._nbytes() > self.max_bytes:
+                evicted.append(self._series.popitem(last=False))
+        if old is not None: old.release()
+        for k, s in evicted:
+            s.release()
+            cache_event("columnar", "evict")
+            if self.on_evict: self.on_evict(k, s)
+        return series
+
+    def _nbytes(self):
+        return sum(s.nbytes for s in self._series.values())
+
+    def nbytes(self):
+        with self._lock: return self._nbytes()
+
+    def __len__(self): return len(self._series)
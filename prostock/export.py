@@ -0,0 +1,60 @@
+"""On-demand exports of OHLCV history and indicators.
+
+Nothing here runs until a download is requested: the Data tab hands these
+functions to ``st.download_button`` as deferred callables. Streamlit keeps
+the finished payload in memory, so exports are written into a ``BytesIO``;
+rows are converted in chunks so that no second full-size copy is built on
+the way. Supported formats are CSV, Parquet and Arrow IPC. A bulk export
+writes a whole ticker list into one zip archive.
+"""
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet"),
+           "Arrow": ("arrow", "application/vnd.apache.arrow.file")}
+CHUNK_ROWS = 10000
+MAX_WORKERS = 8
+
+
+def _chunks(data, rows=CHUNK_ROWS):
+    for start in range(0, len(data), rows): yield data.iloc[start:start + rows]
+
+
+def write_frame(data, fmt, out):
+    """Write ``data`` into the binary file-like ``out`` in ``fmt``."""
+    if fmt == "CSV":
+        for i, chunk in enumerate(_chunks(data)):
+            out.write(chunk.to_csv(header=i == 0).encode("utf-8"))
+        if data.empty: out.write(data.to_csv().encode("utf-8"))
+        return
+    schema = pa.Schema.from_pandas(data.iloc[:0], preserve_index=True)
+    if fmt == "Parquet": writer = pq.ParquetWriter(out, schema)
+    elif fmt == "Arrow": writer = ipc.new_file(out, schema)
+    else: raise ValueError(f"unknown export format: {fmt}")
+    with writer:
+        for chunk in _chunks(data):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=True))
+
+
+def export_file(data, fmt="CSV"):
+    out = io.BytesIO()
+    write_frame(data, fmt, out)
+    out.seek(0)
+    return out
+
+
+def export_archive(tickers, loader, fmt="CSV"):
+    """Zip ``loader(ticker)`` for every ticker; frames are loaded concurrently."""
+    ext = FORMATS[fmt][0]
+    out = io.BytesIO()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for ticker, data in zip(tickers, pool.map(loader, tickers)):
+            if data is None or data.empty: continue
+            with zf.open(f"{ticker}.{ext}", "w", force_zip64=True) as entry: write_frame(data, fmt, entry)
+    out.seek(0)
+    return out
@@ -0,0 +1,124 @@
+"""Concurrent RSS/Atom aggregator shared by the Home and Media pages.
+
+Feeds are fetched in parallel over one pooled ``requests.Session``. Each
+feed's ETag and Last-Modified are remembered, so revalidating an unchanged
+feed costs a 304. Requests go through the upstream scheduler, which
+rate-limits each feed host and backs off when a host throttles. Responses
+are parsed incrementally and the download stops once enough items have
+been read. Items are deduplicated across sources, and per-feed results sit
+in a process-wide TTL cache that every session shares.
+"""
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from prostock.cache import SingleFlight, TTLCache, cached_call
+from prostock.scheduler import RETRY_STATUS, SCHEDULER, Throttled
+from prostock.telemetry import span, upstream
+
+FEEDS = {
+    "CNBC": "https://search.cnbc.com/rs/search/combinedcms/view.xml?partnerId=wrss01&id=10000664",
+    "BBC": "http://feeds.bbci.co.uk/news/business/rss.xml",
+    "CNN": "http://rss.cnn.com/rss/money_latest.rss",
+}
+FEED_TTL = 300
+TIMEOUT = 5
+CHUNK_SIZE = 8192
+MAX_WORKERS = 8
+
+
+def _local(tag): return tag.rsplit("}", 1)[-1]
+
+
+def _item(elem):
+    title = link = None
+    for child in elem:
+        name = _local(child.tag)
+        if name == "title": title = (child.text or "").strip()
+        elif name == "link": link = (child.text or child.get("href") or "").strip()
+    return {"title": title, "link": link} if title and link else None
+
+
+def parse_stream(chunks, limit):
+    """Parse RSS ``<item>`` or Atom ``<entry>`` elements, stopping after ``limit``."""
+    parser = ET.XMLPullParser(events=("end",))
+    items = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if _local(elem.tag) in ("item", "entry"):
+                item = _item(elem)
+                if item: items.append(item)
+                elem.clear()
+                if len(items) >= limit: return items
+    return items
+
+
+class FeedAggregator:
+    def __init__(self, feeds=None, ttl=FEED_TTL, timeout=TIMEOUT, session=None):
+        self.feeds = dict(FEEDS if feeds is None else feeds)
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+            self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self._cache = TTLCache(ttl, name="feeds")
+        self._flight = SingleFlight()
+        self._validators = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="feeds")
+
+    def _fetch(self, url, limit):
+        with self._lock: prev = self._validators.get(url)
+        headers = {}
+        if prev and prev["limit"] >= limit:
+            if prev["etag"]: headers["If-None-Match"] = prev["etag"]
+            if prev["modified"]: headers["If-Modified-Since"] = prev["modified"]
+        def get():
+            r = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+            upstream("rss", "get", r.status_code in (200, 304))
+            if r.status_code in RETRY_STATUS:
+                r.close(); raise Throttled(r.status_code, r.headers.get("Retry-After"))
+            return r
+        try:
+            with span("rss", "fetch"), SCHEDULER.call(urlsplit(url).netloc, get) as r:
+                if r.status_code == 304 and headers: return prev["items"][:limit]
+                if r.status_code != 200: return prev["items"][:limit] if prev else []
+                items = parse_stream(r.iter_content(CHUNK_SIZE), limit)
+                validators = {"etag": r.headers.get("ETag"), "modified": r.headers.get("Last-Modified")}
+        except requests.RequestException:
+            upstream("rss", "get", False)
+            return prev["items"][:limit] if prev else []
+        except Throttled:
+            return prev["items"][:limit] if prev else []
+        except ET.ParseError:
+            return prev["items"][:limit] if prev else []
+        with self._lock: self._validators[url] = {**validators, "items": items, "limit": limit}
+        return items
+
+    def fetch(self, url, limit=5):
+        return cached_call(self._cache, self._flight, (url, limit), lambda: self._fetch(url, limit))
+
+    def fetch_many(self, sources, limit=5):
+        """Return ``{source: items}``; an item already listed by an earlier source is dropped."""
+        futures = {name: self._pool.submit(self.fetch, self.feeds.get(name, name), limit) for name in sources}
+        seen, out = set(), {}
+        for name, fut in futures.items():
+            out[name] = []
+            for item in fut.result():
+                key = item["link"].rstrip("/").lower()
+                title = item["title"].lower()
+                if key in seen or title in seen: continue
+                seen.update((key, title)); out[name].append(item)
+        return out
+
+
+AGGREGATOR = FeedAggregator()
+
+
+def fetch_feeds(sources, limit=5):
+    return AGGREGATOR.fetch_many(sources, limit)
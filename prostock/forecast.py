@@ -0,0 +1,115 @@
+"""Closed-form trend forecasts with memoization and batch solving.
+
+Three models share one weighted least-squares solver:
+
+* ``linear``: ordinary least squares over the whole series (the model the
+  AI Analysis tab has always drawn).
+* ``rolling``: the same fit over only the last ``window`` points.
+* ``ewm``: a fit with exponentially decaying weights (``halflife`` points),
+  so recent bars dominate.
+
+Forecasts are memoized by a fingerprint of the input series, and
+``batch_forecast`` solves a whole watchlist in one vectorized pass.
+``backtest`` walks forward through a series and reports error and runtime
+for each model.
+"""
+import hashlib
+import time
+
+import numpy as np
+
+from prostock.cache import LRUCache
+from prostock.telemetry import timed
+
+HORIZON = 30
+ROLLING_WINDOW = 60
+EWM_HALFLIFE = 20
+MODELS = ("linear", "rolling", "ewm")
+MAX_ENTRIES = 4096
+
+_memo = LRUCache(MAX_ENTRIES, name="forecast")
+
+
+def _weights(n, model, window, halflife):
+    """Per-point weights, oldest first; padding is zero-weighted by the caller."""
+    age = np.arange(n - 1, -1, -1, dtype="float64")
+    if model == "linear": return np.ones(n)
+    if model == "rolling": return (age < window).astype("float64")
+    if model == "ewm": return 0.5 ** (age / halflife)
+    raise ValueError(f"unknown forecast model: {model}")
+
+
+def _solve(Y, model, horizon, window, halflife):
+    """Fit every row of ``Y`` (right-aligned, NaN-padded on the left) at once."""
+    Y = np.atleast_2d(np.asarray(Y, dtype="float64"))
+    n = Y.shape[1]
+    x = np.arange(n, dtype="float64")
+    w = np.where(np.isnan(Y), 0.0, _weights(n, model, window, halflife))
+    y = np.nan_to_num(Y)
+    sw = w.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = (w * x).sum(axis=1) / sw
+        my = (w * y).sum(axis=1) / sw
+        dx = x - mx[:, None]
+        slope = (w * dx * (y - my[:, None])).sum(axis=1) / (w * dx * dx).sum(axis=1)
+    slope = np.nan_to_num(slope)
+    fut = np.arange(n, n + horizon, dtype="float64")
+    return my[:, None] + slope[:, None] * (fut - mx[:, None])
+
+
+def fingerprint(values, *params):
+    h = hashlib.sha1(np.ascontiguousarray(values, dtype="float64").tobytes())
+    h.update(repr(params).encode("utf-8"))
+    return h.hexdigest()
+
+
+@timed("forecast", "compute")
+def forecast(values, model="linear", horizon=HORIZON, window=ROLLING_WINDOW, halflife=EWM_HALFLIFE):
+    """Return the next ``horizon`` predicted values of a 1-D series."""
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    key = fingerprint(values, model, horizon, window, halflife)
+    hit = _memo.get_many([key])
+    if key in hit: return hit[key].copy()
+    pred = _solve(values, model, horizon, window, halflife)[0]
+    _memo.set_many({key: pred})
+    return pred.copy()
+
+
+def batch_forecast(series, model="linear", horizon=HORIZON, window=ROLLING_WINDOW, halflife=EWM_HALFLIFE):
+    """Forecast many series (``{name: values}``) with one vectorized solve."""
+    names = list(series)
+    arrays = [np.asarray(series[k], dtype="float64") for k in names]
+    arrays = [a[~np.isnan(a)] for a in arrays]
+    width = max((len(a) for a in arrays), default=0)
+    Y = np.full((len(arrays), width), np.nan)
+    for i, a in enumerate(arrays):
+        if len(a): Y[i, width - len(a):] = a
+    # Right-aligning keeps each series' newest point at x = width - 1, so
+    # the shared future x-grid is valid for every row.
+    preds = _solve(Y, model, horizon, window, halflife) if width else np.empty((len(arrays), horizon))
+    return dict(zip(names, preds))
+
+
+def backtest(values, models=MODELS, horizon=HORIZON, folds=5, min_train=60, **params):
+    """Walk-forward evaluation: ``{model: {"mae", "mape", "seconds", "folds"}}``."""
+    values = np.asarray(values, dtype="float64")
+    values = values[~np.isnan(values)]
+    last = len(values) - horizon
+    cutoffs = np.linspace(min_train, last, folds).astype(int) if last >= min_train else []
+    report = {}
+    for model in models:
+        errors, pct = [], []
+        t = time.perf_counter()
+        for cut in cutoffs:
+            pred = _solve(values[:cut], model, horizon, params.get("window", ROLLING_WINDOW), params.get("halflife", EWM_HALFLIFE))[0]
+            actual = values[cut:cut + horizon]
+            errors.append(np.abs(pred - actual)); pct.append(np.abs(pred - actual) / np.abs(actual))
+        elapsed = time.perf_counter() - t
+        report[model] = {
+            "mae": float(np.mean(errors)) if errors else None,
+            "mape": float(np.mean(pct) * 100) if pct else None,
+            "seconds": elapsed,
+            "folds": len(cutoffs),
+        }
+    return report
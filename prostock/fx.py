@@ -0,0 +1,76 @@
+"""Process-wide FX rate matrix refreshed in the background.
+
+Every supported currency is priced against USD in one multi-ticker request.
+The service keeps the full N x N matrix of cross rates, triangulated through
+USD, so any conversion is a single array lookup. A pair that fails to price
+keeps its previous rate.
+"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from prostock.cache import BackgroundRefresher
+from prostock.providers import get_provider
+
+REFRESH_SECONDS = 300
+CURRENCIES = ["USD", "KRW", "EUR", "JPY", "GBP", "CNY", "HKD", "CHF", "CAD", "AUD", "SGD", "INR", "TWD", "BTC", "ETH"]
+# Yahoo quotes fiat as units per USD ("KRW=X") and crypto as USD per coin.
+CRYPTO = {"BTC", "ETH"}
+
+
+def usd_symbol(ccy):
+    return f"{ccy}-USD" if ccy in CRYPTO else f"{ccy}=X"
+
+
+def fetch_usd_rates(currencies, provider=None):
+    """Units of each currency per 1 USD; missing ones are left out."""
+    symbols = {usd_symbol(c): c for c in currencies if c != "USD"}
+    data = (provider or get_provider()).download(list(symbols), period="5d", interval="1d", group_by="column", threads=True)
+    rates = {"USD": 1.0}
+    if data is None or data.empty or 'Close' not in data.columns.get_level_values(0): return rates
+    closes = data['Close']
+    if isinstance(closes, pd.Series): closes = closes.to_frame(next(iter(symbols)))
+    for sym, ccy in symbols.items():
+        if sym not in closes.columns: continue
+        last = closes[sym].dropna()
+        if last.empty or not last.iloc[-1]: continue
+        rates[ccy] = 1.0 / float(last.iloc[-1]) if ccy in CRYPTO else float(last.iloc[-1])
+    return rates
+
+
+class FXService(BackgroundRefresher):
+    thread_name = "fx-refresh"
+
+    def __init__(self, currencies=None, refresh_seconds=REFRESH_SECONDS):
+        super().__init__()
+        self.currencies = list(currencies or CURRENCIES)
+        self.refresh_seconds = refresh_seconds
+        self._pos = {c: i for i, c in enumerate(self.currencies)}
+        self._per_usd = np.full(len(self.currencies), np.nan)
+        self._matrix = np.full((len(self.currencies),) * 2, np.nan)
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        rates = fetch_usd_rates(self.currencies)
+        per_usd = self._per_usd.copy()
+        for ccy, r in rates.items(): per_usd[self._pos[ccy]] = r
+        # matrix[i, j]: units of currency j for one unit of currency i.
+        matrix = per_usd[None, :] / per_usd[:, None]
+        with self._lock:
+            self._per_usd, self._matrix = per_usd, matrix
+            self.updated_at = time.time()
+
+    def rate(self, frm, to):
+        """Units of ``to`` per unit of ``frm``, or None when either side is unpriced."""
+        if frm == to: return 1.0
+        i, j = self._pos.get(frm), self._pos.get(to)
+        if i is None or j is None: return None
+        r = self._matrix[i, j]
+        return None if np.isnan(r) else float(r)
+
+    def convert(self, amount, frm, to):
+        r = self.rate(frm, to)
+        return None if r is None else amount * r
@@ -0,0 +1,114 @@
+"""Gemini chat client: pooled session, strict timeouts, raced model fallback.
+
+All fallback models are requested at once and the first one to answer with
+HTTP 200 wins; the losing responses are closed as they arrive. Replies are
+streamed over server-sent events, and finished answers are cached by
+``(ticker, question, data snapshot)`` so a repeated question on an
+unchanged chart costs nothing. Requests go through the upstream scheduler
+at interactive priority and are retried with backoff on 429/5xx.
+``base_url`` can point at a local stub that imitates the
+``streamGenerateContent`` endpoint.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from prostock.cache import LRUCache
+from prostock.scheduler import INTERACTIVE, RETRY_STATUS, SCHEDULER, Throttled
+from prostock.telemetry import upstream
+
+API_BASE = os.environ.get("PROSTOCK_GEMINI_URL", "https://generativelanguage.googleapis.com/v1beta")
+MODELS = ("gemini-1.5-flash", "gemini-1.5-flash-latest", "gemini-pro")
+TIMEOUT = (3.05, 20)  # (connect, read between bytes)
+MAX_OUTPUT_TOKENS = 300
+CACHE_SIZE = 1024
+UNAVAILABLE = "AI Service Unavailable. Please check API Key."
+
+
+class GeminiError(Exception):
+    pass
+
+
+def _texts(payload):
+    for cand in payload.get("candidates", []):
+        for part in cand.get("content", {}).get("parts", []):
+            if part.get("text"): yield part["text"]
+
+
+def _close_if_ok(fut):
+    if not fut.cancelled() and fut.exception() is None: fut.result().close()
+
+
+class GeminiClient:
+    def __init__(self, base_url=API_BASE, models=MODELS, timeout=TIMEOUT, session=None, cache_size=CACHE_SIZE):
+        self.base_url = base_url.rstrip("/")
+        self.models = tuple(models)
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        if session is None:
+            adapter = HTTPAdapter(pool_connections=len(self.models), pool_maxsize=4 * len(self.models))
+            self.session.mount("http://", adapter); self.session.mount("https://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=4 * len(self.models), thread_name_prefix="gemini")
+        self._answers = LRUCache(cache_size, name="gemini")
+
+    def _post(self, model, params, payload):
+        try:
+            r = self.session.post(f"{self.base_url}/models/{model}:streamGenerateContent", params=params, json=payload,
+                                  timeout=self.timeout, stream=True)
+        except requests.RequestException:
+            upstream("gemini", model, False); raise
+        upstream("gemini", model, r.status_code == 200)
+        if r.status_code in RETRY_STATUS:
+            r.close(); raise Throttled(r.status_code, r.headers.get("Retry-After"))
+        return r
+
+    def _open(self, model, prompt, api_key):
+        params = {"key": api_key, "alt": "sse"}
+        payload = {"contents": [{"parts": [{"text": prompt}]}], "generationConfig": {"maxOutputTokens": MAX_OUTPUT_TOKENS}}
+        r = SCHEDULER.call(urlsplit(self.base_url).netloc, lambda: self._post(model, params, payload), level=INTERACTIVE)
+        if r.status_code != 200:
+            r.close()
+            raise GeminiError(f"{model}: HTTP {r.status_code}")
+        return r
+
+    def _race(self, prompt, api_key):
+        futures = [self._pool.submit(self._open, m, prompt, api_key) for m in self.models]
+        won = next((f for f in as_completed(futures) if f.exception() is None), None)
+        for fut in futures:
+            if fut is not won and not fut.cancel(): fut.add_done_callback(_close_if_ok)
+        if won is None: raise GeminiError("all models failed")
+        return won.result()
+
+    def stream(self, prompt, api_key):
+        r = self._race(prompt, api_key)
+        with r:
+            for line in r.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    try: yield from _texts(json.loads(line[5:]))
+                    except ValueError: continue
+
+    def ask(self, prompt, api_key, cache_key=None):
+        """Yield the answer in chunks; cached answers come back as one chunk."""
+        # The key's hash is part of the cache key, so an answer is never served
+        # to a key that could not have fetched it.
+        key_id = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+        key = hashlib.sha1(repr((key_id, cache_key)).encode("utf-8")).hexdigest() if cache_key is not None else None
+        if key:
+            hit = self._answers.get_many([key])
+            if key in hit:
+                yield hit[key]
+                return
+        parts = []
+        try:
+            for chunk in self.stream(prompt, api_key):
+                parts.append(chunk)
+                yield chunk
+        except (GeminiError, requests.RequestException):
+            if not parts: yield UNAVAILABLE
+            return
+        if key and parts: self._answers.set_many({key: "".join(parts)})
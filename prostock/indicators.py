@@ -0,0 +1,262 @@
+"""Incremental technical-indicator engine.
+
+A cold start computes every indicator over the whole frame in one vectorized
+pass. The engine then keeps the rolling state per ``(ticker, interval)`` key
+(window sums and sums of squares, EMA and Wilder averages, session VWAP
+accumulators), so a rerun that only added bars costs O(new bars). The newest
+bar is treated as provisional: it is evaluated from a copy of the state and
+only committed once a later bar arrives, because intraday bars keep changing
+until they close.
+"""
+import copy
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from prostock.telemetry import timed
+
+RSI_WINDOW = 14
+SMA_WINDOW = 20
+EMA_SPAN = 20
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ATR_WINDOW = 14
+COLUMNS = ["RSI", "SMA", "BB_Upper", "BB_Lower", "EMA", "MACD", "MACD_Signal", "MACD_Hist", "ATR", "VWAP"]
+INTRADAY = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "4h"}
+# Running sums are rebuilt from the window buffers this often to stop
+# floating-point drift from accumulating over long live sessions.
+RESYNC_EVERY = 1000
+
+
+def _alpha(span): return 2.0 / (span + 1)
+
+
+def _ewm(x, alpha):
+    return pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _columns(data):
+    c = data['Close'].to_numpy(dtype="float64")
+    h = data['High'].to_numpy(dtype="float64") if 'High' in data.columns else c
+    l = data['Low'].to_numpy(dtype="float64") if 'Low' in data.columns else c
+    v = data['Volume'].to_numpy(dtype="float64") if 'Volume' in data.columns else np.full(len(c), np.nan)
+    return h, l, c, v
+
+
+def _sessions(index, intraday):
+    if intraday and isinstance(index, pd.DatetimeIndex): return np.asarray(index.date)
+    return np.zeros(len(index), dtype="int64")
+
+
+def compute_all(data, intraday=False):
+    """Vectorized cold-start computation; returns a frame of indicator columns."""
+    h, l, c, v = _columns(data)
+    n = len(c)
+    out = {name: np.full(n, np.nan) for name in COLUMNS}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if n >= SMA_WINDOW:
+            w = sliding_window_view(c, SMA_WINDOW)
+            sma, std = w.mean(axis=1), w.std(axis=1, ddof=1)
+            out["SMA"][SMA_WINDOW - 1:] = sma
+            out["BB_Upper"][SMA_WINDOW - 1:] = sma + 2 * std
+            out["BB_Lower"][SMA_WINDOW - 1:] = sma - 2 * std
+        d = np.diff(c)
+        if len(d) >= RSI_WINDOW:
+            gain = sliding_window_view(np.clip(d, 0, None), RSI_WINDOW).mean(axis=1)
+            loss = sliding_window_view(np.clip(-d, 0, None), RSI_WINDOW).mean(axis=1)
+            out["RSI"][RSI_WINDOW:] = 100 - (100 / (1 + gain / loss))
+        out["EMA"] = _ewm(c, _alpha(EMA_SPAN))
+        macd = _ewm(c, _alpha(MACD_FAST)) - _ewm(c, _alpha(MACD_SLOW))
+        out["MACD"], out["MACD_Signal"] = macd, _ewm(macd, _alpha(MACD_SIGNAL))
+        out["MACD_Hist"] = macd - out["MACD_Signal"]
+        prev = np.r_[np.nan, c[:-1]]
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+        out["ATR"] = _ewm(tr, 1.0 / ATR_WINDOW)
+        pv = (h + l + c) / 3 * v
+        sess = _sessions(data.index, intraday)
+        start = np.maximum.accumulate(np.where(np.r_[True, sess[1:] != sess[:-1]], np.arange(n), 0)) if n else sess
+        cpv, cv = np.cumsum(pv), np.cumsum(v)
+        out["VWAP"] = (cpv - (cpv - pv)[start]) / (cv - (cv - v)[start])
+    return pd.DataFrame(out, index=data.index)
+
+
+class _State:
+    def __init__(self, intraday):
+        self.intraday = intraday
+        self.closes = deque(maxlen=SMA_WINDOW)
+        self.gains = deque(maxlen=RSI_WINDOW)
+        self.losses = deque(maxlen=RSI_WINDOW)
+        self.sum_c = self.sumsq_c = self.sum_g = self.sum_l = 0.0
+        self.prev_close = math.nan
+        self.ema = self.ema_fast = self.ema_slow = self.signal = self.atr = math.nan
+        self.pv = self.vol = 0.0
+        self.session = None
+        self.updates = 0
+
+    @classmethod
+    def from_history(cls, data, ind, intraday):
+        """Rebuild the state as of the last row of ``data`` from a cold start."""
+        st = cls(intraday)
+        h, l, c, v = _columns(data)
+        st.closes.extend(c[-SMA_WINDOW:])
+        d = np.diff(c[-(RSI_WINDOW + 1):])
+        st.gains.extend(np.clip(d, 0, None)); st.losses.extend(np.clip(-d, 0, None))
+        st._resync()
+        last = ind.iloc[-1]
+        st.prev_close = c[-1]
+        st.ema, st.atr = last["EMA"], last["ATR"]
+        st.ema_fast = _ewm(c, _alpha(MACD_FAST))[-1]; st.ema_slow = st.ema_fast - last["MACD"]
+        st.signal = last["MACD_Signal"]
+        sess = _sessions(data.index, intraday)
+        same = sess == sess[-1]
+        st.session = sess[-1]
+        st.pv = float(np.sum(((h + l + c) / 3 * v)[same])); st.vol = float(np.sum(v[same]))
+        return st
+
+    def _resync(self):
+        self.sum_c = math.fsum(self.closes); self.sumsq_c = math.fsum(x * x for x in self.closes)
+        self.sum_g = math.fsum(self.gains); self.sum_l = math.fsum(self.losses)
+
+    @staticmethod
+    def _push(buf, x, total):
+        if len(buf) == buf.maxlen: total -= buf[0]
+        buf.append(x)
+        return total + x
+
+    @staticmethod
+    def _ema(prev, x, alpha): return x if math.isnan(prev) else prev + alpha * (x - prev)
+
+    def update(self, ts, h, l, c, v):
+        if not math.isnan(self.prev_close):
+            d = c - self.prev_close
+            self.sum_g = self._push(self.gains, max(d, 0.0), self.sum_g)
+            self.sum_l = self._push(self.losses, max(-d, 0.0), self.sum_l)
+        if len(self.closes) == SMA_WINDOW: self.sumsq_c -= self.closes[0] ** 2
+        self.sum_c = self._push(self.closes, c, self.sum_c); self.sumsq_c += c * c
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0: self._resync()
+
+        row = dict.fromkeys(COLUMNS, math.nan)
+        if len(self.closes) == SMA_WINDOW:
+            sma = self.sum_c / SMA_WINDOW
+            std = math.sqrt(max(self.sumsq_c - self.sum_c * sma, 0.0) / (SMA_WINDOW - 1))
+            row.update(SMA=sma, BB_Upper=sma + 2 * std, BB_Lower=sma - 2 * std)
+        if len(self.gains) == RSI_WINDOW:
+            g, lo = self.sum_g / RSI_WINDOW, self.sum_l / RSI_WINDOW
+            row["RSI"] = 100.0 if lo == 0 and g > 0 else math.nan if lo == 0 else 100 - 100 / (1 + g / lo)
+        self.ema = self._ema(self.ema, c, _alpha(EMA_SPAN))
+        self.ema_fast = self._ema(self.ema_fast, c, _alpha(MACD_FAST))
+        self.ema_slow = self._ema(self.ema_slow, c, _alpha(MACD_SLOW))
+        macd = self.ema_fast - self.ema_slow
+        self.signal = self._ema(self.signal, macd, _alpha(MACD_SIGNAL))
+        tr = h - l if math.isnan(self.prev_close) else max(h - l, abs(h - self.prev_close), abs(l - self.prev_close))
+        self.atr = self._ema(self.atr, tr, 1.0 / ATR_WINDOW)
+        session = pd.Timestamp(ts).date() if self.intraday else 0
+        if session != self.session: self.session, self.pv, self.vol = session, 0.0, 0.0
+        self.pv += (h + l + c) / 3 * v; self.vol += v
+        row.update(EMA=self.ema, MACD=macd, MACD_Signal=self.signal, MACD_Hist=macd - self.signal, ATR=self.atr,
+                   VWAP=self.pv / self.vol if self.vol else math.nan)
+        self.prev_close = c
+        return row
+
+
+def _keys(index):
+    return index.asi8 if isinstance(index, pd.DatetimeIndex) else np.asarray(index)
+
+
+class _Committed:
+    """Indicator rows of the closed bars, in a buffer that grows by doubling.
+
+    Rows older than the first bar of the latest request are dropped when the
+    buffer is compacted, so it never outgrows the stored retention window.
+    """
+
+    def __init__(self, keys, values):
+        self.keys, self.values = keys.copy(), np.array(values, dtype="float64")
+        self.lo, self.hi = 0, len(keys)
+
+    def __len__(self): return self.hi - self.lo
+
+    def first(self): return self.keys[self.lo]
+
+    def last(self): return self.keys[self.hi - 1]
+
+    def rows_from(self, key):
+        return self.values[self.lo + self.keys[self.lo:self.hi].searchsorted(key):self.hi]
+
+    def append(self, keys, rows, keep_from):
+        k = len(keys)
+        if self.hi + k > len(self.keys):
+            lo = self.lo + self.keys[self.lo:self.hi].searchsorted(keep_from)
+            live = self.hi - lo
+            cap = max(len(self.keys), 2 * (live + k))
+            key_buf, val_buf = np.empty(cap, self.keys.dtype), np.empty((cap, len(COLUMNS)))
+            key_buf[:live], val_buf[:live] = self.keys[lo:self.hi], self.values[lo:self.hi]
+            self.keys, self.values, self.lo, self.hi = key_buf, val_buf, 0, live
+        self.keys[self.hi:self.hi + k], self.values[self.hi:self.hi + k] = keys, rows
+        self.hi += k
+
+
+class IndicatorEngine:
+    def __init__(self):
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def compute(self, data, key=None, interval=None):
+        """Return a copy of ``data`` with the indicator columns appended."""
+        if len(data) < 2: return data
+        data = data.drop(columns=[c for c in COLUMNS if c in data.columns])
+        return data.join(self.indicators(data, key=key, interval=interval))
+
+    @timed("indicators", "compute")
+    def indicators(self, data, key=None, interval=None):
+        """Just the indicator columns for ``data``, on the same index."""
+        if len(data) < 2: return pd.DataFrame(np.nan, index=data.index, columns=COLUMNS)
+        intraday = interval in INTRADAY
+        if key is None: return compute_all(data, intraday)
+        with self._lock: lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            entry = self._entries.get(key)
+            ind = self._extend(entry, data) if entry else None
+            if ind is None:
+                # Cold start: commit everything but the provisional last bar.
+                ind = compute_all(data, intraday)
+                state = _State.from_history(data.iloc[:-1], ind.iloc[:-1], intraday)
+                committed = _Committed(_keys(data.index[:-1]), ind.to_numpy()[:-1])
+                self._entries[key] = {"state": state, "committed": committed, "intraday": intraday}
+        return ind
+
+    def forget(self, key):
+        """Drop the incremental state kept for ``key``, unless it is being updated."""
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None or lock.locked(): return
+            del self._locks[key]
+            self._entries.pop(key, None)
+
+    def _extend(self, entry, data):
+        committed = entry["committed"]
+        keys = _keys(data.index)
+        if not len(committed) or keys[0] < committed.first(): return None
+        pos = keys.searchsorted(committed.last(), side="right")
+        if pos == 0 or keys[pos - 1] != committed.last(): return None
+        head = committed.rows_from(keys[0])
+        # The stored rows must line up with the request, or the state is stale.
+        if len(head) != pos: return None
+        tail = data.iloc[pos:]
+        if tail.empty: return pd.DataFrame(head, index=data.index, columns=COLUMNS)
+        h, l, c, v = _columns(tail)
+        state = entry["state"]
+        rows = [state.update(tail.index[i], h[i], l[i], c[i], v[i]) for i in range(len(tail) - 1)]
+        if rows:
+            committed.append(keys[pos:-1], [[r[col] for col in COLUMNS] for r in rows], keys[0])
+            head = committed.rows_from(keys[0])
+        provisional = copy.deepcopy(state).update(tail.index[-1], h[-1], l[-1], c[-1], v[-1])
+        return pd.DataFrame(np.vstack([head, [[provisional[col] for col in COLUMNS]]]), index=data.index, columns=COLUMNS)
+
+
+ENGINE = IndicatorEngine()
@@ -0,0 +1,84 @@
+"""Background-refreshed intraday snapshot for the Map page's movers grid.
+
+The service downloads the whole universe in a few parallel multi-ticker
+batches, keeps the result in memory and refreshes it on a daemon thread, so
+page reruns only read a dict. The universe is the 30 mega caps by default and
+can be replaced with any list (e.g. the S&P 500) via ``PROSTOCK_MOVERS_UNIVERSE``
+pointing at a file of comma or newline separated symbols.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from prostock.cache import BackgroundRefresher
+from prostock.providers import get_provider
+
+DEFAULT_UNIVERSE = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "BRK-B", "LLY", "AVGO", "JPM", "V", "UNH", "MA", "XOM", "JNJ", "PG", "HD", "COST", "ABBV", "MRK", "CRM", "AMD", "PEP", "KO", "BAC", "WMT", "CVX", "TMO", "CSCO"]
+REFRESH_SECONDS = 60
+CHUNK_SIZE = 100
+MAX_WORKERS = 4
+
+
+def load_universe(path=None):
+    path = path or os.environ.get("PROSTOCK_MOVERS_UNIVERSE")
+    if not path: return list(DEFAULT_UNIVERSE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            symbols = [s.strip().upper() for s in f.read().replace(",", "\n").splitlines()]
+        return list(dict.fromkeys(s for s in symbols if s)) or list(DEFAULT_UNIVERSE)
+    except OSError: return list(DEFAULT_UNIVERSE)
+
+
+def _fetch_chunk(symbols):
+    try:
+        data = get_provider().download(symbols, period="1d", interval="1d", group_by="column", threads=True)
+    except Exception: return {}
+    if data is None or data.empty: return {}
+    opens, closes = data['Open'], data['Close']
+    if isinstance(closes, pd.Series): opens, closes = opens.to_frame(symbols[0]), closes.to_frame(symbols[0])
+    out = {}
+    for sym in symbols:
+        if sym not in closes.columns: continue
+        o, c = opens[sym].dropna(), closes[sym].dropna()
+        if o.empty or c.empty or not o.iloc[0]: continue
+        out[sym] = ((float(c.iloc[-1]) - float(o.iloc[0])) / float(o.iloc[0])) * 100
+    return out
+
+
+class MoversSnapshot(BackgroundRefresher):
+    thread_name = "movers-refresh"
+
+    def __init__(self, universe=None, refresh_seconds=REFRESH_SECONDS, chunk_size=CHUNK_SIZE):
+        super().__init__()
+        self.universe = list(universe or DEFAULT_UNIVERSE)
+        self.refresh_seconds = refresh_seconds
+        self.chunk_size = chunk_size
+        self.changes = {}
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        chunks = [self.universe[i:i + self.chunk_size] for i in range(0, len(self.universe), self.chunk_size)]
+        changes = {}
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks)) or 1) as pool:
+            # Chunks keep the caller's request priority.
+            for fut in [pool.submit(contextvars.copy_context().run, _fetch_chunk, ch) for ch in chunks]: changes.update(fut.result())
+        with self._lock:
+            # Keep the previous value for symbols that failed this round.
+            self.changes = {**self.changes, **changes}
+            self.updated_at = time.time()
+
+    def snapshot(self, wait=5.0):
+        """Return ``(changes, updated_at)``; waits briefly for the first attempt only."""
+        self.wait(wait)
+        with self._lock: return dict(self.changes), self.updated_at
+
+    def top(self, n):
+        changes, _ = self.snapshot()
+        if len(self.universe) <= n: return [(t, changes.get(t)) for t in self.universe]
+        ranked = sorted(changes.items(), key=lambda kv: abs(kv[1]), reverse=True)
+        return ranked[:n] or [(t, None) for t in self.universe[:n]]
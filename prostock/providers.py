@@ -0,0 +1,182 @@
+"""Market-data provider interface and its live, recording and replay backends.
+
+All Yahoo access in the app goes through ``get_provider()``. The backend is
+chosen with ``PROSTOCK_PROVIDER``:
+
+* ``live`` (default) calls yfinance directly.
+* ``record`` calls yfinance and writes every response under
+  ``PROSTOCK_RECORD_DIR``.
+* ``replay`` serves those recordings without network access, sleeping
+  ``PROSTOCK_REPLAY_LATENCY`` seconds per call to imitate upstream latency.
+
+Network backends go through ``ScheduledProvider``, which routes each call
+through the process-wide upstream scheduler (priorities, single-flight,
+rate limit, backoff). Whichever backend is active is wrapped in
+``InstrumentedProvider`` so every call is timed and counted by
+``prostock.telemetry``.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from prostock.scheduler import SCHEDULER
+from prostock.telemetry import span, upstream
+
+RECORD_DIR = os.environ.get("PROSTOCK_RECORD_DIR", os.path.join(".prostock_cache", "recordings"))
+EMPTY = {"download": pd.DataFrame, "history": pd.DataFrame, "info": dict, "news": list}
+
+
+class MarketDataProvider:
+    def download(self, tickers, **kwargs): raise NotImplementedError
+    def history(self, ticker, **kwargs): raise NotImplementedError
+    def info(self, ticker): raise NotImplementedError
+    def news(self, ticker): raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    def __init__(self):
+        import yfinance as yf
+        self.yf = yf
+
+    def download(self, tickers, **kwargs):
+        kwargs.setdefault("progress", False)
+        return self.yf.download(tickers, **kwargs)
+
+    def history(self, ticker, **kwargs): return self.yf.Ticker(ticker).history(**kwargs)
+    def info(self, ticker): return self.yf.Ticker(ticker).info
+    def news(self, ticker): return self.yf.Ticker(ticker).news
+
+
+class InstrumentedProvider(MarketDataProvider):
+    """Times every call and counts it as an upstream request of ``service``."""
+
+    def __init__(self, inner, service="yfinance"):
+        self.inner, self.service = inner, service
+
+    def _call(self, method, *args, **kwargs):
+        with span(f"{self.service}.{method}", "fetch"):
+            try: result = getattr(self.inner, method)(*args, **kwargs)
+            except Exception:
+                upstream(self.service, method, False); raise
+        upstream(self.service, method)
+        return result
+
+    def download(self, tickers, **kwargs): return self._call("download", tickers, **kwargs)
+    def history(self, ticker, **kwargs): return self._call("history", ticker, **kwargs)
+    def info(self, ticker): return self._call("info", ticker)
+    def news(self, ticker): return self._call("news", ticker)
+
+
+class ScheduledProvider(MarketDataProvider):
+    """Sends every call through ``SCHEDULER`` as a request to ``host``."""
+
+    def __init__(self, inner, host="yahoo", scheduler=SCHEDULER):
+        self.inner, self.host, self.scheduler = inner, host, scheduler
+
+    def _call(self, method, *args, **kwargs):
+        key = request_key(method, args, kwargs)
+        result = self.scheduler.call(self.host, lambda: getattr(self.inner, method)(*args, **kwargs), key=key)
+        # Coalesced callers share one result; give each its own frame to relabel.
+        return result.copy(deep=False) if isinstance(result, pd.DataFrame) else result
+
+    def download(self, tickers, **kwargs): return self._call("download", tickers, **kwargs)
+    def history(self, ticker, **kwargs): return self._call("history", ticker, **kwargs)
+    def info(self, ticker): return self._call("info", ticker)
+    def news(self, ticker): return self._call("news", ticker)
+
+
+def request_key(method, args, kwargs):
+    raw = repr((method, args, sorted(kwargs.items())))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class _Recorded(MarketDataProvider):
+    def __init__(self, root=RECORD_DIR):
+        self.root = root
+
+    def _path(self, method, args, kwargs):
+        return os.path.join(self.root, method, f"{request_key(method, args, kwargs)}.pkl")
+
+    def _call(self, method, *args, **kwargs): raise NotImplementedError
+
+    def download(self, tickers, **kwargs):
+        if isinstance(tickers, (list, tuple)): tickers = tuple(tickers)
+        return self._call("download", tickers, **kwargs)
+
+    def history(self, ticker, **kwargs): return self._call("history", ticker, **kwargs)
+    def info(self, ticker): return self._call("info", ticker)
+    def news(self, ticker): return self._call("news", ticker)
+
+
+class RecordingProvider(_Recorded):
+    """Pass calls through to ``inner`` and persist each response (or error)."""
+
+    def __init__(self, inner, root=RECORD_DIR):
+        super().__init__(root)
+        self.inner = inner
+        self._lock = threading.Lock()
+
+    def _call(self, method, *args, **kwargs):
+        target = list(args[0]) if method == "download" and isinstance(args[0], tuple) else args[0]
+        try: result, error = getattr(self.inner, method)(target, *args[1:], **kwargs), None
+        except Exception as e: result, error = None, e
+        path = self._path(method, args, kwargs)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f: pickle.dump({"result": result, "error": repr(error) if error else None}, f)
+        if error: raise error
+        return result
+
+
+class ReplayProvider(_Recorded):
+    """Serve recorded responses deterministically, with optional fixed latency.
+
+    Unrecorded requests return an empty result of the right type, or raise
+    ``KeyError`` when ``strict`` is set.
+    """
+
+    def __init__(self, root=RECORD_DIR, latency=0.0, strict=False):
+        super().__init__(root)
+        self.latency = latency
+        self.strict = strict
+
+    def _call(self, method, *args, **kwargs):
+        if self.latency: time.sleep(self.latency)
+        path = self._path(method, args, kwargs)
+        try:
+            with open(path, "rb") as f: entry = pickle.load(f)
+        except FileNotFoundError:
+            if self.strict: raise KeyError(f"no recording for {method}{args} {kwargs}")
+            return EMPTY[method]()
+        if entry["error"]: raise RuntimeError(entry["error"])
+        result = entry["result"]
+        return result.copy() if hasattr(result, "copy") else result
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def make_provider(kind=None):
+    kind = (kind or os.environ.get("PROSTOCK_PROVIDER", "live")).lower()
+    if kind == "replay": return ReplayProvider(latency=float(os.environ.get("PROSTOCK_REPLAY_LATENCY", "0")))
+    if kind == "record": return RecordingProvider(ScheduledProvider(YFinanceProvider()))
+    if kind == "live": return ScheduledProvider(YFinanceProvider())
+    raise ValueError(f"unknown market data provider: {kind}")
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None: _provider = InstrumentedProvider(make_provider())
+    return _provider
+
+
+def set_provider(provider):
+    global _provider
+    _provider = provider if isinstance(provider, InstrumentedProvider) else InstrumentedProvider(provider)
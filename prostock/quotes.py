@@ -0,0 +1,124 @@
+"""Batched quote engine with a process-wide, per-symbol TTL cache.
+
+Every session in the Streamlit server imports this module once, so the cache
+below is shared: the homepage cards, the watchlist and any other caller reuse
+each other's quotes instead of hitting Yahoo once per symbol per session.
+
+Quotes are served stale-while-revalidate: once a symbol has had a good
+quote, an expired or failed lookup returns that last good value straight
+away and a background refresh replaces it. A symbol that has never been
+priced comes back as ``None`` instead of a made-up ``0.0``.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from prostock.cache import LRUCache, TTLCache
+from prostock.providers import get_provider
+from prostock.scheduler import BACKGROUND, priority
+from prostock.telemetry import cache_event, timed
+
+QUOTE_TTL = 10
+MAX_WORKERS = 8
+LAST_GOOD_SIZE = 5000
+
+_cache = TTLCache(QUOTE_TTL, name="quotes")
+_last_good = LRUCache(LAST_GOOD_SIZE)
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="quotes-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _quote_from_closes(closes):
+    closes = closes.dropna()
+    if closes.empty: return None
+    price = float(closes.iloc[-1])
+    prev = float(closes.iloc[-2]) if len(closes) > 1 else None
+    change = ((price - prev) / prev) * 100 if price and prev else 0.0
+    return price, change
+
+
+def _fetch_batch(symbols):
+    # One multi-ticker request; each column is cleaned independently because
+    # KRX, US and 24/7 crypto rows do not line up on the same dates.
+    try:
+        data = get_provider().download(symbols, period="5d", interval="1d", group_by="column", threads=True)
+    except Exception: return {}
+    if data is None or data.empty or 'Close' not in data.columns.get_level_values(0): return {}
+    closes = data['Close']
+    if isinstance(closes, pd.Series): closes = closes.to_frame(symbols[0])
+    out = {}
+    for sym in symbols:
+        if sym in closes.columns and (q := _quote_from_closes(closes[sym])): out[sym] = q
+    return out
+
+
+def _fetch_single(ticker):
+    try:
+        provider = get_provider()
+        info = provider.info(ticker)
+        price = info.get('currentPrice') or info.get('regularMarketPrice')
+        if not price:
+            d = provider.history(ticker, period="1d")
+            if not d.empty: price = d['Close'].iloc[-1]
+        if not price: return None
+        prev = info.get('previousClose')
+        if not prev:
+            d = provider.history(ticker, period="5d")
+            if len(d) > 1: prev = d['Close'].iloc[-2]
+        change = ((price - prev)/prev)*100 if prev else 0.0
+        return price, change
+    except Exception: return None
+
+
+def _load(symbols):
+    fetched = _fetch_batch(symbols)
+    # Anything the batch could not price falls back to the per-symbol
+    # lookup, fanned out so the wait is the slowest symbol, not the sum.
+    leftover = [s for s in symbols if s not in fetched]
+    if leftover:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(leftover))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, _fetch_single, s) for s in leftover]
+            fetched.update((s, f.result()) for s, f in zip(leftover, futures) if f.result())
+    _last_good.set_many(fetched)
+    # Failures are cached too (as None) so a dead symbol is retried once per TTL.
+    result = {s: fetched.get(s) for s in symbols}
+    _cache.set_many(result)
+    return result
+
+
+def _revalidate(symbols):
+    with _refreshing_lock:
+        symbols = [s for s in symbols if s not in _refreshing]
+        _refreshing.update(symbols)
+    if not symbols: return
+
+    def run():
+        try:
+            with priority(BACKGROUND): _load(symbols)
+        except Exception: pass
+        finally:
+            with _refreshing_lock: _refreshing.difference_update(symbols)
+    _refresher.submit(run)
+
+
+@timed("quotes", "fetch")
+def get_quotes(symbols):
+    """Return ``{symbol: (price, pct_change) or None}`` for every requested symbol."""
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    quotes = _cache.get_many(symbols)
+    missing = [s for s in symbols if s not in quotes]
+    if missing:
+        known = _last_good.get_many(missing)
+        if known: _revalidate(list(known))
+        blocking = [s for s in missing if s not in known]
+        if blocking: quotes.update(_load(blocking))
+    # Expired and failed symbols fall back to their last good quote.
+    gaps = [s for s in symbols if quotes.get(s) is None]
+    if gaps:
+        stale = _last_good.get_many(gaps)
+        cache_event("quotes", "stale", len(stale))
+        quotes.update(stale)
+    return {s: quotes.get(s) for s in symbols}
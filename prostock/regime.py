@@ -0,0 +1,66 @@
+"""Process-wide market regime (Fear & Greed proxy) computed in the background.
+
+The composite score is the same for every user, so one daemon thread
+recomputes it on a schedule from VIX and six months of S&P 500 closes. All
+sessions read the latest value from memory. A rolling series of past scores
+is kept for charting.
+"""
+import threading
+from collections import deque
+
+import pandas as pd
+
+from prostock.cache import BackgroundRefresher
+from prostock.providers import get_provider
+
+REFRESH_SECONDS = 300
+HISTORY_SIZE = 2016  # one week at the default refresh rate
+NEUTRAL = {"score": 50, "label": "Neutral", "vix": None}
+
+
+def label_for(score):
+    if score < 25: return "Extreme Fear"
+    if score < 45: return "Fear"
+    if score < 55: return "Neutral"
+    if score < 75: return "Greed"
+    return "Extreme Greed"
+
+
+def compute_regime(provider=None):
+    provider = provider or get_provider()
+    vix = float(provider.history("^VIX", period="5d")['Close'].iloc[-1])
+    sp500 = provider.history("^GSPC", period="6mo")
+    if sp500.empty: return dict(NEUTRAL, vix=vix)
+    current_sp = sp500['Close'].iloc[-1]
+    avg_sp = sp500['Close'].mean()
+    fear_score = max(0, min(100, 100 - (vix - 10) * 2.5))
+    momentum_score = max(0, min(100, 50 + ((current_sp - avg_sp) / avg_sp) * 500))
+    final_score = (fear_score * 0.4) + (momentum_score * 0.6)
+    return {"score": int(final_score), "label": label_for(final_score), "vix": vix}
+
+
+class RegimeService(BackgroundRefresher):
+    thread_name = "regime-refresh"
+
+    def __init__(self, refresh_seconds=REFRESH_SECONDS, history_size=HISTORY_SIZE):
+        super().__init__()
+        self.refresh_seconds = refresh_seconds
+        self._history = deque(maxlen=history_size)
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        value = compute_regime()
+        with self._lock:
+            self._latest = value
+            self._history.append((pd.Timestamp.now(tz="UTC"), value["score"], value["vix"]))
+        return value
+
+    def current(self, wait=3.0):
+        """Latest ``{"score", "label", "vix"}``; waits briefly for the first attempt only."""
+        self.wait(wait)
+        with self._lock: return dict(self._latest or NEUTRAL)
+
+    def history(self):
+        with self._lock: rows = list(self._history)
+        return pd.DataFrame(rows, columns=["time", "score", "vix"]).set_index("time")
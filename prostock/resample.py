@@ -0,0 +1,82 @@
+"""Local OHLCV resampling, so one upstream series serves several intervals.
+
+Only the finest interval whose retention still covers the requested window
+is fetched; every coarser chart interval is aggregated from it with
+``reduceat``. Buckets are laid out in the exchange's wall-clock time and
+anchored at its session open, so they never straddle an overnight gap or a
+DST change: hourly US bars run 9:30, 10:30, ... like Yahoo's, KRX buckets
+start at 9:00, and FX, futures and 24/7 crypto buckets are clock-aligned.
+Weekly bars start on Monday.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+STEP = {"1m": timedelta(minutes=1), "5m": timedelta(minutes=5), "15m": timedelta(minutes=15), "1h": timedelta(hours=1),
+        "4h": timedelta(hours=4), "1d": timedelta(days=1), "1wk": timedelta(days=7)}
+# Intervals fetched upstream, finest first, with how far back Yahoo serves them.
+NATIVE = {"1m": timedelta(days=7), "5m": timedelta(days=60), "1h": timedelta(days=730), "1d": None}
+# (timezone, session open) used to lay out intraday buckets.
+MARKETS = {
+    "us": ("America/New_York", timedelta(hours=9, minutes=30)),
+    "krx": ("Asia/Seoul", timedelta(hours=9)),
+    "fx": ("Europe/London", timedelta(0)),
+    "futures": ("America/New_York", timedelta(0)),
+    "crypto": ("UTC", timedelta(0)),
+}
+
+
+def market(ticker):
+    t = ticker.upper()
+    if t.endswith((".KS", ".KQ")) or t in ("^KS11", "^KQ11", "^KS200"): return "krx"
+    if t.endswith("=X"): return "fx"
+    if t.endswith("=F"): return "futures"
+    if t.endswith("-USD"): return "crypto"
+    return "us"
+
+
+def source_interval(interval, span=None):
+    """The upstream interval to fetch for ``interval`` over a window of ``span``."""
+    if interval not in STEP: return interval
+    # Daily bars carry the exchange's official OHLC, so they are never built from intraday ones.
+    if STEP[interval] >= STEP["1d"]: return "1d"
+    bases = [b for b, keep in NATIVE.items() if keep is not None and STEP[interval] % STEP[b] == timedelta(0)]
+    for base in bases:
+        if span is None or span <= NATIVE[base]: return base
+    return bases[-1]
+
+
+def aggregate(data, starts, index):
+    """OHLCV of the runs of rows beginning at ``starts``, stamped with ``index``."""
+    n = len(data)
+    out = {}
+    if 'Open' in data.columns: out['Open'] = data['Open'].to_numpy()[starts]
+    if 'High' in data.columns: out['High'] = np.maximum.reduceat(data['High'].to_numpy(), starts)
+    if 'Low' in data.columns: out['Low'] = np.minimum.reduceat(data['Low'].to_numpy(), starts)
+    if 'Close' in data.columns: out['Close'] = data['Close'].to_numpy()[np.r_[starts[1:] - 1, n - 1]]
+    if 'Volume' in data.columns: out['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(out, index=index)
+
+
+def buckets(index, interval, ticker=""):
+    """Wall-clock start of the ``interval`` bucket each timestamp falls in."""
+    tz, open_at = MARKETS[market(ticker)]
+    local = index.tz_convert(tz).tz_localize(None) if index.tz is not None else index
+    day = local.normalize()
+    step = STEP[interval]
+    if step >= STEP["1wk"]: return local, day - pd.to_timedelta(day.dayofweek, unit="D")
+    if step >= STEP["1d"]: return local, day
+    origin = day + open_at
+    return local, origin + ((local - origin) // step) * step
+
+
+def resample(data, interval, ticker=""):
+    """Aggregate sorted bars to ``interval`` buckets."""
+    if data.empty or not isinstance(data.index, pd.DatetimeIndex): return data
+    local, start = buckets(data.index, interval, ticker)
+    keys = start.asi8
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    # Stamp each bucket in the original timezone by stepping back from its
+    # first bar, which avoids re-localizing ambiguous wall-clock times.
+    return aggregate(data, starts, data.index[starts] - (local[starts] - start[starts]))
@@ -0,0 +1,187 @@
+"""Process-wide scheduler that every outbound request goes through.
+
+Requests wait in one priority queue: the ticker on screen (``INTERACTIVE``)
+goes first, then page content such as the homepage cards (``PAGE``), then
+refreshes and prefetches (``BACKGROUND``). A small worker pool drains the
+queue. An identical request that is already queued or in flight is joined
+rather than repeated, so a stampede of sessions costs one upstream call.
+Each host has a token bucket. A 429 or 5xx answer is retried with
+exponential backoff, and the host's bucket is paused so that every other
+caller backs off as well.
+
+The caller's priority is read from a context variable; set it with
+``with priority(INTERACTIVE): ...``. Thread pools do not inherit it, so
+submit work through ``contextvars.copy_context().run`` where it matters.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from prostock.telemetry import cache_event
+
+INTERACTIVE, PAGE, BACKGROUND = 0, 1, 2
+MAX_WORKERS = 8
+RETRIES = 3
+BACKOFF = 0.5  # seconds before the first retry; doubles per attempt
+MAX_BACKOFF = 30
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# (requests per second, burst) per host; other hosts get DEFAULT_LIMIT.
+HOST_LIMITS = {"yahoo": (4.0, 8), "generativelanguage.googleapis.com": (2.0, 6)}
+DEFAULT_LIMIT = (2.0, 4)
+
+_priority = contextvars.ContextVar("prostock_priority", default=PAGE)
+
+
+@contextlib.contextmanager
+def priority(level):
+    token = _priority.set(level)
+    try: yield
+    finally: _priority.reset(token)
+
+
+class Throttled(Exception):
+    """Raised by a request function when the host answered 429 or 5xx."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        try: self.retry_after = float(retry_after) if retry_after is not None else None
+        except ValueError: self.retry_after = None
+
+
+def retryable(exc):
+    if getattr(exc, "status_code", None) in RETRY_STATUS: return True
+    # yfinance signals throttling with its own exception types.
+    text = f"{type(exc).__name__} {exc}"
+    return "RateLimit" in text or "Too Many Requests" in text
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self._tokens, self._stamp = float(burst), time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_take(self):
+        """Take a token if one is free; otherwise return the seconds until one is."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until: return self._paused_until - now
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1; return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def take(self):
+        while (wait := self.try_take()) > 0: time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock: self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _Job:
+    __slots__ = ("host", "key", "fn", "level", "started", "future")
+
+    def __init__(self, host, key, fn, level):
+        self.host, self.key, self.fn, self.level = host, key, fn, level
+        self.started = False
+        self.future = Future()
+
+
+class UpstreamScheduler:
+    def __init__(self, workers=MAX_WORKERS, limits=HOST_LIMITS, default_limit=DEFAULT_LIMIT, retries=RETRIES, backoff=BACKOFF):
+        self.workers = workers
+        self.limits, self.default_limit = dict(limits), default_limit
+        self.retries, self.backoff = retries, backoff
+        self._queue = []
+        self._seq = itertools.count()
+        self._inflight = {}
+        self._buckets = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._local = threading.local()
+
+    def bucket(self, host):
+        with self._cond:
+            if host not in self._buckets: self._buckets[host] = TokenBucket(*self.limits.get(host, self.default_limit))
+            return self._buckets[host]
+
+    def submit(self, host, fn, key=None, level=None):
+        """Queue ``fn``; requests with the same ``(host, key)`` share one run."""
+        level = _priority.get() if level is None else level
+        with self._cond:
+            job = self._inflight.get((host, key)) if key is not None else None
+            if job is None:
+                job = _Job(host, key, fn, level)
+                if key is not None: self._inflight[(host, key)] = job
+                self._push(job)
+            else:
+                cache_event("upstream", "coalesced")
+                if level < job.level and not job.started:
+                    # A more urgent caller joined: queue the job again at its level.
+                    job.level = level; self._push(job)
+        return job.future
+
+    def call(self, host, fn, key=None, level=None):
+        # A request made from inside a scheduled one runs in place, so a full
+        # pool can never wait on itself.
+        if getattr(self._local, "worker", False): return self._run(host, fn)
+        return self.submit(host, fn, key, level).result()
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (job.level, next(self._seq), job))
+        if len(self._threads) < self.workers:
+            t = threading.Thread(target=self._work, name=f"upstream-{len(self._threads)}", daemon=True)
+            self._threads.append(t); t.start()
+        self._cond.notify()
+
+    def _next(self):
+        """The most urgent queued job whose host has a token free, waiting as needed."""
+        with self._cond:
+            while True:
+                wait = None
+                # Jobs are tried in priority order, so a throttled host holds
+                # back only its own requests.
+                for entry in sorted(self._queue):
+                    job = entry[2]
+                    if job.started: continue
+                    free_in = self.bucket(job.host).try_take()
+                    if not free_in:
+                        job.started = True
+                        self._queue = [e for e in self._queue if not e[2].started]
+                        heapq.heapify(self._queue)
+                        return job
+                    wait = free_in if wait is None else min(wait, free_in)
+                self._cond.wait(wait)
+
+    def _work(self):
+        self._local.worker = True
+        while True:
+            job = self._next()
+            try: job.future.set_result(self._run(job.host, job.fn, has_token=True))
+            except BaseException as e: job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    if self._inflight.get((job.host, job.key)) is job: del self._inflight[(job.host, job.key)]
+
+    def _run(self, host, fn, has_token=False):
+        bucket = self.bucket(host)
+        for attempt in itertools.count():
+            if not has_token: bucket.take()
+            has_token = False
+            try: return fn()
+            except Exception as e:
+                if attempt >= self.retries or not retryable(e): raise
+                delay = getattr(e, "retry_after", None) or min(MAX_BACKOFF, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+                cache_event("upstream", "retry")
+                bucket.pause(delay)
+
+
+SCHEDULER = UpstreamScheduler()
@@ -0,0 +1,113 @@
+"""Multi-ticker screener over a wide close-price panel.
+
+Each worker downloads one chunk of the universe with a single multi-ticker
+request and computes its indicators straight away, so loading and compute
+overlap. The indicators are evaluated on a dates x tickers array in one pass
+using the same windows as the terminal, and only the latest value of each
+indicator is kept for screening.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prostock.cache import SingleFlight, TTLCache, cached_call
+from prostock.indicators import RSI_WINDOW, SMA_WINDOW
+from prostock.providers import get_provider
+from prostock.telemetry import timed
+
+MOMENTUM_WINDOW = 20
+CHUNK_SIZE = 50
+MAX_WORKERS = 8
+SCAN_TTL = 300
+COLUMNS = ["Price", "Change", "RSI", "SMA", "BB_Upper", "BB_Lower", "BB_Pos", "Momentum"]
+PRESETS = {
+    "Oversold at lower band": "RSI < 30 and Price < BB_Lower",
+    "Overbought at upper band": "RSI > 70 and Price > BB_Upper",
+    "Uptrend with momentum": "Price > SMA and Momentum > 5",
+    "Pullback in uptrend": "Price > SMA and RSI < 45",
+}
+
+_cache = TTLCache(SCAN_TTL, name="screener")
+_flight = SingleFlight()
+
+_CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*(-?[\d.]+|\w+)\s*$")
+_OPS = {"<": np.less, ">": np.greater, "<=": np.less_equal, ">=": np.greater_equal, "==": np.equal, "!=": np.not_equal}
+
+
+def compute_panel(closes):
+    """Latest indicator values per column of a dates x tickers close frame."""
+    # KRX, US and 24/7 crypto trade on different days, so each column's own
+    # bars are right-aligned (NaNs moved to the top) instead of filled; a
+    # window that still holds a NaN (too little history) yields NaN.
+    c = closes.sort_index().to_numpy(dtype="float64")
+    c = np.take_along_axis(c, np.argsort(~np.isnan(c), axis=0, kind="stable"), axis=0)
+    n = len(c)
+    last = {name: np.full(c.shape[1], np.nan) for name in COLUMNS}
+    if not n: return pd.DataFrame(last, index=closes.columns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        last["Price"] = c[-1]
+        if n > 1: last["Change"] = (c[-1] / c[-2] - 1) * 100
+        if n >= SMA_WINDOW:
+            w = c[-SMA_WINDOW:]
+            sma, std = w.mean(axis=0), w.std(axis=0, ddof=1)
+            last["SMA"], last["BB_Upper"], last["BB_Lower"] = sma, sma + 2 * std, sma - 2 * std
+            last["BB_Pos"] = (c[-1] - last["BB_Lower"]) / (last["BB_Upper"] - last["BB_Lower"])
+        if n > RSI_WINDOW:
+            d = np.diff(c[-(RSI_WINDOW + 1):], axis=0)
+            gain, loss = np.clip(d, 0, None).mean(axis=0), np.clip(-d, 0, None).mean(axis=0)
+            last["RSI"] = 100 - (100 / (1 + gain / loss))
+        if n > MOMENTUM_WINDOW: last["Momentum"] = (c[-1] / c[-1 - MOMENTUM_WINDOW] - 1) * 100
+    return pd.DataFrame(last, index=closes.columns)
+
+
+def _scan_chunk(symbols, period, interval):
+    try:
+        data = get_provider().download(symbols, period=period, interval=interval, group_by="column", threads=True)
+    except Exception: return None
+    if data is None or data.empty or 'Close' not in data.columns.get_level_values(0): return None
+    closes = data['Close']
+    if isinstance(closes, pd.Series): closes = closes.to_frame(symbols[0])
+    return compute_panel(closes[[s for s in symbols if s in closes.columns]].dropna(how="all"))
+
+
+@timed("screener.scan", "fetch")
+def scan(tickers, period="6mo", interval="1d", chunk_size=CHUNK_SIZE):
+    """Indicator table (one row per ticker) for ``tickers``, cached for a few minutes."""
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+
+    def load():
+        chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+        if not chunks: return pd.DataFrame(columns=COLUMNS)
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(chunks))) as pool:
+            parts = [p for p in pool.map(lambda ch: _scan_chunk(ch, period, interval), chunks) if p is not None]
+        table = pd.concat(parts) if parts else pd.DataFrame(columns=COLUMNS)
+        return table.reindex([t for t in tickers if t in table.index])
+
+    return cached_call(_cache, _flight, (tuple(tickers), period, interval), load)
+
+
+def _mask(table, condition):
+    m = _CONDITION.match(condition)
+    if not m: raise ValueError(f"Cannot parse condition: {condition!r}")
+    left, op, right = m.groups()
+    if left not in table.columns: raise ValueError(f"Unknown column: {left}")
+    if right in table.columns: rhs = table[right].to_numpy()
+    else:
+        try: rhs = float(right)
+        except ValueError: raise ValueError(f"Unknown column: {right}") from None
+    return _OPS[op](table[left].to_numpy(), rhs)
+
+
+def screen(table, expression="", sort_by=None, ascending=True):
+    """Filter ``table`` by e.g. ``"RSI < 30 and Price < BB_Lower"`` (``and`` binds before ``or``)."""
+    if expression.strip():
+        mask = np.zeros(len(table), dtype=bool)
+        for clause in re.split(r"\s+or\s+", expression.strip(), flags=re.I):
+            part = np.ones(len(table), dtype=bool)
+            for cond in re.split(r"\s+and\s+", clause, flags=re.I): part &= _mask(table, cond)
+            mask |= part
+        table = table[mask]
+    if sort_by: table = table.sort_values(sort_by, ascending=ascending)
+    return table
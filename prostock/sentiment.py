@@ -0,0 +1,49 @@
+"""Headline sentiment scoring with a process-wide memo.
+
+TextBlob is slow per call, and many tickers share the same market headlines,
+so polarity scores are memoized by a hash of the headline text in a bounded
+LRU shared by every session. TextBlob itself is only imported on the first
+cache miss.
+"""
+import hashlib
+
+from prostock.cache import LRUCache
+from prostock.telemetry import timed
+
+MAX_ENTRIES = 20000
+POSITIVE, NEGATIVE = 0.05, -0.05
+
+_scores = LRUCache(MAX_ENTRIES, name="sentiment")
+
+
+def _key(text): return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
+
+
+def _polarity(texts):
+    from textblob import TextBlob
+    return [TextBlob(t).sentiment.polarity for t in texts]
+
+
+@timed("sentiment", "compute")
+def score_headlines(titles):
+    """Return the polarity of each title, scoring only the ones not seen before."""
+    keys = [_key(t) for t in titles]
+    known = _scores.get_many(keys)
+    missing = {k: t for k, t in zip(keys, titles) if k not in known}
+    if missing:
+        fresh = dict(zip(missing, _polarity(list(missing.values()))))
+        _scores.set_many(fresh)
+        known.update(fresh)
+    return [known[k] for k in keys]
+
+
+def summarize(polarities):
+    """Return ``(pos, neg, neu, label)`` for a list of polarity scores."""
+    if not polarities: return 0, 0, 0, "Neutral"
+    pos = sum(1 for p in polarities if p > POSITIVE)
+    neg = sum(1 for p in polarities if p < NEGATIVE)
+    avg_pol = sum(polarities) / len(polarities)
+    if avg_pol > POSITIVE: label = "Positive"
+    elif avg_pol < NEGATIVE: label = "Negative"
+    else: label = "Neutral"
+    return pos, neg, len(polarities) - pos - neg, label
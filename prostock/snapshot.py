@@ -0,0 +1,49 @@
+"""Parallel per-ticker loader for everything the Asset Terminal shows.
+
+``submit_snapshot`` starts the info and news lookups together on a shared
+thread pool and returns a pending handle, so the caller can load bars in the
+meantime. Each part has its own TTL cache, and concurrent sessions
+asking for the same part share one in-flight request.
+"""
+import contextvars
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from prostock.cache import SingleFlight, TTLCache, cached_call
+from prostock.providers import get_provider
+
+INFO_TTL = 300
+NEWS_TTL = 300
+# A failing source is retried after this long instead of on every rerun.
+FAILURE_TTL = 30
+MAX_WORKERS = 16
+
+AssetSnapshot = namedtuple("AssetSnapshot", ["info", "news"])
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="snapshot")
+_flight = SingleFlight()
+_caches = {"info": TTLCache(INFO_TTL, name="info"), "news": TTLCache(NEWS_TTL, name="news")}
+
+
+def _part(kind, key, fn, default):
+    try: return cached_call(_caches[kind], _flight, (kind, key), fn)
+    except Exception:
+        _caches[kind].set((kind, key), default, ttl=FAILURE_TTL)
+        return default
+
+
+def get_info(ticker): return _part("info", ticker, lambda: get_provider().info(ticker) or {}, {})
+def get_news(ticker): return _part("news", ticker, lambda: get_provider().news(ticker) or [], [])
+
+
+class PendingSnapshot:
+    def __init__(self, parts):
+        self._parts = parts
+
+    def result(self):
+        return AssetSnapshot(*(p.result() for p in self._parts))
+
+
+def submit_snapshot(ticker):
+    # The parts run at the caller's request priority.
+    return PendingSnapshot([_pool.submit(contextvars.copy_context().run, fn, ticker) for fn in (get_info, get_news)])
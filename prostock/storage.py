@@ -0,0 +1,133 @@
+"""SQLite-backed user and favorites store shared by every worker process.
+
+The database runs in WAL mode so readers never block the single writer, and
+each worker keeps a small pool of connections. Favorites and user lookups
+are read through a per-process cache. The cache is dropped whenever
+``PRAGMA data_version`` reports a commit from any other connection
+(including other processes), so every worker sees the same watchlists
+without sticky sessions.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DB_PATH = os.environ.get("PROSTOCK_DB", "prostock.db")
+POOL_SIZE = 4
+BUSY_TIMEOUT_MS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS favorites (
+    user_id TEXT NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    ticker TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    PRIMARY KEY (user_id, ticker)
+) WITHOUT ROWID;
+"""
+
+
+class UserStore:
+    def __init__(self, path=DB_PATH, pool_size=POOL_SIZE):
+        self.path = path
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size): self._pool.put(None)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        with self._conn() as conn: conn.executescript(SCHEMA)
+        self._watch = self._connect()
+        self._watch_lock = threading.Lock()
+        self._version = self._data_version()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        conn = self._pool.get()
+        try:
+            if conn is None: conn = self._connect()
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _write(self):
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            changes = conn.total_changes
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            # A write that matched nothing leaves the cache alone.
+            if conn.total_changes != changes:
+                with self._cache_lock: self._cache.clear()
+
+    def _data_version(self):
+        with self._watch_lock: return self._watch.execute("PRAGMA data_version").fetchone()[0]
+
+    def _fresh_cache(self):
+        version = self._data_version()
+        with self._cache_lock:
+            if version != self._version: self._cache.clear(); self._version = version
+            return self._cache
+
+    # --- Users ---
+    def user_exists(self, user_id):
+        cache = self._fresh_cache()
+        with self._cache_lock:
+            if ("user", user_id) in cache: return True
+        with self._conn() as conn:
+            found = conn.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone() is not None
+        if found:
+            with self._cache_lock: cache[("user", user_id)] = True
+        return found
+
+    def create_user(self, user_id):
+        """Return False if the ID is already taken."""
+        with self._write() as conn:
+            cur = conn.execute("INSERT OR IGNORE INTO users (user_id, created_at) VALUES (?, ?)", (user_id, time.time()))
+            return cur.rowcount == 1
+
+    def ensure_user(self, user_id):
+        # Runs on every rerun, so only take the write lock when the user is missing.
+        if self.user_exists(user_id): return
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (user_id, created_at) VALUES (?, ?)", (user_id, time.time()))
+
+    def delete_user(self, user_id):
+        with self._write() as conn: conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+
+    # --- Favorites ---
+    def favorites(self, user_id):
+        cache = self._fresh_cache()
+        with self._cache_lock:
+            if user_id in cache: return list(cache[user_id])
+        with self._conn() as conn:
+            rows = conn.execute("SELECT ticker FROM favorites WHERE user_id = ? ORDER BY added_at", (user_id,)).fetchall()
+        favs = [r[0] for r in rows]
+        with self._cache_lock: cache[user_id] = tuple(favs)
+        return favs
+
+    def add_favorite(self, user_id, ticker):
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO users (user_id, created_at) VALUES (?, ?)", (user_id, time.time()))
+            conn.execute("INSERT OR IGNORE INTO favorites (user_id, ticker, added_at) VALUES (?, ?, ?)", (user_id, ticker, time.time()))
+
+    def remove_favorite(self, user_id, ticker):
+        with self._write() as conn:
+            conn.execute("DELETE FROM favorites WHERE user_id = ? AND ticker = ?", (user_id, ticker))
@@ -0,0 +1,236 @@
+"""Symbol index behind the search boxes: prefix autocomplete and fuzzy lookup.
+
+The listing is a CSV of ``symbol,name,exchange,type,aliases`` rows (aliases
+``|`` separated, which is where the Korean names live). It is compiled once
+into flat arrays -- a sorted term table that acts as a packed prefix trie, and
+a character-trigram inverted index for typo-tolerant matches -- and cached as
+an uncompressed ``.npz`` so later starts load it with a single ``np.load``.
+Rows earlier in the listing rank higher, so keep the popular names on top.
+"""
+import bisect
+import csv
+import hashlib
+import os
+import re
+import sys
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+LISTING = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "symbols.csv")
+INDEX_DIR = os.path.join(".prostock_cache", "symbols")
+MIN_SCORE = 0.35
+# Terms sharing fewer of a query word's trigrams are not scored at all; they
+# could add little more than a rounding error to an instrument's mean.
+MIN_OVERLAP = 0.25
+
+Symbol = namedtuple("Symbol", ["symbol", "name", "exchange", "type"])
+
+# Term kinds, in ranking order. Name words let "america" find Bank of America
+# and "microsfot" find Microsoft Corporation.
+SYMBOL, ALIAS, NAME, WORD = range(4)
+STOPWORDS = {"inc", "co", "corp", "corporation", "company", "ltd", "limited", "plc", "group", "holdings", "class", "the", "and", "of", "usd", "futures", "etf"}
+
+_SEP = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    return " ".join(_SEP.sub(" ", unicodedata.normalize("NFKC", text).casefold().replace("_", " ")).split())
+
+
+def trigrams(key):
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _pack(strings):
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(arr):
+    text = arr.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+def read_listing(paths):
+    rows = {}
+    for path in paths:
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                sym = (row.get("symbol") or "").strip().upper()
+                if sym and sym not in rows:
+                    aliases = [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()]
+                    rows[sym] = (sym, (row.get("name") or sym).strip(), (row.get("exchange") or "").strip(), (row.get("type") or "").strip(), aliases)
+    return list(rows.values())
+
+
+class SymbolIndex:
+    def __init__(self, arrays):
+        self.symbols = _unpack(arrays["symbols"])
+        self.names = _unpack(arrays["names"])
+        self.exchanges = _unpack(arrays["exchanges"])
+        self.types = _unpack(arrays["types"])
+        self.keys = _unpack(arrays["keys"])
+        self.term_inst, self.term_kind, self.term_grams = arrays["term_inst"], arrays["term_kind"], arrays["term_grams"]
+        self.gram_offsets, self.postings = arrays["gram_offsets"], arrays["postings"]
+        self._grams = {g: i for i, g in enumerate(_unpack(arrays["grams"]))}
+        self.arrays = arrays
+
+    @classmethod
+    def build(cls, rows):
+        terms = set()
+        for i, (sym, name, _, _, aliases) in enumerate(rows):
+            terms.add((normalize(sym), SYMBOL, i))
+            terms.update((normalize(a), ALIAS, i) for a in aliases)
+            name_key = normalize(name)
+            terms.add((name_key, NAME, i))
+            terms.update((w, WORD, i) for w in name_key.split() if len(w) > 2 and w not in STOPWORDS)
+        # Keep only the best-ranked occurrence of each (key, instrument) pair.
+        best = {}
+        for key, kind, i in terms:
+            if key and best.get((key, i), 99) > kind: best[(key, i)] = kind
+        terms = sorted((key, kind, i) for (key, i), kind in best.items())
+        keys = [t[0] for t in terms]
+        postings = {}
+        term_grams = np.zeros(len(terms), dtype=np.int16)
+        for t, (key, kind, _) in enumerate(terms):
+            grams = trigrams(key)
+            term_grams[t] = len(grams)
+            for g in grams: postings.setdefault(g, []).append(t)
+        grams = sorted(postings)
+        lengths = [len(postings[g]) for g in grams]
+        return cls({
+            "symbols": _pack([r[0] for r in rows]), "names": _pack([r[1] for r in rows]),
+            "exchanges": _pack([r[2] for r in rows]), "types": _pack([r[3] for r in rows]),
+            "keys": _pack(keys),
+            "term_inst": np.array([t[2] for t in terms], dtype=np.int32),
+            "term_kind": np.array([t[1] for t in terms], dtype=np.int8),
+            "term_grams": term_grams,
+            "grams": _pack(grams),
+            "gram_offsets": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int32),
+            "postings": np.array([t for g in grams for t in postings[g]], dtype=np.int32),
+        })
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f: return cls({k: f[k] for k in f.files})
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, **self.arrays)
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _symbol(self, i):
+        return Symbol(self.symbols[i], self.names[i], self.exchanges[i], self.types[i])
+
+    def exact(self, query):
+        """Instrument whose ticker, alias or full name equals ``query``, else None."""
+        key = normalize(query)
+        lo, hi = bisect.bisect_left(self.keys, key), bisect.bisect_right(self.keys, key)
+        hits = [(self.term_kind[t], self.term_inst[t]) for t in range(lo, hi) if self.term_kind[t] != WORD]
+        return self._symbol(min(hits)[1]) if hits else None
+
+    def resolve(self, query):
+        hit = self.exact(query)
+        return hit.symbol if hit else None
+
+    def prefix(self, key, limit):
+        lo, hi = bisect.bisect_left(self.keys, key), bisect.bisect_left(self.keys, key + "\U0010ffff")
+        if lo == hi: return []
+        inst = self.term_inst[lo:hi].astype(np.int64)
+        # Exact keys sort first in the range; rank them first, then by term
+        # kind, then by listing order.
+        exact = np.ones(hi - lo, dtype=np.int64)
+        exact[:bisect.bisect_right(self.keys, key, lo, hi) - lo] = 0
+        rank = (exact << 40) | (self.term_kind[lo:hi].astype(np.int64) << 32) | inst
+        take = min(len(rank), limit * 4)
+        top = np.argpartition(rank, take - 1)[:take] if take < len(rank) else np.arange(len(rank))
+        return list(inst[top[np.argsort(rank[top])]])
+
+    def _similar(self, key):
+        """Terms sharing trigrams with ``key``, scored by the share of the longer one they cover."""
+        grams = trigrams(key)
+        ids = [self._grams[g] for g in grams if g in self._grams]
+        if not ids: return np.empty(0, dtype=np.int64), np.empty(0)
+        hits = np.concatenate([self.postings[self.gram_offsets[i]:self.gram_offsets[i + 1]] for i in ids])
+        need = max(1, MIN_OVERLAP * len(grams))
+        if len(hits) * 16 < len(self.term_inst):
+            terms, common = np.unique(hits, return_counts=True)
+            terms, common = terms[common >= need], common[common >= need]
+        else:
+            # Common trigrams hit a large share of all terms; counting into a
+            # dense array is then linear where np.unique would sort every hit.
+            common = np.bincount(hits, minlength=len(self.term_inst))
+            terms = np.flatnonzero(common >= need)
+            common = common[terms]
+        return terms, common / np.maximum(len(grams), self.term_grams[terms])
+
+    def _best(self, similar, whole_terms=False):
+        best = np.zeros(len(self.symbols))
+        terms, sim = similar
+        if whole_terms:
+            keep = self.term_kind[terms] != WORD
+            terms, sim = terms[keep], sim[keep]
+        np.maximum.at(best, self.term_inst[terms], sim)
+        return best
+
+    def fuzzy(self, key, limit):
+        # Each query word is matched on its own and the instrument scores the
+        # mean of its best matches, so "tesla motors" is not won by whichever
+        # company has the longest single word in common. The whole query
+        # against full names, tickers and aliases breaks the remaining ties.
+        words = [w for w in key.split() if w not in STOPWORDS] or key.split()
+        similar = {k: self._similar(k) for k in {key, *words}}
+        coverage = sum(self._best(similar[w]) for w in words) / len(words)
+        score = (2 * coverage + self._best(similar[key], whole_terms=True)) / 3
+        inst = np.flatnonzero(score >= MIN_SCORE)
+        order = np.lexsort((inst, -score[inst]))[:limit * 4]
+        return list(inst[order])
+
+    def search(self, query, limit=8):
+        """Best matches for a partially typed query, prefix hits before fuzzy ones."""
+        key = normalize(query)
+        if not key: return []
+        found = list(dict.fromkeys(self.prefix(key, limit)))[:limit]
+        if len(found) < limit:
+            found = list(dict.fromkeys(found + self.fuzzy(key, limit)))[:limit]
+        return [self._symbol(i) for i in found]
+
+
+def _index_path(paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        st = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return os.path.join(INDEX_DIR, f"{digest.hexdigest()[:16]}.npz")
+
+
+def listing_paths():
+    # PROSTOCK_SYMBOLS can add full exchange listings (os.pathsep separated).
+    extra = [p for p in os.environ.get("PROSTOCK_SYMBOLS", "").split(os.pathsep) if p]
+    return [LISTING] + extra
+
+
+def load_index(paths=None):
+    """Load the compiled index for ``paths``, compiling and caching it on first use."""
+    paths = list(paths or listing_paths())
+    path = _index_path(paths)
+    try: return SymbolIndex.load(path)
+    except (OSError, ValueError, KeyError): pass
+    index = SymbolIndex.build(read_listing(paths))
+    try: index.save(path)
+    except OSError: pass
+    return index
+
+
+if __name__ == "__main__":
+    # Precompile at deploy time: python -m prostock.symbols [listing.csv ...]
+    paths = sys.argv[1:] or listing_paths()
+    index = SymbolIndex.build(read_listing(paths))
+    index.save(_index_path(paths))
+    print(f"{len(index)} symbols, {len(index.keys)} terms -> {_index_path(paths)}")
@@ -0,0 +1,207 @@
+"""Timing spans, cache and upstream counters, and a Prometheus exporter.
+
+Spans and counters go to two places. The process-wide registry aggregates
+them for every session and renders them in the Prometheus text format.
+The current rerun's trace keeps a per-session breakdown for the debug panel.
+The trace lives in a context variable set by ``begin_rerun``. Work handed to
+thread pools shows up only in the process-wide aggregates.
+
+The exporter is opt-in: ``PROSTOCK_METRICS_PORT`` serves ``/metrics`` on
+localhost and ``PROSTOCK_METRICS_FILE`` rewrites a text file every
+``PROSTOCK_METRICS_INTERVAL`` seconds (for node_exporter's textfile collector).
+Each server process keeps its own registry, so each writes its own file:
+``metrics.prom`` becomes ``metrics.<pid>.prom``, with a ``pid`` label on every
+series so the collector can sum them. A process removes its file on exit.
+"""
+import atexit
+import bisect
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL = float(os.environ.get("PROSTOCK_METRICS_INTERVAL", "15"))
+
+_lock = threading.Lock()
+_spans = {}  # (name, kind) -> [bucket counts..., +Inf count, sum]
+_counters = {"prostock_cache_events_total": Counter(), "prostock_upstream_calls_total": Counter(), "prostock_reruns_total": Counter()}
+_trace = contextvars.ContextVar("prostock_trace", default=None)
+
+
+class Trace:
+    """Spans and cache events recorded during one session rerun."""
+
+    def __init__(self, label=""):
+        self.label = label
+        self.started = time.perf_counter()
+        self.spans = []  # (name, kind, depth, seconds)
+        self.events = Counter()  # (cache, event) -> count
+        self.depth = 0
+
+    @property
+    def elapsed(self): return time.perf_counter() - self.started
+
+
+def begin_rerun(label=""):
+    trace = Trace(label)
+    _trace.set(trace)
+    with _lock: _counters["prostock_reruns_total"][(("page", label),)] += 1
+    return trace
+
+
+def _observe(name, kind, seconds):
+    with _lock:
+        row = _spans.get((name, kind))
+        if row is None: row = _spans[(name, kind)] = [0] * (len(BUCKETS) + 1) + [0.0]
+        row[bisect.bisect_left(BUCKETS, seconds)] += 1
+        row[-1] += seconds
+
+
+class span:
+    """Time a step as ``with span("name", "fetch"):`` or via ``start()``/``stop()``."""
+
+    def __init__(self, name, kind="compute"):
+        self.name, self.kind = name, kind
+        self.trace = self.t0 = None
+
+    def start(self):
+        self.trace = _trace.get()
+        if self.trace is not None:
+            self.index = len(self.trace.spans)
+            self.trace.spans.append((self.name, self.kind, self.trace.depth, None))
+            self.trace.depth += 1
+        self.t0 = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self.t0 is None: return
+        seconds = time.perf_counter() - self.t0
+        self.t0 = None
+        _observe(self.name, self.kind, seconds)
+        if self.trace is not None:
+            self.trace.depth -= 1
+            self.trace.spans[self.index] = (self.name, self.kind, self.trace.depth, seconds)
+
+    def __enter__(self): return self.start()
+    def __exit__(self, *exc): self.stop()
+
+
+def timed(name, kind="compute"):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(name, kind): return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def cache_event(cache, event, n=1):
+    if not n: return
+    with _lock: _counters["prostock_cache_events_total"][(("cache", cache), ("event", event))] += n
+    trace = _trace.get()
+    if trace is not None: trace.events[(cache, event)] += n
+
+
+def upstream(service, method, ok=True):
+    with _lock: _counters["prostock_upstream_calls_total"][(("service", service), ("method", method), ("outcome", "ok" if ok else "error"))] += 1
+    trace = _trace.get()
+    if trace is not None: trace.events[(f"{service}.{method}", "upstream")] += 1
+
+
+def _labels(pairs):
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def render_prometheus(labels=()):
+    with _lock:
+        spans = {k: list(v) for k, v in _spans.items()}
+        counters = {name: dict(c) for name, c in _counters.items()}
+    lines = ["# HELP prostock_span_seconds Time spent in instrumented fetch, compute and render steps.",
+             "# TYPE prostock_span_seconds histogram"]
+    for (name, kind), row in sorted(spans.items()):
+        base = tuple(labels) + (("name", name), ("kind", kind))
+        total = 0
+        for le, n in zip(BUCKETS + ("+Inf",), row[:-1]):
+            total += n
+            lines.append(f"prostock_span_seconds_bucket{_labels(base + (('le', le),))} {total}")
+        lines.append(f"prostock_span_seconds_sum{_labels(base)} {row[-1]:.6f}")
+        lines.append(f"prostock_span_seconds_count{_labels(base)} {total}")
+    helps = {"prostock_cache_events_total": "Cache lookups by cache and hit/miss.",
+             "prostock_upstream_calls_total": "Calls to upstream services by outcome.",
+             "prostock_reruns_total": "Script reruns by page."}
+    for name, values in counters.items():
+        lines += [f"# HELP {name} {helps[name]}", f"# TYPE {name} counter"]
+        lines += [f"{name}{_labels(tuple(labels) + pairs)} {n}" for pairs, n in sorted(values.items())]
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404); return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass
+
+
+def process_path(path, pid=None):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def write_metrics(path):
+    """Write this process's metrics to its own file next to ``path``; returns that file."""
+    pid = os.getpid()
+    path = process_path(path, pid)
+    # The textfile collector only reads *.prom, so it never sees a half-written tmp.
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f: f.write(render_prometheus((("pid", pid),)))
+    os.replace(tmp, path)
+    return path
+
+
+def _remove(path):
+    try: os.remove(process_path(path))
+    except OSError: pass
+
+
+class MetricsExporter:
+    def __init__(self, port=None, path=None, interval=EXPORT_INTERVAL):
+        self.port, self.path, self.interval = port, path, interval
+        self.server = None
+        self._thread = None
+
+    def _loop(self):
+        while True:
+            try: write_metrics(self.path)
+            except OSError: pass
+            time.sleep(self.interval)
+
+    def start(self):
+        if self.port and self.server is None:
+            try: self.server = ThreadingHTTPServer(("127.0.0.1", int(self.port)), _Handler)
+            except OSError as e:
+                # Only one worker process can own the port; the rest run without it.
+                logging.getLogger(__name__).warning("metrics port %s unavailable, not serving /metrics: %s", self.port, e)
+                self.port = None
+            else: threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        if self.path and self._thread is None:
+            atexit.register(_remove, self.path)
+            self._thread = threading.Thread(target=self._loop, name="metrics-file", daemon=True)
+            self._thread.start()
+        return self
+
+
+def exporter_from_env():
+    return MetricsExporter(os.environ.get("PROSTOCK_METRICS_PORT"), os.environ.get("PROSTOCK_METRICS_FILE"))
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def ohlcv(index, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    spread = np.abs(rng.normal(0, 0.004, len(index))) * close
+    return pd.DataFrame({"Open": np.r_[close[0], close[:-1]], "High": close + spread, "Low": close - spread,
+                         "Close": close, "Volume": rng.integers(1_000, 100_000, len(index)).astype("float64")}, index=index)
+
+
+@pytest.fixture
+def minute_bars():
+    # Two US sessions of 1m bars, 9:30 to 16:00 New York time.
+    days = [pd.date_range(f"{d} 09:30", f"{d} 15:59", freq="1min", tz="America/New_York") for d in ("2026-03-05", "2026-03-06")]
+    return ohlcv(days[0].append(days[1]))
@@ -0,0 +1,18 @@
+import pandas as pd
+
+import prostock.backtest
+from prostock.backtest import sweep
+
+
+def test_sweep_stays_inline_on_one_core(monkeypatch, minute_bars):
+    monkeypatch.setattr(prostock.backtest.os, "cpu_count", lambda: 1)
+    monkeypatch.setattr(prostock.backtest, "ProcessPoolExecutor", None)
+    assert len(sweep(minute_bars, "sma", workers=4)) == 40
+
+
+def test_spawned_pool_matches_inline(monkeypatch, minute_bars):
+    monkeypatch.setattr(prostock.backtest.os, "cpu_count", lambda: 2)
+    grid = {"window": [5, 10, 20, 40]}
+    inline = sweep(minute_bars, "sma", grid, workers=1)
+    pooled = sweep(minute_bars, "sma", grid, workers=2, chunk_size=2)
+    pd.testing.assert_frame_equal(pooled, inline)
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import prostock.bar_store
+from prostock.bar_store import BarStore
+from prostock.indicators import ENGINE
+from prostock.providers import MarketDataProvider
+
+
+class Flaky(MarketDataProvider):
+    def __init__(self, frame):
+        self.frame, self.fail, self.calls = frame, False, 0
+
+    def download(self, tickers, **kwargs):
+        self.calls += 1
+        if self.fail: raise ConnectionError("upstream down")
+        return self.frame
+
+
+@pytest.fixture
+def provider(monkeypatch, minute_bars):
+    provider = Flaky(minute_bars)
+    monkeypatch.setattr(prostock.bar_store, "get_provider", lambda: provider)
+    return provider
+
+
+def test_failed_refresh_serves_stored_bars(tmp_path, provider, minute_bars):
+    store = BarStore(root=str(tmp_path), min_refresh=0)
+    assert len(store.get("AAPL", "1m", period="5d")) == len(minute_bars)
+    provider.fail = True
+    served = store.get("AAPL", "1m", period="5d")
+    pd.testing.assert_index_equal(served.index, minute_bars.index)
+
+
+def test_failed_refresh_is_retried(tmp_path, provider):
+    store = BarStore(root=str(tmp_path), min_refresh=3600)
+    store.get("AAPL", "1m", period="5d")
+    provider.fail = True
+    store.get("AAPL", "1m", period="5d")
+    # Still inside min_refresh, so only the successful fetch counts.
+    assert provider.calls == 1
+    store._fetched_at.clear()
+    store.get("AAPL", "1m", period="5d"); store.get("AAPL", "1m", period="5d")
+    assert provider.calls == 3
+
+
+def test_eviction_drops_per_key_state(tmp_path, provider):
+    store = BarStore(root=str(tmp_path), min_refresh=3600)
+    store.series.max_bytes = 1
+    store.get("AAPL", "15m", period="5d", technicals=True)
+    store.get("MSFT", "15m", period="5d", technicals=True)
+    aapl = [("AAPL", "1m"), ("AAPL", "15m<1m")]
+    assert not any(k in d for k in aapl for d in (store._fetched_at, store._sources, store._locks, ENGINE._entries))
+    assert ("MSFT", "15m<1m") in ENGINE._entries
+    # An evicted series is read back from disk and refreshed on next use.
+    assert len(store.get("AAPL", "15m", period="5d")) and provider.calls == 3
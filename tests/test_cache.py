@@ -0,0 +1,34 @@
+import time
+
+import prostock.snapshot
+from prostock.cache import TTLCache
+
+
+def test_expired_entries_are_purged():
+    cache = TTLCache(0.01)
+    cache.set_many({f"T{i}": i for i in range(100)})
+    time.sleep(0.02)
+    cache.set("AAPL", 1)
+    assert len(cache) == 1 and cache.get("AAPL") == 1
+
+
+def test_maxsize_drops_oldest():
+    cache = TTLCache(60, maxsize=3)
+    for k in "abcd": cache.set(k, k)
+    cache.set("b", "b")
+    assert len(cache) == 3
+    assert cache.get_many(list("abcd")) == {"b": "b", "c": "c", "d": "d"}
+
+
+def test_failed_snapshot_part_is_cached_briefly(monkeypatch):
+    calls = []
+
+    def failing():
+        calls.append(1); raise ConnectionError("upstream down")
+    monkeypatch.setitem(prostock.snapshot._caches, "info", TTLCache(60))
+    assert prostock.snapshot._part("info", "AAPL", failing, {}) == {}
+    assert prostock.snapshot._part("info", "AAPL", failing, {}) == {}
+    assert len(calls) == 1
+    monkeypatch.setattr(prostock.snapshot, "FAILURE_TTL", 0)
+    prostock.snapshot._part("info", "MSFT", failing, {}); prostock.snapshot._part("info", "MSFT", failing, {})
+    assert len(calls) == 3
@@ -0,0 +1,13 @@
+import pandas as pd
+
+from prostock.chart_data import price_figure
+
+
+def test_price_figure_handles_empty_frames():
+    for market in ("Stocks", "Crypto"):
+        assert len(price_figure(pd.DataFrame(), market, "1m").data) == 0
+
+
+def test_price_figure_draws_candles(minute_bars):
+    fig = price_figure(minute_bars, "Stocks", "1m", max_points=200)
+    assert fig.data[0].type == "candlestick" and len(fig.data[0].x) <= 200
@@ -0,0 +1,18 @@
+from prostock.columnar import ColumnarStore
+
+
+def test_least_recently_read_series_is_evicted(minute_bars):
+    evicted = []
+    one = ColumnarStore().put("probe", minute_bars).nbytes
+    store = ColumnarStore(max_bytes=2 * one, on_evict=lambda key, series: evicted.append(key))
+    store.put("AAPL", minute_bars); store.put("MSFT", minute_bars)
+    store.get("AAPL")
+    store.put("NVDA", minute_bars)
+    assert evicted == ["MSFT"] and store.get("MSFT") is None
+    assert len(store) == 2 and store.nbytes() == 2 * one
+
+
+def test_oversized_series_is_kept(minute_bars):
+    store = ColumnarStore(max_bytes=1)
+    store.put("AAPL", minute_bars); store.put("MSFT", minute_bars)
+    assert store.get("AAPL") is None and len(store.get("MSFT")) == len(minute_bars)
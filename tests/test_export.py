@@ -0,0 +1,42 @@
+import io
+import zipfile
+
+import pandas as pd
+import pyarrow.ipc as ipc
+import pytest
+from streamlit.elements.widgets.button import convert_data_to_bytes_and_infer_mime
+
+from prostock.export import FORMATS, export_archive, export_file
+
+
+def _read(payload, fmt):
+    if fmt == "CSV": return pd.read_csv(io.BytesIO(payload), index_col=0, parse_dates=True)
+    if fmt == "Parquet": return pd.read_parquet(io.BytesIO(payload))
+    return ipc.open_file(io.BytesIO(payload)).read_pandas()
+
+
+def _payload(out):
+    # What st.download_button does with a deferred callable's return value.
+    data, _ = convert_data_to_bytes_and_infer_mime(out, unsupported_error=TypeError("unsupported download payload"))
+    return data
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_export_round_trip(fmt, minute_bars):
+    data = minute_bars.tz_convert(None)
+    back = _read(_payload(export_file(data, fmt)), fmt)
+    pd.testing.assert_frame_equal(back, data, check_freq=False, check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_empty_export(fmt):
+    assert _payload(export_file(pd.DataFrame({"Close": []}), fmt))
+
+
+def test_archive_round_trip(minute_bars):
+    data = minute_bars.tz_convert(None)
+    frames = {"AAPL": data, "MSFT": data.iloc[:10], "NONE": pd.DataFrame()}
+    with zipfile.ZipFile(io.BytesIO(_payload(export_archive(list(frames), frames.get, "Parquet")))) as zf:
+        assert sorted(zf.namelist()) == ["AAPL.parquet", "MSFT.parquet"]
+        back = pd.read_parquet(io.BytesIO(zf.read("MSFT.parquet")))
+    pd.testing.assert_frame_equal(back, data.iloc[:10], check_freq=False)
@@ -0,0 +1,79 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from prostock.feeds import FeedAggregator
+
+ETAG = '"v1"'
+
+
+def rss(n):
+    items = "".join(f"<item><title>Headline {i}</title><link>https://news.example/{i}</link></item>" for i in range(n))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Stub</title>{items}</channel></rss>'.encode()
+
+
+class FeedStub(BaseHTTPRequestHandler):
+    requests = []
+    completed = []
+    finished = []
+
+    def do_GET(self):
+        FeedStub.requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304); self.send_header("ETag", ETAG); self.end_headers(); return
+        body = rss(20 if self.path == "/small" else 50_000)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml"); self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(body), 4096): self.wfile.write(body[i:i + 4096])
+            FeedStub.completed.append(self.path)
+        except OSError: pass
+        finally: FeedStub.finished.append(self.path)
+
+    def log_message(self, *args): pass
+
+
+@pytest.fixture
+def stub():
+    FeedStub.requests, FeedStub.completed, FeedStub.finished = [], [], []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown(); server.server_close()
+
+
+def test_unchanged_feed_revalidates_with_304(stub):
+    feeds = FeedAggregator(ttl=0)
+    first = feeds.fetch(f"{stub}/small", limit=3)
+    assert [i["title"] for i in first] == ["Headline 0", "Headline 1", "Headline 2"]
+    assert feeds.fetch(f"{stub}/small", limit=3) == first
+    assert "If-None-Match" not in FeedStub.requests[0]
+    assert FeedStub.requests[1]["If-None-Match"] == ETAG
+
+
+def test_download_stops_after_limit(stub):
+    items = FeedAggregator(ttl=0).fetch(f"{stub}/large", limit=5)
+    assert len(items) == 5
+    # The client hangs up long before the ~4 MB body has been sent.
+    deadline = time.monotonic() + 5
+    while "/large" not in FeedStub.finished and time.monotonic() < deadline: time.sleep(0.01)
+    assert "/large" in FeedStub.finished and "/large" not in FeedStub.completed
+
+
+def test_larger_limit_refetches(stub):
+    feeds = FeedAggregator(ttl=0)
+    assert len(feeds.fetch(f"{stub}/small", limit=2)) == 2
+    assert len(feeds.fetch(f"{stub}/small", limit=8)) == 8
+    assert "If-None-Match" not in FeedStub.requests[1]
+    # A smaller limit can be served from the 304 again.
+    assert len(feeds.fetch(f"{stub}/small", limit=4)) == 4
+    assert FeedStub.requests[2]["If-None-Match"] == ETAG
+
+
+def test_items_are_deduplicated_across_sources(stub):
+    out = FeedAggregator(feeds={"A": f"{stub}/small", "B": f"{stub}/small?b"}, ttl=0).fetch_many(["A", "B"], limit=3)
+    assert len(out["A"]) == 3 and out["B"] == []
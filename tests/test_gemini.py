@@ -0,0 +1,78 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from prostock.gemini import UNAVAILABLE, GeminiClient
+
+CHUNKS = ["RSI is ", "neutral, ", "hold."]
+
+
+class GeminiStub(BaseHTTPRequestHandler):
+    """Imitates ``models/{model}:streamGenerateContent?alt=sse``."""
+    calls = []
+    flaky = set()
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        model, method = url.path.rsplit("/", 1)[-1].split(":")
+        key = parse_qs(url.query).get("key", [""])[0]
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        GeminiStub.calls.append((model, key))
+        if method != "streamGenerateContent" or key != "good" or model == "broken":
+            self._status(400 if key != "good" else 404); return
+        if model in GeminiStub.flaky:
+            GeminiStub.flaky.discard(model)
+            self._status(503, {"Retry-After": "0.01"}); return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for text in CHUNKS:
+            payload = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+            self.wfile.write(f"data: {json.dumps(payload)}\r\n\r\n".encode()); self.wfile.flush()
+        self.wfile.write(b"data: not json\r\n\r\n")
+
+    def _status(self, code, headers=()):
+        self.send_response(code)
+        for k, v in dict(headers).items(): self.send_header(k, v)
+        self.send_header("Content-Length", "0"); self.end_headers()
+
+    def log_message(self, *args): pass
+
+
+@pytest.fixture
+def stub():
+    GeminiStub.calls, GeminiStub.flaky = [], set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GeminiStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1beta"
+    server.shutdown(); server.server_close()
+
+
+def test_stream_parses_sse_chunks(stub):
+    client = GeminiClient(base_url=stub, models=("broken", "flash"))
+    assert list(client.stream("prompt", "good")) == CHUNKS
+
+
+def test_error_status_yields_unavailable(stub):
+    client = GeminiClient(base_url=stub, models=("flash", "pro"))
+    assert list(client.ask("prompt", "bad", cache_key=("AAPL", "q"))) == [UNAVAILABLE]
+    assert sorted(GeminiStub.calls) == [("flash", "bad"), ("pro", "bad")]
+
+
+def test_throttled_model_is_retried(stub):
+    GeminiStub.flaky.add("flash")
+    client = GeminiClient(base_url=stub, models=("flash",))
+    assert "".join(client.ask("prompt", "good")) == "".join(CHUNKS)
+    assert GeminiStub.calls == [("flash", "good"), ("flash", "good")]
+
+
+def test_answers_are_cached_per_api_key(stub):
+    client = GeminiClient(base_url=stub, models=("flash",))
+    key = ("AAPL", "should i buy", ())
+    assert "".join(client.ask("prompt", "good", cache_key=key)) == "".join(CHUNKS)
+    assert list(client.ask("prompt", "good", cache_key=key)) == ["".join(CHUNKS)]
+    assert len(GeminiStub.calls) == 1
+    assert list(client.ask("prompt", "bad", cache_key=key)) == [UNAVAILABLE]
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from prostock.indicators import COLUMNS, IndicatorEngine, compute_all
+
+# VWAP restarts with the window on a cold start, so it is compared separately.
+ROLLING = [c for c in COLUMNS if c != "VWAP"]
+
+
+def test_incremental_matches_cold_start(minute_bars):
+    engine = IndicatorEngine()
+    engine.indicators(minute_bars.iloc[:300], key="AAPL", interval="1m")
+    for end in range(301, len(minute_bars), 37):
+        got = engine.indicators(minute_bars.iloc[:end], key="AAPL", interval="1m")
+        want = compute_all(minute_bars.iloc[:end], intraday=True)
+        assert got.index.equals(want.index)
+        np.testing.assert_allclose(got[COLUMNS].to_numpy(), want[COLUMNS].to_numpy(), rtol=1e-6, atol=1e-6)
+
+
+def test_provisional_bar_is_not_committed(minute_bars):
+    engine = IndicatorEngine()
+    data = minute_bars.iloc[:200]
+    engine.indicators(data, key="AAPL", interval="1m")
+    # The last bar is still forming: a revised close must replace, not append.
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] *= 1.02
+    got = engine.indicators(revised, key="AAPL", interval="1m")
+    want = compute_all(revised, intraday=True)
+    np.testing.assert_allclose(got[COLUMNS].to_numpy(), want[COLUMNS].to_numpy(), rtol=1e-6, atol=1e-6)
+
+
+def test_sliding_window_stays_bounded(minute_bars):
+    engine = IndicatorEngine()
+    window = 200
+    for end in range(window, len(minute_bars), 5):
+        got = engine.indicators(minute_bars.iloc[end - window:end], key="AAPL", interval="1m")
+        want = compute_all(minute_bars.iloc[:end], intraday=True).iloc[end - window:]
+        np.testing.assert_allclose(got[ROLLING].to_numpy(), want[ROLLING].to_numpy(), rtol=1e-6, atol=1e-6)
+    assert len(engine._entries["AAPL"]["committed"]) < 3 * window
+
+
+def test_unkeyed_calls_are_cold(minute_bars):
+    got = IndicatorEngine().indicators(minute_bars, interval="1m")
+    pd.testing.assert_frame_equal(got, compute_all(minute_bars, intraday=True))
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from prostock.providers import MarketDataProvider, RecordingProvider, ReplayProvider
+
+
+class Canned(MarketDataProvider):
+    def __init__(self, frame):
+        self.frame, self.calls = frame, 0
+
+    def download(self, tickers, **kwargs):
+        self.calls += 1
+        return self.frame
+
+    def info(self, ticker):
+        raise ValueError("upstream down")
+
+
+def test_replay_serves_recorded_responses(tmp_path, minute_bars):
+    inner = Canned(minute_bars)
+    recorded = RecordingProvider(inner, root=str(tmp_path)).download(["AAPL", "MSFT"], period="5d", interval="1m")
+    replayed = ReplayProvider(root=str(tmp_path)).download(["AAPL", "MSFT"], period="5d", interval="1m")
+    pd.testing.assert_frame_equal(replayed, recorded)
+    assert inner.calls == 1
+
+
+def test_replay_returns_copies(tmp_path, minute_bars):
+    RecordingProvider(Canned(minute_bars), root=str(tmp_path)).download("AAPL", period="5d")
+    replay = ReplayProvider(root=str(tmp_path))
+    first = replay.download("AAPL", period="5d")
+    first['Close'] = 0.0
+    assert (replay.download("AAPL", period="5d")['Close'] > 0).all()
+
+
+def test_replay_unrecorded_requests(tmp_path):
+    assert ReplayProvider(root=str(tmp_path)).download("AAPL", period="1y").empty
+    assert ReplayProvider(root=str(tmp_path)).info("AAPL") == {}
+    with pytest.raises(KeyError):
+        ReplayProvider(root=str(tmp_path), strict=True).download("AAPL", period="1y")
+
+
+def test_replay_reraises_recorded_errors(tmp_path, minute_bars):
+    with pytest.raises(ValueError):
+        RecordingProvider(Canned(minute_bars), root=str(tmp_path)).info("AAPL")
+    with pytest.raises(RuntimeError, match="upstream down"):
+        ReplayProvider(root=str(tmp_path)).info("AAPL")
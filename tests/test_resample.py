@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from conftest import ohlcv
+from prostock.resample import resample, source_interval
+
+
+def _local_times(frame, tz):
+    return [t.strftime("%H:%M") for t in frame.index.tz_convert(tz)]
+
+
+def test_us_hourly_buckets_start_at_the_open(minute_bars):
+    hourly = resample(minute_bars, "1h", "AAPL")
+    assert _local_times(hourly, "America/New_York")[:7] == ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    assert len(hourly) == 14
+
+
+def test_buckets_keep_wall_clock_across_dst():
+    # US clocks move forward on 2026-03-08.
+    days = [pd.date_range(f"{d} 09:30", f"{d} 15:59", freq="5min", tz="America/New_York") for d in ("2026-03-06", "2026-03-09")]
+    hourly = resample(ohlcv(days[0].append(days[1])), "1h", "AAPL")
+    assert set(_local_times(hourly, "America/New_York")) == {"09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"}
+
+
+def test_krx_buckets_start_at_nine():
+    index = pd.date_range("2026-03-05 09:00", "2026-03-05 15:29", freq="1min", tz="Asia/Seoul")
+    hourly = resample(ohlcv(index), "1h", "005930.KS")
+    assert _local_times(hourly, "Asia/Seoul")[0] == "09:00"
+    assert _local_times(hourly, "Asia/Seoul")[-1] == "15:00"
+
+
+def test_ohlcv_aggregation(minute_bars):
+    bucket = minute_bars.iloc[:60]
+    first = resample(minute_bars, "1h", "AAPL").iloc[0]
+    assert first['Open'] == bucket['Open'].iloc[0]
+    assert first['High'] == bucket['High'].max()
+    assert first['Low'] == bucket['Low'].min()
+    assert first['Close'] == bucket['Close'].iloc[-1]
+    assert first['Volume'] == bucket['Volume'].sum()
+
+
+def test_weeks_start_on_monday():
+    daily = ohlcv(pd.bdate_range("2026-03-04", "2026-03-20"))
+    weekly = resample(daily, "1wk", "AAPL")
+    assert [d.strftime("%a %d") for d in weekly.index] == ["Mon 02", "Mon 09", "Mon 16"]
+    np.testing.assert_allclose(weekly['Close'].to_numpy(), daily['Close'].iloc[[2, 7, 12]].to_numpy())
+
+
+def test_source_interval():
+    assert source_interval("15m", pd.Timedelta(days=5)) == "1m"
+    assert source_interval("15m", pd.Timedelta(days=30)) == "5m"
+    assert source_interval("4h", pd.Timedelta(days=183)) == "1h"
+    assert source_interval("1wk", pd.Timedelta(days=1827)) == "1d"
+    assert source_interval("3mo") == "3mo"
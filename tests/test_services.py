@@ -0,0 +1,35 @@
+import time
+
+import prostock.fx
+import prostock.regime
+from prostock.fx import FXService
+from prostock.movers import MoversSnapshot
+from prostock.regime import NEUTRAL, RegimeService
+
+
+def _down(*args, **kwargs): raise ConnectionError("upstream down")
+
+
+def test_fx_wait_ends_after_a_failed_first_refresh(monkeypatch):
+    monkeypatch.setattr(prostock.fx, "fetch_usd_rates", _down)
+    fx = FXService().start()
+    t = time.perf_counter()
+    fx.wait(3.0)
+    assert time.perf_counter() - t < 1.0
+    assert fx.rate("USD", "KRW") is None and fx.rate("KRW", "KRW") == 1.0
+
+
+def test_regime_falls_back_to_neutral_while_upstream_fails(monkeypatch):
+    monkeypatch.setattr(prostock.regime, "compute_regime", _down)
+    regime = RegimeService().start()
+    t = time.perf_counter()
+    assert regime.current() == NEUTRAL
+    assert time.perf_counter() - t < 1.0
+
+
+def test_movers_snapshot_returns_empty_while_upstream_fails(monkeypatch):
+    monkeypatch.setattr(MoversSnapshot, "refresh", _down)
+    movers = MoversSnapshot(["AAPL", "MSFT"]).start()
+    t = time.perf_counter()
+    assert movers.snapshot() == ({}, None)
+    assert time.perf_counter() - t < 1.0
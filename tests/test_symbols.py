@@ -0,0 +1,18 @@
+from prostock.symbols import LISTING, SymbolIndex, read_listing
+
+INDEX = SymbolIndex.build(read_listing([LISTING]))
+
+
+def test_exact_names_and_aliases():
+    assert INDEX.resolve("Apple Inc.") == "AAPL"
+    assert INDEX.resolve("삼성전자") == "005930.KS"
+    assert INDEX.resolve("nvidai") is None
+
+
+def test_typos_find_the_instrument():
+    for query, symbol in [("nvidai", "NVDA"), ("microsfot", "MSFT"), ("bitcon", "BTC-USD"), ("tesla motrs", "TSLA")]:
+        assert INDEX.search(query, 1)[0].symbol == symbol
+
+
+def test_unrelated_text_finds_nothing():
+    assert INDEX.search("qzxv") == []
@@ -0,0 +1,14 @@
+import os
+
+from prostock.telemetry import cache_event, process_path, span, write_metrics
+
+
+def test_each_process_writes_its_own_file(tmp_path):
+    cache_event("quotes", "hit")
+    with span("unit", "compute"): pass
+    path = write_metrics(str(tmp_path / "metrics.prom"))
+    assert path == str(tmp_path / f"metrics.{os.getpid()}.prom") == process_path(str(tmp_path / "metrics.prom"))
+    assert os.listdir(tmp_path) == [f"metrics.{os.getpid()}.prom"]
+    text = open(path, encoding="utf-8").read()
+    assert f'prostock_cache_events_total{{pid="{os.getpid()}",cache="quotes",event="hit"}}' in text
+    assert f'prostock_span_seconds_count{{pid="{os.getpid()}",name="unit",kind="compute"}} 1' in text